@@ -1,10 +1,14 @@
+import asyncio
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
 
 from alembic import context
+from app.infrastructure.migrations import format_timeout
 from app.infrastructure.models import Base
+from core.config import get_settings
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -26,6 +30,15 @@ target_metadata = Base.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# 与应用使用同一个asyncpg连接URL(DATABASE_URL)，不再单独维护alembic.ini中的连接串
+settings = get_settings()
+
+# 迁移连接的默认超时：DDL等待表锁最多MIGRATION_LOCK_TIMEOUT，避免排在长事务后阻塞线上读写
+timeout_settings = {
+    "lock_timeout": format_timeout(settings.MIGRATION_LOCK_TIMEOUT),
+    "statement_timeout": format_timeout(settings.MIGRATION_STATEMENT_TIMEOUT),
+}
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -39,18 +52,51 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url,
+        url=settings.DATABASE_URL,
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
+    )
+
+    with context.begin_transaction():
+        for name, value in timeout_settings.items():
+            context.execute(f"SET {name} = '{value}'")
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    """在同步连接上执行迁移，由异步连接的run_sync调用
+
+    每个迁移文件单独提交，使用CONCURRENTLY或分批回填的迁移(autocommit块)不会把之前的迁移一并提交到半途。
+    """
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
         context.run_migrations()
 
 
+async def run_async_migrations() -> None:
+    """创建不使用连接池的异步引擎并执行迁移"""
+    connectable = create_async_engine(
+        settings.DATABASE_URL,
+        poolclass=pool.NullPool,
+        connect_args={
+            "server_settings": {"application_name": "minimus_migration", **timeout_settings},
+        },
+    )
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
@@ -58,19 +104,7 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+    asyncio.run(run_async_migrations())
 
 
 if context.is_offline_mode():
@@ -0,0 +1,29 @@
+"""rebuild demos created_at id index concurrently if invalid
+
+Revision ID: 54e615adc0e6
+Revises: 7b2e4f9a1c36
+Create Date: 2026-10-18 21:12:08.301544
+
+"""
+from typing import Sequence, Union
+
+from app.infrastructure.migrations import create_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '54e615adc0e6'
+down_revision: Union[str, Sequence[str], None] = '7b2e4f9a1c36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # demos为线上大表，索引已存在且有效时跳过；缺失或为失败遗留的无效索引时以CONCURRENTLY重建，不阻塞读写
+    create_index_concurrently('ix_demos_created_at_id', 'demos', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 索引由a3f1c9d27b54创建，回滚本迁移时保留
+    pass
@@ -0,0 +1,29 @@
+"""create uuid-ossp extension
+
+Revision ID: c51d7e8a2f04
+Revises: a3f1c9d27b54
+Create Date: 2026-10-18 19:20:37.518342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c51d7e8a2f04'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c9d27b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 原先由每个worker启动时执行，改为随迁移只执行一次
+    op.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp";')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 扩展可能被库中其他对象使用，回滚时不删除
+    pass
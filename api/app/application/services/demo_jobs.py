@@ -0,0 +1,25 @@
+"""Demo模块的后台任务处理函数"""
+import logging
+from typing import Any, Dict
+
+from app.application.services.job_service import job_handler
+from app.infrastructure.repositories import DemoRepository
+from app.infrastructure.storage.postgres import LazySession
+
+logger = logging.getLogger(__name__)
+
+
+@job_handler("demo.summary")
+async def summarize_demos(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """全表流式统计Demo数据的条数与平均年龄，min_age用于过滤"""
+    min_age = int(payload.get("min_age", 0))
+    count, total_age = 0, 0
+    session = LazySession(read_only=True)
+    try:
+        async for row in DemoRepository(session).stream():
+            if row["age"] >= min_age:
+                count += 1
+                total_age += row["age"]
+    finally:
+        await session.release(commit=False)
+    return {"count": count, "average_age": round(total_age / count, 2) if count else 0.0}
@@ -0,0 +1,201 @@
+import logging
+import math
+import re
+import uuid
+from datetime import datetime, timedelta
+from pathlib import PurePosixPath
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from sqlalchemy import update
+
+from core.config import Settings, get_settings
+from app.application.errors.exceptions import BadRequestError, NotFoundError
+from app.domain.model.file import FileStatus, PresignedPart, UploadTicket
+from app.infrastructure.cache import CachedObject, get_cos_disk_cache
+from app.infrastructure.models import FileModel
+from app.infrastructure.storage.cos import Cos, get_cos
+from app.infrastructure.storage.postgres import LazySession
+
+logger = logging.getLogger(__name__)
+
+# COS要求除最后一块外每个分块不小于1MB
+_MIN_PART_SIZE = 1024 * 1024
+
+_SAFE_SUFFIX = re.compile(r"^\.[A-Za-z0-9]{1,15}$")
+
+
+class FileService:
+    """文件服务：签发客户端直传COS的预签名URL，上传完成后经回调确认并记录元数据
+
+    文件内容在客户端与COS之间直接传输，API服务只负责签名(本地计算)与少量元数据读写。
+    """
+
+    def __init__(self, session: LazySession, cos: Optional[Cos] = None):
+        self._settings: Settings = get_settings()
+        self._session = session
+        self._cos = cos or get_cos()
+
+    def _expires_at(self) -> datetime:
+        return datetime.now() + timedelta(seconds=self._settings.COS_PRESIGN_EXPIRES)
+
+    def _build_key(self, file_id: uuid.UUID, filename: str) -> str:
+        """对象key由日期与文件ID组成，不使用客户端提供的文件名，只保留安全的扩展名"""
+        suffix = PurePosixPath(filename).suffix.lower()
+        suffix = suffix if _SAFE_SUFFIX.match(suffix) else ""
+        return f"{self._settings.COS_UPLOAD_KEY_PREFIX}/{datetime.now():%Y/%m/%d}/{file_id.hex}{suffix}"
+
+    def _part_size(self, size: int) -> int:
+        """分块大小默认为COS_PART_SIZE，分块数超过上限时按上限均分并对齐到1MB"""
+        part_size = max(self._settings.COS_PART_SIZE, _MIN_PART_SIZE)
+        if math.ceil(size / part_size) > self._settings.COS_MULTIPART_MAX_PARTS:
+            part_size = math.ceil(size / self._settings.COS_MULTIPART_MAX_PARTS / _MIN_PART_SIZE) * _MIN_PART_SIZE
+        return part_size
+
+    async def _presign_part(self, key: str, upload_id: str, part_number: int, part_size: int, size: int) -> PresignedPart:
+        """签发单个分块的上传URL，分块大小参与签名，客户端上传的数据长度必须与之一致"""
+        length = min(part_size, size - (part_number - 1) * part_size)
+        headers = {"Content-Length": str(length)}
+        url = await self._cos.presign_url(
+            key,
+            method="PUT",
+            params={"partNumber": str(part_number), "uploadId": upload_id},
+            headers=headers,
+        )
+        return PresignedPart(part_number=part_number, url=url, size=length, headers=headers)
+
+    async def _get(self, file_id: uuid.UUID) -> FileModel:
+        record = await self._session.get(FileModel, file_id)
+        if record is None:
+            raise NotFoundError(f"文件不存在: {file_id}")
+        return record
+
+    async def create_upload(self, filename: str, size: int, content_type: str) -> UploadTicket:
+        """创建上传：记录待上传的文件，小文件签发单次PUT URL，大文件创建分块上传任务并签发各分块URL"""
+        if size > self._settings.COS_UPLOAD_MAX_SIZE:
+            raise BadRequestError(f"文件大小超出上限: {self._settings.COS_UPLOAD_MAX_SIZE}字节")
+
+        file_id = uuid.uuid4()
+        key = self._build_key(file_id, filename)
+        ticket = UploadTicket(file_id=file_id, key=key, expires_at=self._expires_at())
+
+        # 1.小文件单次PUT，Content-Type与Content-Length参与签名，客户端无法上传与声明不符的内容
+        if size < self._settings.COS_MULTIPART_THRESHOLD:
+            ticket.headers = {"Content-Type": content_type, "Content-Length": str(size)}
+            ticket.url = await self._cos.presign_url(key, method="PUT", headers=ticket.headers)
+        # 2.大文件分块上传，客户端可并行上传各分块
+        else:
+            ticket.upload_id = await self._cos.create_multipart_upload(key, content_type=content_type)
+            ticket.part_size = self._part_size(size)
+            ticket.parts = [
+                await self._presign_part(key, ticket.upload_id, part_number, ticket.part_size, size)
+                for part_number in range(1, math.ceil(size / ticket.part_size) + 1)
+            ]
+
+        self._session.add(FileModel(
+            id=file_id,
+            key=key,
+            filename=filename,
+            content_type=content_type,
+            size=size,
+            etag="",
+            status=FileStatus.PENDING.value,
+            upload_id=ticket.upload_id,
+        ))
+        logger.info(f"签发文件直传凭证: {file_id} {key} 大小: {size} 分块数: {len(ticket.parts) or 1}")
+        return ticket
+
+    async def presign_parts(self, file_id: uuid.UUID, part_numbers: Sequence[int]) -> Tuple[List[PresignedPart], datetime]:
+        """重新签发分块上传URL，用于大文件上传时间超过URL有效期的情况"""
+        record = await self._get(file_id)
+        if record.status != FileStatus.PENDING.value or record.upload_id is None:
+            raise BadRequestError("该文件不是进行中的分块上传")
+        part_size = self._part_size(record.size)
+        total = math.ceil(record.size / part_size)
+        invalid = [number for number in part_numbers if not 1 <= number <= total]
+        if invalid:
+            raise BadRequestError(f"分块号超出范围(1-{total}): {invalid}")
+        parts = [await self._presign_part(record.key, record.upload_id, number, part_size, record.size) for number in part_numbers]
+        return parts, self._expires_at()
+
+    async def complete_upload(self, file_id: uuid.UUID, parts: Optional[Dict[int, str]] = None) -> FileModel:
+        """上传完成回调：合并分块(分块上传时)并通过HEAD确认对象已存在且大小一致，之后记录对象元数据
+
+        重复回调直接返回已记录的元数据。访问COS期间不占用数据库连接。
+        """
+        from qcloud_cos.cos_exception import CosServiceError
+
+        # 1.读取待上传记录后立即归还连接
+        record = await self._get(file_id)
+        if record.status == FileStatus.UPLOADED.value:
+            return record
+        key, upload_id, size, content_type = record.key, record.upload_id, record.size, record.content_type
+        await self._session.release(commit=False)
+
+        # 2.分块上传需要客户端提交各分块的ETag，由服务端完成合并
+        if upload_id is not None:
+            if not parts:
+                raise BadRequestError("分块上传完成时需要提交各分块的ETag")
+            try:
+                await self._cos.complete_multipart_upload(
+                    key, upload_id, [{"PartNumber": number, "ETag": etag} for number, etag in parts.items()]
+                )
+            except CosServiceError as e:
+                raise BadRequestError(f"合并分块失败: {e.get_error_code()}")
+
+        # 3.确认对象存在且大小与声明一致，不一致时删除对象，需要重新发起上传
+        try:
+            head = await self._cos.head_object(key)
+        except CosServiceError as e:
+            if e.get_status_code() == 404:
+                raise BadRequestError("对象不存在，请先完成上传")
+            raise
+        actual_size = int(head.get("Content-Length", -1))
+        if actual_size != size:
+            await self._cos.delete_object(key)
+            raise BadRequestError(f"文件大小与声明不一致: 声明{size}字节，实际{actual_size}字节")
+
+        # 4.只更新仍为待上传状态的记录，并发的重复回调只有一个生效
+        now = datetime.now()
+        await self._session.execute(
+            update(FileModel)
+            .where(FileModel.id == file_id, FileModel.status == FileStatus.PENDING.value)
+            .values(
+                status=FileStatus.UPLOADED.value,
+                etag=head.get("ETag", "").strip('"'),
+                content_type=head.get("Content-Type") or content_type,
+                upload_id=None,
+                uploaded_at=now,
+                updated_at=now,
+            )
+        )
+        await self._session.commit()
+        logger.info(f"文件直传完成: {file_id} {key} 大小: {size}")
+        return await self._get(file_id)
+
+    async def get(self, file_id: uuid.UUID) -> FileModel:
+        return await self._get(file_id)
+
+    async def presign_download(self, file_id: uuid.UUID) -> Tuple[str, datetime]:
+        """签发下载URL，下载时以原始文件名作为附件名"""
+        record = await self._get(file_id)
+        if record.status != FileStatus.UPLOADED.value:
+            raise NotFoundError(f"文件尚未上传完成: {file_id}")
+        disposition = f"attachment; filename*=UTF-8''{quote(record.filename)}"
+        url = await self._cos.presign_url(record.key, method="GET", params={"response-content-disposition": disposition})
+        return url, self._expires_at()
+
+    async def open_content(self, file_id: uuid.UUID) -> Tuple[FileModel, Optional[CachedObject]]:
+        """读取文件内容：经本机磁盘缓存获取本地文件，缓存未开启或对象超出缓存上限时返回None，调用方从COS流式读取
+
+        回源期间不占用数据库连接。
+        """
+        record = await self._get(file_id)
+        if record.status != FileStatus.UPLOADED.value:
+            raise NotFoundError(f"文件尚未上传完成: {file_id}")
+        # 归还连接前从会话中移除，避免连接归还时属性被过期
+        self._session.expunge(record)
+        await self._session.release(commit=False)
+        if not self._settings.COS_DISK_CACHE_ENABLED:
+            return record, None
+        return record, await get_cos_disk_cache().get(record.key)
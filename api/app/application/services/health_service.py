@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from core.config import Settings, get_settings
+from app.infrastructure.cache import SingleFlight
+from app.infrastructure.storage.cos import get_cos
+from app.infrastructure.storage.postgres import get_postgres
+from app.infrastructure.storage.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DependencyHealth:
+    """单个依赖的检查结果，status取值为ok/error/timeout"""
+    name: str
+    status: str
+    latency_ms: float
+    error: Optional[str] = None
+
+
+@dataclass
+class ReadinessReport:
+    """就绪检查结果，所有依赖均正常时ready为True"""
+    ready: bool
+    checked_at: float
+    dependencies: List[DependencyHealth] = field(default_factory=list)
+    cached: bool = False
+    draining: bool = False
+
+
+class HealthService:
+    """依赖健康检查服务，并发检查各依赖、单独限时，并在短时间内缓存检查结果"""
+
+    def __init__(self):
+        """构造函数，完成配置获取"""
+        self._settings: Settings = get_settings()
+        self._singleflight = SingleFlight()
+        self._report: Optional[ReadinessReport] = None
+        self._report_expires_at = 0.0
+        self._draining = False
+
+    def mark_draining(self) -> None:
+        """进入排空状态，之后就绪检查始终失败，负载均衡据此摘除流量"""
+        self._draining = True
+
+    def _checks(self) -> Dict[str, Callable[[], Awaitable[None]]]:
+        checks: Dict[str, Callable[[], Awaitable[None]]] = {
+            "redis": self._check_redis,
+            "postgres": get_postgres().ping,
+        }
+        if self._settings.HEALTH_CHECK_COS:
+            checks["cos"] = get_cos().head_bucket
+        return checks
+
+    @staticmethod
+    async def _check_redis() -> None:
+        if not await get_redis_client().is_alive():
+            raise RuntimeError("Redis ping失败")
+
+    async def _check(self, name: str, check: Callable[[], Awaitable[None]]) -> DependencyHealth:
+        """执行单个依赖检查，超时或异常都转换为检查结果而不是向上抛出"""
+        started_at = time.perf_counter()
+        try:
+            async with asyncio.timeout(self._settings.HEALTH_CHECK_TIMEOUT):
+                await check()
+            status, error = "ok", None
+        except TimeoutError:
+            status, error = "timeout", f"超过{self._settings.HEALTH_CHECK_TIMEOUT}s未响应"
+        except Exception as e:
+            status, error = "error", str(e) or e.__class__.__name__
+        latency_ms = round((time.perf_counter() - started_at) * 1000, 2)
+        if error is not None:
+            logger.warning(f"依赖检查失败: {name}, 状态: {status}, 原因: {error}")
+        return DependencyHealth(name=name, status=status, latency_ms=latency_ms, error=error)
+
+    async def _run_checks(self) -> ReadinessReport:
+        # 1.并发检查所有依赖，总耗时取决于最慢的依赖且不超过单个超时时间
+        dependencies = await asyncio.gather(*[self._check(name, check) for name, check in self._checks().items()])
+
+        # 2.缓存检查结果
+        report = ReadinessReport(
+            ready=all(dependency.status == "ok" for dependency in dependencies),
+            checked_at=time.time(),
+            dependencies=list(dependencies),
+        )
+        self._report = report
+        self._report_expires_at = time.monotonic() + self._settings.HEALTH_CHECK_CACHE_TTL
+        return report
+
+    async def readiness(self) -> ReadinessReport:
+        """就绪检查，缓存有效期内直接返回上次结果，并发的探针共享同一次检查"""
+        if self._draining:
+            return ReadinessReport(ready=False, checked_at=time.time(), draining=True)
+        report = self._report
+        if report is not None and time.monotonic() < self._report_expires_at:
+            return ReadinessReport(
+                ready=report.ready,
+                checked_at=report.checked_at,
+                dependencies=report.dependencies,
+                cached=True,
+            )
+        return await self._singleflight.do("readiness", self._run_checks)
+
+
+@lru_cache()
+def get_health_service() -> HealthService:
+    """使用lru_cache实现单例模式，获取健康检查服务"""
+    return HealthService()
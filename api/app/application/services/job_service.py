@@ -0,0 +1,72 @@
+import importlib
+import logging
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from core.config import get_settings
+from app.application.errors.exceptions import BadRequestError, NotFoundError
+from app.domain.model.job import Job
+from app.infrastructure.queue import JobQueue, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+# 任务处理函数：接收payload，返回可JSON序列化的结果
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(name: str) -> Callable[[JobHandler], JobHandler]:
+    """注册任务处理函数
+
+    @job_handler("demo.summary")
+    async def summarize_demos(payload: dict) -> dict: ...
+    """
+
+    def decorator(func: JobHandler) -> JobHandler:
+        if name in _handlers and _handlers[name] is not func:
+            raise ValueError(f"任务处理函数重复注册: {name}")
+        _handlers[name] = func
+        return func
+
+    return decorator
+
+
+def get_job_handler(name: str) -> Optional[JobHandler]:
+    return _handlers.get(name)
+
+
+def load_job_handlers(modules: Iterable[str]) -> None:
+    """导入任务处理函数所在的模块，完成注册"""
+    for module in modules:
+        importlib.import_module(module)
+    logger.info(f"任务处理函数加载完成: {sorted(_handlers)}")
+
+
+class JobService:
+    """后台任务服务，API进程通过它投递任务与查询任务状态，任务由独立的worker进程执行"""
+
+    def __init__(self, queue: Optional[JobQueue] = None):
+        self._queue = queue or get_job_queue()
+        # 投递时需要校验任务类型，API进程同样导入处理函数模块
+        load_job_handlers(get_settings().JOB_HANDLER_MODULES)
+
+    async def submit(self, name: str, payload: Optional[Dict[str, Any]] = None, max_attempts: Optional[int] = None) -> Job:
+        """投递任务，API进程中只校验任务类型是否已注册，不执行任务"""
+        if get_job_handler(name) is None:
+            raise BadRequestError(f"未知的任务类型: {name}")
+        job = await self._queue.enqueue(name, payload, max_attempts=max_attempts)
+        logger.info(f"任务已投递: {job.name} {job.id}")
+        return job
+
+    async def get(self, job_id: str) -> Job:
+        job = await self._queue.get(job_id)
+        if job is None:
+            raise NotFoundError(f"任务不存在或已过期: {job_id}")
+        return job
+
+
+@lru_cache()
+def get_job_service() -> JobService:
+    """使用lru_cache实现单例模式，获取任务服务"""
+    return JobService()
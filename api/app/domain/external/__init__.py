@@ -0,0 +1,9 @@
+from .llm import LLM, LLMChunk, LLMResult, LLMUsage, Message
+
+__all__ = [
+    "LLM",
+    "LLMChunk",
+    "LLMResult",
+    "LLMUsage",
+    "Message",
+]
@@ -0,0 +1,62 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+# OpenAI格式的对话消息: {"role": "user", "content": "..."}
+Message = Dict[str, Any]
+
+
+@dataclass
+class LLMUsage:
+    """单次调用的token用量"""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass
+class LLMResult:
+    """非流式调用结果，cached表示结果来自响应缓存"""
+    content: str
+    model: str
+    finish_reason: Optional[str] = None
+    usage: Optional[LLMUsage] = None
+    cached: bool = False
+
+
+@dataclass
+class LLMChunk:
+    """流式调用的增量输出，最后一个分片不含内容，只携带finish_reason与用量"""
+    content: str = ""
+    finish_reason: Optional[str] = None
+    usage: Optional[LLMUsage] = None
+    cached: bool = False
+
+
+class LLM(ABC):
+    """大语言模型调用接口"""
+
+    @abstractmethod
+    async def chat(
+            self,
+            messages: List[Message],
+            model: Optional[str] = None,
+            use_cache: bool = True,
+            **params: Any,
+    ) -> LLMResult:
+        """非流式对话补全，params为temperature、max_tokens等模型参数"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream(
+            self,
+            messages: List[Message],
+            model: Optional[str] = None,
+            use_cache: bool = True,
+            **params: Any,
+    ) -> AsyncIterator[LLMChunk]:
+        """流式对话补全，逐个返回增量输出"""
+        raise NotImplementedError
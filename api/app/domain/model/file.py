@@ -0,0 +1,37 @@
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional
+
+
+class FileStatus(str, Enum):
+    """文件状态：创建上传时为pending，客户端直传完成并经回调确认后为uploaded"""
+    PENDING = "pending"
+    UPLOADED = "uploaded"
+
+
+@dataclass
+class PresignedPart:
+    """分块上传的单个分块，客户端以PUT方式上传，需携带headers中的请求头"""
+    part_number: int
+    url: str
+    size: int
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class UploadTicket:
+    """直传凭证：小文件使用url单次PUT上传；大文件使用upload_id与parts分块上传，完成后回调时提交各分块的ETag"""
+    file_id: uuid.UUID
+    key: str
+    expires_at: datetime
+    url: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    upload_id: Optional[str] = None
+    part_size: Optional[int] = None
+    parts: List[PresignedPart] = field(default_factory=list)
+
+    @property
+    def multipart(self) -> bool:
+        return self.upload_id is not None
@@ -0,0 +1,34 @@
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, Optional
+
+
+class JobStatus(str, Enum):
+    """任务状态"""
+    PENDING = "pending"
+    RUNNING = "running"
+    RETRYING = "retrying"
+    SUCCEEDED = "succeeded"
+    DEAD = "dead"
+
+    @property
+    def finished(self) -> bool:
+        """是否为终态，终态任务被重复投递时直接确认"""
+        return self in (JobStatus.SUCCEEDED, JobStatus.DEAD)
+
+
+@dataclass
+class Job:
+    """后台任务，name对应注册的任务处理函数，payload与result均需可JSON序列化"""
+    name: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    max_attempts: int = 3
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.PENDING
+    attempts: int = 0
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
@@ -0,0 +1,3 @@
+from .base import BulkRepository, BulkWriteResult, Page
+
+__all__ = ["BulkRepository", "BulkWriteResult", "Page"]
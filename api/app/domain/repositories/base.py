@@ -0,0 +1,51 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Generic, Iterable, List, Mapping, Optional, Sequence, TypeVar
+
+T = TypeVar('T')
+
+
+@dataclass
+class BulkWriteResult:
+    """批量写入结果，包含写入行数与吞吐"""
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float(self.rows)
+
+
+@dataclass
+class Page(Generic[T]):
+    """游标分页结果，next_cursor为下一页的不透明游标，没有更多数据时为None"""
+    items: List[T]
+    next_cursor: Optional[str]
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+class BulkRepository(ABC, Generic[T]):
+    """支持批量读写的仓储接口"""
+
+    @abstractmethod
+    async def get_many(self, ids: Sequence[Any]) -> List[T]:
+        """按主键批量查询"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def bulk_insert(self, rows: Iterable[Mapping[str, Any]]) -> BulkWriteResult:
+        """批量插入"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def bulk_upsert(
+            self,
+            rows: Iterable[Mapping[str, Any]],
+            conflict_columns: Optional[Sequence[str]] = None,
+            update_columns: Optional[Sequence[str]] = None,
+    ) -> BulkWriteResult:
+        """批量插入，主键(或指定列)冲突时更新"""
+        raise NotImplementedError
@@ -0,0 +1,28 @@
+from .cache import CacheManager, CacheStats, TwoTierCache, cached, get_cache_manager
+from .disk_cache import CachedObject, CosDiskCache, DiskCacheStats, get_cos_disk_cache
+from .local import LocalCache
+from .response_cache import CachedResponse, ResponseCacheStore, compute_etag, etag_matches, get_response_cache
+from .serializer import JsonSerializer, PickleSerializer, Serializer
+from .singleflight import SingleFlight
+
+__all__ = [
+    "CacheManager",
+    "CacheStats",
+    "TwoTierCache",
+    "cached",
+    "get_cache_manager",
+    "CachedObject",
+    "CosDiskCache",
+    "DiskCacheStats",
+    "get_cos_disk_cache",
+    "LocalCache",
+    "CachedResponse",
+    "ResponseCacheStore",
+    "compute_etag",
+    "etag_matches",
+    "get_response_cache",
+    "JsonSerializer",
+    "PickleSerializer",
+    "Serializer",
+    "SingleFlight",
+]
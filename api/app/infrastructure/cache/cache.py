@@ -0,0 +1,394 @@
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import asdict, dataclass
+from functools import lru_cache, wraps
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.config import Settings, get_settings
+from app.infrastructure.storage.redis import RedisClient, get_redis_client
+from app.infrastructure.storage.redis_lock import RedisLock
+from .local import LocalCache
+from .serializer import JsonSerializer, Serializer
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# 负缓存在Redis中的占位值，用于区分"不存在"与"未缓存"
+_NEGATIVE_MARKER = "__minimus_cache_none__"
+
+# pub/sub轮询消息的等待时间(秒)，超时返回None属于正常空转
+_PUBSUB_POLL_TIMEOUT = 1.0
+
+
+@dataclass
+class CacheStats:
+    """缓存命中统计"""
+    local_hits: int = 0
+    redis_hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    load_errors: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """总命中率(本地+Redis)"""
+        total = self.local_hits + self.redis_hits + self.misses
+        return (self.local_hits + self.redis_hits) / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "hit_ratio": round(self.hit_ratio, 4)}
+
+
+class TwoTierCache:
+    """两级缓存：先查进程内LRU，再查Redis，最后调用loader回源，失效消息通过Redis pub/sub广播到所有worker"""
+
+    def __init__(
+            self,
+            manager: "CacheManager",
+            namespace: str,
+            local_max_size: int,
+            local_ttl: float,
+            redis_ttl: int,
+            negative_ttl: int,
+            serializer: Serializer,
+    ):
+        """构造函数，一般通过CacheManager.get_cache()创建"""
+        self._manager = manager
+        self.namespace = namespace
+        self._local = LocalCache(max_size=local_max_size, ttl=local_ttl)
+        self._local_ttl = local_ttl
+        self._redis_ttl = redis_ttl
+        self._negative_ttl = negative_ttl
+        self._serializer = serializer
+        self.stats = CacheStats()
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self._manager.key_prefix}:{self.namespace}:{key}"
+
+    @property
+    def _redis(self) -> RedisClient:
+        return self._manager.redis
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        """查询缓存，返回(是否命中, 值)，命中负缓存时值为None"""
+        # 1.查询进程内缓存
+        hit, value = self._local.get(key)
+        if hit:
+            self.stats.local_hits += 1
+            if value is None:
+                self.stats.negative_hits += 1
+            return True, value
+
+        # 2.查询Redis
+        hit, value = await self._get_remote(key)
+        if not hit:
+            self.stats.misses += 1
+        return hit, value
+
+    async def _get_remote(self, key: str) -> Tuple[bool, Any]:
+        """查询Redis，命中后回填本地缓存"""
+        data = await self._redis.get(self._redis_key(key))
+        if data is None:
+            return False, None
+
+        self.stats.redis_hits += 1
+        if data == _NEGATIVE_MARKER:
+            self.stats.negative_hits += 1
+            self._local.set(key, None, ttl=min(self._local_ttl, self._negative_ttl))
+            return True, None
+
+        value = self._serializer.loads(data)
+        self._local.set(key, value)
+        return True, value
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """批量查询缓存，本地未命中的key通过一次MGET查询Redis，只返回命中的条目"""
+        result: Dict[str, Any] = {}
+        remote_keys = []
+        for key in keys:
+            hit, value = self._local.get(key)
+            if hit:
+                self.stats.local_hits += 1
+                result[key] = value
+            else:
+                remote_keys.append(key)
+
+        if remote_keys:
+            values = await self._redis.mget([self._redis_key(key) for key in remote_keys])
+            for key, data in zip(remote_keys, values):
+                if data is None:
+                    self.stats.misses += 1
+                    continue
+                self.stats.redis_hits += 1
+                value = None if data == _NEGATIVE_MARKER else self._serializer.loads(data)
+                self._local.set(key, value)
+                result[key] = value
+        return result
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """写入两级缓存，value为None时写入负缓存"""
+        if value is None:
+            await self._redis.set(self._redis_key(key), _NEGATIVE_MARKER, ex=self._negative_ttl)
+            self._local.set(key, None, ttl=min(self._local_ttl, self._negative_ttl))
+            return
+
+        await self._redis.set(self._redis_key(key), self._serializer.dumps(value), ex=ttl or self._redis_ttl)
+        self._local.set(key, value)
+
+    async def get_or_load(
+            self,
+            key: str,
+            loader: Callable[[], Awaitable[Any]],
+            ttl: Optional[int] = None,
+    ) -> Any:
+        """查询缓存，未命中时调用loader回源并回写缓存，loader返回None时写入负缓存
+
+        并发未命中时，同一worker内通过单飞合并为一次调用，集群内通过分布式锁保证只有一个worker回源
+        """
+        hit, value = await self.get(key)
+        if hit:
+            return value
+        return await self._manager.singleflight.do(
+            f"{self.namespace}:{key}", lambda: self._load(key, loader, ttl)
+        )
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[int]) -> Any:
+        """持有分布式锁回源；等锁超时后复查缓存并继续等待，不绕过锁直接回源，避免慢回源时击穿"""
+        lock = RedisLock(self._redis, f"{self._redis_key(key)}:lock", lease_ms=self._manager.lock_lease_ms)
+        # 1.持锁者回源期间会持续续期，持锁者退出或锁过期后等待者才能拿到锁
+        while not await lock.acquire(timeout=self._manager.lock_wait_timeout):
+            hit, value = await self._get_remote(key)
+            if hit:
+                return value
+            logger.warning(f"等待缓存回源锁超时，复查缓存未命中，继续等待: {self.namespace}:{key}")
+
+        try:
+            # 2.其他worker可能已在等锁期间完成回源，二次检查Redis
+            hit, value = await self._get_remote(key)
+            if hit:
+                return value
+
+            # 3.回源并回写缓存
+            self.stats.loads += 1
+            try:
+                value = await loader()
+            except Exception:
+                self.stats.load_errors += 1
+                raise
+            await self.set(key, value, ttl=ttl)
+            return value
+        finally:
+            await lock.release()
+
+    async def invalidate(self, *keys: str) -> None:
+        """删除两级缓存并通知其他worker清理本地缓存"""
+        if not keys:
+            return
+        for key in keys:
+            self._local.delete(key)
+        await self._redis.delete_many([self._redis_key(key) for key in keys])
+        await self._manager.publish_invalidation(self.namespace, list(keys))
+
+    async def clear(self) -> None:
+        """清空当前命名空间的全部缓存"""
+        self._local.clear()
+        batch = []
+        async for redis_key in self._redis.scan_iter(match=self._redis_key("*")):
+            batch.append(redis_key)
+            if len(batch) >= 500:
+                await self._redis.delete_many(batch)
+                batch = []
+        await self._redis.delete_many(batch)
+        await self._manager.publish_invalidation(self.namespace, None)
+
+    def invalidate_local(self, keys: Optional[Iterable[str]]) -> None:
+        """只清理本地缓存，keys为None时清空"""
+        if keys is None:
+            self._local.clear()
+            return
+        for key in keys:
+            self._local.delete(key)
+
+
+class CacheManager:
+    """缓存管理器，维护各命名空间的两级缓存，并通过一个pub/sub订阅接收跨worker的失效消息"""
+
+    def __init__(self):
+        """构造函数，完成配置获取"""
+        self._settings: Settings = get_settings()
+        self._redis: Optional[RedisClient] = None
+        self._caches: Dict[str, TwoTierCache] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self.singleflight = SingleFlight()
+        # 当前worker的唯一标识，用于忽略自己发出的失效消息
+        self._instance_id = uuid.uuid4().hex
+
+    @property
+    def key_prefix(self) -> str:
+        return self._settings.CACHE_KEY_PREFIX
+
+    @property
+    def lock_lease_ms(self) -> int:
+        return self._settings.CACHE_LOCK_LEASE_MS
+
+    @property
+    def lock_wait_timeout(self) -> float:
+        return self._settings.CACHE_LOCK_WAIT_TIMEOUT
+
+    @property
+    def redis(self) -> RedisClient:
+        """只读属性，返回Redis客户端"""
+        if self._redis is None:
+            raise RuntimeError("缓存管理器未初始化，请调用init()完成初始化")
+        return self._redis
+
+    async def init(self) -> None:
+        """初始化缓存管理器，启动失效消息订阅任务"""
+        if self._redis is not None:
+            logger.warning("缓存管理器已初始化，无需重复操作")
+            return
+        self._redis = get_redis_client()
+        self._listener = asyncio.create_task(self._listen(), name="cache-invalidation-listener")
+        logger.info("缓存管理器初始化成功")
+
+    async def shutdown(self) -> None:
+        """关闭缓存管理器"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._caches.clear()
+        self._redis = None
+        logger.info("缓存管理器已关闭")
+
+        get_cache_manager.cache_clear()
+
+    def get_cache(
+            self,
+            namespace: str,
+            local_max_size: Optional[int] = None,
+            local_ttl: Optional[float] = None,
+            redis_ttl: Optional[int] = None,
+            negative_ttl: Optional[int] = None,
+            serializer: Optional[Serializer] = None,
+    ) -> TwoTierCache:
+        """获取(或创建)指定命名空间的两级缓存，未传入的参数使用Settings中的默认值"""
+        cache = self._caches.get(namespace)
+        if cache is None:
+            cache = TwoTierCache(
+                manager=self,
+                namespace=namespace,
+                local_max_size=local_max_size if local_max_size is not None else self._settings.CACHE_LOCAL_MAX_SIZE,
+                local_ttl=local_ttl if local_ttl is not None else self._settings.CACHE_LOCAL_TTL,
+                redis_ttl=redis_ttl if redis_ttl is not None else self._settings.CACHE_REDIS_TTL,
+                negative_ttl=negative_ttl if negative_ttl is not None else self._settings.CACHE_NEGATIVE_TTL,
+                serializer=serializer or JsonSerializer(),
+            )
+            self._caches[namespace] = cache
+        return cache
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """返回各命名空间的命中统计"""
+        return {namespace: cache.stats.to_dict() for namespace, cache in self._caches.items()}
+
+    async def publish_invalidation(self, namespace: str, keys: Optional[List[str]]) -> None:
+        """广播失效消息，keys为None表示清空整个命名空间"""
+        message = json.dumps({"origin": self._instance_id, "namespace": namespace, "keys": keys})
+        await self.redis.client.publish(self._settings.CACHE_INVALIDATION_CHANNEL, message)
+
+    def _handle_message(self, data: str) -> None:
+        payload = json.loads(data)
+        if payload.get("origin") == self._instance_id:
+            return
+        cache = self._caches.get(payload.get("namespace"))
+        if cache is not None:
+            cache.invalidate_local(payload.get("keys"))
+
+    def _invalidate_all_local(self) -> None:
+        for cache in self._caches.values():
+            cache.invalidate_local(None)
+
+    async def _listen(self) -> None:
+        """订阅失效频道，断线后自动重连
+
+        以get_message(timeout=...)轮询，空闲超时只是正常的空转，不会断开连接；只有真正断线时才清空本地缓存。
+        """
+        channel = self._settings.CACHE_INVALIDATION_CHANNEL
+        reconnecting = False
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(channel)
+                # 重新订阅成功后再清空一次，断线期间写入本地缓存的数据可能已被其他worker更新
+                if reconnecting:
+                    self._invalidate_all_local()
+                    reconnecting = False
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=_PUBSUB_POLL_TIMEOUT)
+                    if message is None:
+                        continue
+                    try:
+                        self._handle_message(message["data"])
+                    except Exception as e:
+                        logger.warning(f"缓存失效消息处理失败: {str(e)}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 断线期间可能错过失效消息，清空本地缓存保证一致性
+                logger.warning(f"缓存失效订阅断开，1秒后重连: {str(e)}")
+                self._invalidate_all_local()
+                reconnecting = True
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+@lru_cache()
+def get_cache_manager() -> CacheManager:
+    """使用lru_cache实现单例模式，获取缓存管理器"""
+    return CacheManager()
+
+
+def _default_key(func: Callable[..., Any], args: tuple, kwargs: dict) -> str:
+    """根据函数名与参数生成缓存key，参数过长时取哈希"""
+    raw = json.dumps([args, sorted(kwargs.items())], ensure_ascii=False, default=str, separators=(",", ":"))
+    if len(raw) > 128:
+        raw = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return f"{func.__module__}.{func.__qualname__}:{raw}"
+
+
+def cached(
+        namespace: str,
+        key: Optional[Callable[..., str]] = None,
+        ttl: Optional[int] = None,
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """两级缓存装饰器，用于异步函数，缓存实例在调用时才从CacheManager获取
+
+    @cached("demo", key=lambda demo_id: str(demo_id))
+    async def get_demo(demo_id: uuid.UUID) -> dict: ...
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        def build_key(*args: Any, **kwargs: Any) -> str:
+            return key(*args, **kwargs) if key is not None else _default_key(func, args, kwargs)
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            cache = get_cache_manager().get_cache(namespace)
+            return await cache.get_or_load(build_key(*args, **kwargs), lambda: func(*args, **kwargs), ttl=ttl)
+
+        async def invalidate(*args: Any, **kwargs: Any) -> None:
+            """按调用参数失效对应的缓存"""
+            await get_cache_manager().get_cache(namespace).invalidate(build_key(*args, **kwargs))
+
+        wrapper.invalidate = invalidate
+        return wrapper
+
+    return decorator
@@ -0,0 +1,340 @@
+import asyncio
+import errno
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import Settings, get_settings
+from app.infrastructure.metrics import get_metrics_registry
+from app.infrastructure.storage.cos import Cos, get_cos
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# 命中时刷新文件mtime作为LRU访问时间，间隔内重复命中不再刷新，减少元数据写入
+_TOUCH_INTERVAL = 60.0
+
+# 进程崩溃遗留的临时文件超过该时间(秒)后清理
+_STALE_TMP_SECONDS = 3600.0
+
+# 回源锁按key哈希的前3位分条带，锁文件最多4096个，不随key数量增长；不同key落在同一条带时回源串行执行
+_LOCK_STRIPE_DIGITS = 3
+
+
+@dataclass
+class CachedObject:
+    """本地缓存的COS对象，path为可直接读取或以FileResponse返回的本地文件"""
+    key: str
+    path: Path
+    size: int
+    etag: str
+    content_type: str
+    validated_at: float
+
+
+@dataclass
+class DiskCacheStats:
+    """磁盘缓存命中统计(当前进程)"""
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """命中率，经ETag校验仍有效的条目也计为命中"""
+        total = self.hits + self.revalidated + self.misses
+        return (self.hits + self.revalidated) / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "hit_ratio": round(self.hit_ratio, 4)}
+
+
+class CosDiskCache:
+    """COS对象的本地磁盘读穿缓存
+
+    - 对象按key的sha256存放在 objects/xx/<hash>，元数据(ETag、大小、校验时间)存放在同名.meta文件
+    - 写入先落临时文件再os.replace原子替换，正在读取旧文件的连接不受影响，同一主机的多个worker可共享目录
+    - 同一key的并发回源：进程内通过SingleFlight合并，进程间通过flock文件锁合并，锁文件按key哈希分条带复用
+    - 条目在COS_DISK_CACHE_REVALIDATE_AFTER秒内直接使用，超时后HEAD比对ETag，不一致时重新下载
+    - 命中时刷新文件mtime，超出容量时按mtime从旧到新淘汰，淘汰由持有淘汰锁的单个worker执行
+    """
+
+    def __init__(self, cos: Optional[Cos] = None):
+        """构造函数，完成配置获取与指标注册"""
+        self._settings: Settings = get_settings()
+        self._cos = cos or get_cos()
+        self._root = Path(self._settings.COS_DISK_CACHE_DIR)
+        self._objects = self._root / "objects"
+        self._locks = self._root / "locks"
+        self._tmp = self._root / "tmp"
+        self._flight = SingleFlight()
+        self.stats = DiskCacheStats()
+        self._written_since_evict = 0
+        self._last_evict_at = 0.0
+        self._evict_task: Optional[asyncio.Task] = None
+
+        registry = get_metrics_registry()
+        self._requests = registry.counter("cos_disk_cache_total", "COS磁盘缓存查询次数", ("result",))
+        self._evicted = registry.counter("cos_disk_cache_evictions_total", "COS磁盘缓存淘汰的对象数")
+        self._bytes = registry.gauge("cos_disk_cache_bytes", "COS磁盘缓存当前占用字节数(最近一次扫描)")
+
+    async def init(self) -> None:
+        """创建缓存目录并在后台执行一次容量检查"""
+        for directory in (self._objects, self._locks, self._tmp):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._schedule_evict(force=True)
+        logger.info(f"COS磁盘缓存初始化成功: {self._root}")
+
+    async def shutdown(self) -> None:
+        """等待进行中的淘汰任务结束"""
+        if self._evict_task is not None:
+            await asyncio.gather(self._evict_task, return_exceptions=True)
+            self._evict_task = None
+        logger.info(f"COS磁盘缓存已关闭: {self.stats.to_dict()}")
+
+        get_cos_disk_cache.cache_clear()
+
+    def _paths(self, key: str) -> Tuple[Path, Path, Path]:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        directory = self._objects / digest[:2]
+        lock_path = self._locks / f"{digest[:_LOCK_STRIPE_DIGITS]}.lock"
+        return directory / digest, directory / f"{digest}.meta", lock_path
+
+    def _lookup(self, key: str) -> Optional[CachedObject]:
+        """读取条目元数据并确认数据文件完整，元数据文件很小且通常在页缓存中，直接在事件循环中读取"""
+        path, meta_path, _ = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_bytes())
+            stat = path.stat()
+        except (FileNotFoundError, ValueError):
+            return None
+        if meta.get("key") != key or stat.st_size != meta.get("size"):
+            return None
+        # 刷新LRU访问时间
+        if time.time() - stat.st_mtime > _TOUCH_INTERVAL:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                return None
+        return CachedObject(
+            key=key,
+            path=path,
+            size=meta["size"],
+            etag=meta["etag"],
+            content_type=meta.get("content_type", ""),
+            validated_at=meta["validated_at"],
+        )
+
+    def _is_fresh(self, entry: CachedObject) -> bool:
+        return time.time() - entry.validated_at < self._settings.COS_DISK_CACHE_REVALIDATE_AFTER
+
+    def _write_meta(self, entry: CachedObject) -> None:
+        _, meta_path, _ = self._paths(entry.key)
+        tmp = self._tmp / f"{uuid.uuid4().hex}.meta"
+        tmp.write_bytes(json.dumps({
+            "key": entry.key,
+            "size": entry.size,
+            "etag": entry.etag,
+            "content_type": entry.content_type,
+            "validated_at": entry.validated_at,
+        }).encode("utf-8"))
+        os.replace(tmp, meta_path)
+
+    def _count(self, result: str) -> None:
+        setattr(self.stats, result, getattr(self.stats, result) + 1)
+        self._requests.inc((result,))
+
+    async def get(self, key: str) -> Optional[CachedObject]:
+        """读穿获取对象的本地文件，对象超过COS_DISK_CACHE_MAX_OBJECT_SIZE时不缓存，返回None，调用方应直接从COS流式读取"""
+        entry = self._lookup(key)
+        if entry is not None and self._is_fresh(entry):
+            self._count("hits")
+            return entry
+        return await self._flight.do(key, lambda: self._fill(key))
+
+    async def read(self, key: str) -> bytes:
+        """读取对象内容，优先从本地缓存读取"""
+        entry = await self.get(key)
+        if entry is None:
+            return await self._cos.get_object(key)
+        return await asyncio.to_thread(entry.path.read_bytes)
+
+    async def invalidate(self, key: str) -> None:
+        """删除本地缓存条目，对象在COS中被覆盖或删除后调用"""
+        path, meta_path, _ = self._paths(key)
+        meta_path.unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+
+    async def _fill(self, key: str) -> Optional[CachedObject]:
+        """持有跨进程文件锁回源，获得锁后先复查条目，其他worker可能已经完成下载或校验"""
+        from qcloud_cos.cos_exception import CosServiceError
+
+        _, _, lock_path = self._paths(key)
+        lock_fd = await self._acquire_lock(lock_path)
+        try:
+            # 1.复查条目，仍有效时直接使用
+            entry = self._lookup(key)
+            if entry is not None and self._is_fresh(entry):
+                self._count("hits")
+                return entry
+
+            # 2.条目已过校验期，ETag一致时只刷新校验时间
+            if entry is not None:
+                try:
+                    head = await self._cos.head_object(key)
+                except CosServiceError as e:
+                    if e.get_status_code() == 404:
+                        await self.invalidate(key)
+                    raise
+                if head.get("ETag", "").strip('"') == entry.etag:
+                    entry.validated_at = time.time()
+                    await asyncio.to_thread(self._write_meta, entry)
+                    self._count("revalidated")
+                    return entry
+
+            # 3.下载到临时文件后原子替换
+            return await self._download(key)
+        finally:
+            os.close(lock_fd)
+
+    async def _download(self, key: str) -> Optional[CachedObject]:
+        path, _, _ = self._paths(key)
+        tmp = self._tmp / uuid.uuid4().hex
+        try:
+            headers = await self._cos.download_to_file(key, str(tmp), max_size=self._settings.COS_DISK_CACHE_MAX_OBJECT_SIZE)
+            if headers is None:
+                self._count("bypassed")
+                return None
+            size = tmp.stat().st_size
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+        # 数据文件先于元数据替换，读取方以大小校验两者是否匹配
+        entry = CachedObject(
+            key=key,
+            path=path,
+            size=size,
+            etag=headers.get("ETag", "").strip('"'),
+            content_type=headers.get("Content-Type", ""),
+            validated_at=time.time(),
+        )
+        await asyncio.to_thread(self._write_meta, entry)
+        self._count("misses")
+        self._written_since_evict += size
+        self._schedule_evict()
+        return entry
+
+    @staticmethod
+    async def _acquire_lock(lock_path: Path) -> int:
+        """以非阻塞方式轮询获取flock，不占用线程池线程等待"""
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        delay = 0.01
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.2)
+            except BaseException:
+                os.close(fd)
+                raise
+
+    def _schedule_evict(self, force: bool = False) -> None:
+        """写入量超过容量的5%或距上次检查超过COS_DISK_CACHE_EVICT_INTERVAL时，在后台线程中检查容量"""
+        if self._evict_task is not None and not self._evict_task.done():
+            return
+        elapsed = time.monotonic() - self._last_evict_at
+        if not force and elapsed < self._settings.COS_DISK_CACHE_EVICT_INTERVAL \
+                and self._written_since_evict < self._settings.COS_DISK_CACHE_MAX_BYTES * 0.05:
+            return
+        self._last_evict_at = time.monotonic()
+        self._written_since_evict = 0
+        self._evict_task = asyncio.create_task(self._run_evict(), name="cos-disk-cache-evict")
+
+    async def _run_evict(self) -> None:
+        try:
+            result = await asyncio.to_thread(self._evict)
+        except Exception as e:
+            logger.warning(f"COS磁盘缓存淘汰失败: {str(e)}")
+            return
+        if result is None:
+            return
+        total, evicted = result
+        self._bytes.set((), total)
+        if evicted:
+            self.stats.evictions += evicted
+            self._evicted.inc((), evicted)
+
+    def _evict(self) -> Optional[Tuple[int, int]]:
+        """扫描缓存目录，超出容量时按mtime从旧到新删除，返回(剩余字节数, 淘汰数)；其他worker正在淘汰时返回None"""
+        lock_fd = os.open(self._locks / "evict.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+
+            # 1.清理进程崩溃遗留的临时文件
+            now = time.time()
+            for entry in os.scandir(self._tmp):
+                try:
+                    if now - entry.stat().st_mtime > _STALE_TMP_SECONDS:
+                        os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+
+            # 2.统计数据文件，元数据文件体积可忽略
+            files: List[Tuple[float, int, str]] = []
+            total = 0
+            for directory in os.scandir(self._objects):
+                if not directory.is_dir():
+                    continue
+                for entry in os.scandir(directory.path):
+                    if entry.name.endswith(".meta"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            if total <= self._settings.COS_DISK_CACHE_MAX_BYTES:
+                return total, 0
+
+            # 3.按最近访问时间从旧到新淘汰；已打开的文件删除后仍可读完，不影响正在发送的响应
+            target = self._settings.COS_DISK_CACHE_MAX_BYTES * self._settings.COS_DISK_CACHE_LOW_WATERMARK
+            evicted = 0
+            for _, size, path in sorted(files):
+                if total <= target:
+                    break
+                for name in (f"{path}.meta", path):
+                    try:
+                        os.unlink(name)
+                    except OSError as e:
+                        if e.errno != errno.ENOENT:
+                            raise
+                total -= size
+                evicted += 1
+            logger.info(f"COS磁盘缓存淘汰{evicted}个对象，剩余{total}字节")
+            return total, evicted
+        finally:
+            os.close(lock_fd)
+
+
+@lru_cache()
+def get_cos_disk_cache() -> CosDiskCache:
+    """使用lru_cache实现单例模式，获取COS磁盘缓存"""
+    return CosDiskCache()
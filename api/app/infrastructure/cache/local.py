@@ -0,0 +1,48 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class LocalCache:
+    """进程内LRU+TTL缓存，按容量淘汰最久未使用的条目，按过期时间惰性清理"""
+
+    def __init__(self, max_size: int, ttl: float):
+        """构造函数，max_size为最大条目数，ttl为默认过期时间(秒)"""
+        self._max_size = max_size
+        self._ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """获取缓存，返回(是否命中, 值)，值可能为None(负缓存)"""
+        item = self._data.get(key)
+        if item is None:
+            return False, None
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return False, None
+
+        # 命中后移到队尾，标记为最近使用
+        self._data.move_to_end(key)
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        if self._max_size <= 0:
+            return
+        self._data[key] = (time.monotonic() + (ttl if ttl is not None else self._ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """删除缓存"""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
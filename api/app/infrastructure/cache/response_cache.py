@@ -0,0 +1,109 @@
+import hashlib
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+
+from core.config import Settings, get_settings
+from app.infrastructure.storage.redis import RedisClient, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    """缓存的HTTP响应，headers不包含Content-Length与ETag，发送时重新生成"""
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    etag: str
+
+    def dumps(self) -> str:
+        """编码为"元数据JSON\\n响应体"，响应体无需再做一次JSON转义"""
+        meta = orjson.dumps({"status": self.status, "headers": self.headers, "etag": self.etag})
+        return f"{meta.decode('utf-8')}\n{self.body.decode('utf-8')}"
+
+    @classmethod
+    def loads(cls, data: str) -> "CachedResponse":
+        meta, _, body = data.partition("\n")
+        payload = orjson.loads(meta)
+        return cls(
+            status=payload["status"],
+            headers=[tuple(header) for header in payload["headers"]],
+            body=body.encode("utf-8"),
+            etag=payload["etag"],
+        )
+
+
+def compute_etag(body: bytes) -> str:
+    """根据响应体计算强ETag"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match使用弱比较：忽略W/前缀，支持多个ETag与*"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+class ResponseCacheStore:
+    """HTTP响应缓存的Redis存储，每个标签对应一个Set记录其下的缓存key，用于按标签批量失效"""
+
+    def __init__(self):
+        """构造函数，完成配置获取"""
+        self._settings: Settings = get_settings()
+        # 标签集合的过期时间取所有规则的最大TTL，保证不早于其中任何缓存条目过期
+        self._tag_ttl = max((rule.ttl for rule in self._settings.RESPONSE_CACHE_RULES), default=300)
+
+    @property
+    def _redis(self) -> RedisClient:
+        return get_redis_client()
+
+    def build_key(self, path: str, query_string: bytes, vary_values: Sequence[str]) -> str:
+        """按路径、规范化后的查询参数与vary请求头生成缓存key"""
+        query = "&".join(sorted(query_string.decode("latin-1").split("&"))) if query_string else ""
+        raw = "\n".join([query, *vary_values])
+        digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        return f"{self._settings.RESPONSE_CACHE_KEY_PREFIX}:resp:{path}:{digest}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self._settings.RESPONSE_CACHE_KEY_PREFIX}:tag:{tag}"
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        data = await self._redis.get(key)
+        return CachedResponse.loads(data) if data is not None else None
+
+    async def set(self, key: str, response: CachedResponse, ttl: int, tags: Iterable[str] = ()) -> None:
+        """写入缓存并登记到各标签集合，在一个pipeline中完成"""
+        async with self._redis.pipeline() as pipe:
+            pipe.set(key, response.dumps(), ex=ttl)
+            for tag in tags:
+                pipe.sadd(self._tag_key(tag), key)
+                pipe.expire(self._tag_key(tag), self._tag_ttl)
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """删除标签下的全部缓存条目，返回删除的条目数"""
+        deleted = 0
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            batch = []
+            async for key in self._redis.sscan_iter(tag_key):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += await self._redis.delete_many(batch)
+                    batch = []
+            deleted += await self._redis.delete_many(batch)
+            await self._redis.delete(tag_key)
+        logger.info(f"响应缓存按标签失效: {list(tags)}，删除{deleted}条")
+        return deleted
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCacheStore:
+    """使用lru_cache实现单例模式，获取响应缓存存储"""
+    return ResponseCacheStore()
@@ -0,0 +1,34 @@
+import base64
+import json
+import pickle
+from typing import Any, Protocol
+
+
+class Serializer(Protocol):
+    """缓存序列化协议，Redis客户端开启了decode_responses，因此序列化结果统一为str"""
+
+    def dumps(self, value: Any) -> str:
+        ...
+
+    def loads(self, data: str) -> Any:
+        ...
+
+
+class JsonSerializer:
+    """JSON序列化，适合dict/list等基础类型，默认使用"""
+
+    def dumps(self, value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+    def loads(self, data: str) -> Any:
+        return json.loads(data)
+
+
+class PickleSerializer:
+    """pickle序列化，支持任意Python对象，结果经base64编码后存储"""
+
+    def dumps(self, value: Any) -> str:
+        return base64.b64encode(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).decode("ascii")
+
+    def loads(self, data: str) -> Any:
+        return pickle.loads(base64.b64decode(data))
@@ -0,0 +1,29 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """进程内单飞：相同key的并发调用只执行一次，其余调用共享同一个结果"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """执行fn，若相同key已有调用在执行则直接等待其结果"""
+        task = self._inflight.get(key)
+        if task is None:
+            # 以独立任务执行，发起者被取消(如客户端断开)不会影响其他等待者
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 所有等待者都被取消时，避免出现未获取异常的警告
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,11 @@
+from .broker import END_EVENT, EventBroker, SessionEvent, Subscription, get_event_broker, is_stream_id, stream_id_key
+
+__all__ = [
+    "END_EVENT",
+    "EventBroker",
+    "SessionEvent",
+    "Subscription",
+    "get_event_broker",
+    "is_stream_id",
+    "stream_id_key",
+]
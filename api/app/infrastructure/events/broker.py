@@ -0,0 +1,264 @@
+import asyncio
+import logging
+import re
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from core.config import Settings, get_settings
+from app.infrastructure.metrics import get_metrics_registry
+from app.infrastructure.storage.redis import RedisClient, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 会话结束事件，SSE连接发送该事件后关闭
+END_EVENT = "end"
+
+# pub/sub轮询消息的等待时间(秒)，超时返回None属于正常空转
+_PUBSUB_POLL_TIMEOUT = 1.0
+
+# Stream消息ID格式: <毫秒时间戳>-<序号>，序号可省略
+_STREAM_ID_PATTERN = re.compile(r"\d+(-\d+)?")
+
+# 写入会话事件Stream并以同一个事件ID发布到频道，两步原子完成
+_PUBLISH_SCRIPT = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', 'event', ARGV[2], 'data', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('PUBLISH', KEYS[2], id .. '\\n' .. ARGV[2] .. '\\n' .. ARGV[3])
+return id
+"""
+
+
+@dataclass
+class SessionEvent:
+    """会话事件，id为Redis Stream消息ID，可作为SSE的事件ID用于断线续传"""
+    id: str
+    event: str
+    data: str
+
+
+def is_stream_id(event_id: str) -> bool:
+    """判断是否为合法的Stream消息ID"""
+    return _STREAM_ID_PATTERN.fullmatch(event_id) is not None
+
+
+def stream_id_key(event_id: str) -> Tuple[int, int]:
+    """Stream消息ID转换为可比较的元组"""
+    milliseconds, _, sequence = event_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+class Subscription:
+    """单个本地连接的订阅，事件经有界队列传递；队列写满说明客户端消费过慢，订阅被关闭"""
+
+    def __init__(self, session_id: str, maxsize: int):
+        self.session_id = session_id
+        self._queue: "asyncio.Queue[Optional[SessionEvent]]" = asyncio.Queue(maxsize=maxsize)
+        self.closed = False
+
+    def push(self, event: SessionEvent) -> bool:
+        """投递事件，队列已满时返回False"""
+        if self.closed:
+            return True
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self) -> None:
+        """关闭订阅，丢弃尚未发送的事件，客户端重连时可通过Last-Event-ID从历史中补齐"""
+        if self.closed:
+            return
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def get(self) -> Optional[SessionEvent]:
+        """获取下一个事件，订阅关闭后返回None"""
+        return await self._queue.get()
+
+
+class _Channel:
+    """频道的本地订阅者集合，ready在Redis订阅完成后置位"""
+
+    def __init__(self):
+        self.subscriptions: Set[Subscription] = set()
+        self.ready = asyncio.Event()
+
+
+class EventBroker:
+    """会话事件代理
+
+    事件写入每个会话的Redis Stream(保留历史用于断线续传)并发布到会话频道。每个worker只持有一个pub/sub连接，
+    同一频道只向Redis订阅一次，收到的消息再分发给本worker内该会话的所有SSE连接，连接数与Redis连接数无关。
+    """
+
+    def __init__(self):
+        """构造函数，完成配置获取"""
+        self._settings: Settings = get_settings()
+        self._redis: Optional[RedisClient] = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._channels: Dict[str, _Channel] = {}
+        self._lock = asyncio.Lock()
+        registry = get_metrics_registry()
+        self._subscribers_gauge = registry.gauge("sse_subscribers", "当前SSE订阅连接数")
+        self._channels_gauge = registry.gauge("sse_channels", "当前订阅的会话频道数")
+        self._dropped = registry.counter("sse_slow_consumers_total", "因消费过慢被断开的SSE连接数")
+
+    @property
+    def _control_channel(self) -> str:
+        return f"{self._settings.SSE_KEY_PREFIX}:control"
+
+    def _stream_key(self, session_id: str) -> str:
+        return f"{self._settings.SSE_KEY_PREFIX}:stream:{session_id}"
+
+    def _channel_key(self, session_id: str) -> str:
+        return f"{self._settings.SSE_KEY_PREFIX}:channel:{session_id}"
+
+    async def init(self) -> None:
+        """初始化事件代理，启动pub/sub监听任务"""
+        if self._redis is not None:
+            logger.warning("事件代理已初始化，无需重复操作")
+            return
+        self._redis = get_redis_client()
+        self._listener = asyncio.create_task(self._listen(), name="sse-event-listener")
+        logger.info("事件代理初始化成功")
+
+    def close_subscriptions(self) -> None:
+        """关闭所有本地订阅，SSE连接随之结束，客户端会带着Last-Event-ID重连到其他实例"""
+        for channel in self._channels.values():
+            for subscription in channel.subscriptions:
+                subscription.close()
+
+    async def shutdown(self) -> None:
+        """关闭事件代理"""
+        self.close_subscriptions()
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._channels.clear()
+        self._redis = None
+        logger.info("事件代理已关闭")
+
+        get_event_broker.cache_clear()
+
+    async def publish(self, session_id: str, event: str, data: str) -> str:
+        """发布会话事件，返回事件ID"""
+        redis_client = self._redis or get_redis_client()
+        return await redis_client.eval_script(
+            _PUBLISH_SCRIPT,
+            [self._stream_key(session_id), self._channel_key(session_id)],
+            [self._settings.SSE_STREAM_MAXLEN, event, data, self._settings.SSE_STREAM_TTL],
+        )
+
+    async def history(self, session_id: str, after: Optional[str] = None, count: Optional[int] = None) -> List[SessionEvent]:
+        """读取会话历史事件，after为None时从头读取，否则只返回该ID之后的事件"""
+        start = f"({after}" if after else "-"
+        entries = await self._redis.client.xrange(self._stream_key(session_id), min=start, max="+", count=count)
+        return [SessionEvent(id=entry_id, event=fields["event"], data=fields["data"]) for entry_id, fields in entries]
+
+    @asynccontextmanager
+    async def subscribe(self, session_id: str) -> AsyncIterator[Subscription]:
+        """订阅会话的实时事件，退出上下文时取消订阅，本worker内最后一个订阅者退出时才取消Redis订阅"""
+        if self._redis is None:
+            raise RuntimeError("事件代理未初始化，请调用init()完成初始化")
+        channel_key = self._channel_key(session_id)
+        subscription = Subscription(session_id, self._settings.SSE_QUEUE_SIZE)
+
+        # 1.登记本地订阅者，频道首个订阅者负责向Redis订阅，其余订阅者等待订阅完成
+        async with self._lock:
+            channel = self._channels.get(channel_key)
+            first = channel is None
+            if first:
+                channel = self._channels[channel_key] = _Channel()
+            channel.subscriptions.add(subscription)
+        self._subscribers_gauge.inc()
+        try:
+            if first:
+                try:
+                    await self._pubsub_ready()
+                    await self._pubsub.subscribe(channel_key)
+                except Exception:
+                    # 订阅失败时同一频道上等待的订阅者一并关闭
+                    for other in channel.subscriptions:
+                        other.close()
+                    raise
+                finally:
+                    channel.ready.set()
+                self._channels_gauge.set((), len(self._channels))
+            else:
+                await channel.ready.wait()
+            yield subscription
+        finally:
+            # 2.注销订阅者，频道已无订阅者时取消Redis订阅
+            subscription.close()
+            self._subscribers_gauge.dec()
+            async with self._lock:
+                channel.subscriptions.discard(subscription)
+                if not channel.subscriptions and self._channels.get(channel_key) is channel:
+                    del self._channels[channel_key]
+                    if self._pubsub is not None:
+                        try:
+                            await self._pubsub.unsubscribe(channel_key)
+                        except Exception as e:
+                            logger.warning(f"取消会话频道订阅失败: {str(e)}")
+            self._channels_gauge.set((), len(self._channels))
+
+    async def _pubsub_ready(self) -> None:
+        """等待监听任务建立pub/sub连接"""
+        while self._pubsub is None:
+            if self._listener is None or self._listener.done():
+                raise RuntimeError("事件监听任务未运行")
+            await asyncio.sleep(0.05)
+
+    def _dispatch(self, channel_key: str, data: str) -> None:
+        channel = self._channels.get(channel_key)
+        if channel is None:
+            return
+        event_id, event, payload = data.split("\n", 2)
+        event = SessionEvent(id=event_id, event=event, data=payload)
+        for subscription in list(channel.subscriptions):
+            if not subscription.push(event):
+                self._dropped.inc()
+                logger.warning(f"SSE连接消费过慢，已断开: {subscription.session_id}")
+                subscription.close()
+
+    async def _listen(self) -> None:
+        """监听所有会话频道，断线后重连；始终订阅控制频道，保证没有会话订阅时连接也保持在订阅状态
+
+        订阅连接来自不设读超时的独立连接池，以get_message(timeout=...)轮询，空闲时不会断开重连。
+        """
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self._control_channel, *self._channels.keys())
+                self._pubsub = pubsub
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=_PUBSUB_POLL_TIMEOUT)
+                    if message is not None and message["type"] == "message" and message["channel"] != self._control_channel:
+                        self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 断线期间可能丢失事件，关闭现有订阅让客户端带着Last-Event-ID重连补齐
+                logger.warning(f"会话事件订阅断开，1秒后重连: {str(e)}")
+                self._pubsub = None
+                self.close_subscriptions()
+                await asyncio.sleep(1)
+            finally:
+                self._pubsub = None
+                await pubsub.aclose()
+
+
+@lru_cache()
+def get_event_broker() -> EventBroker:
+    """使用lru_cache实现单例模式，获取会话事件代理"""
+    return EventBroker()
@@ -0,0 +1,9 @@
+from .openai_llm import OpenAILLM, TokenBudget, estimate_tokens, get_llm, normalize_request
+
+__all__ = [
+    "OpenAILLM",
+    "TokenBudget",
+    "estimate_tokens",
+    "get_llm",
+    "normalize_request",
+]
@@ -0,0 +1,446 @@
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import httpx
+import orjson
+
+from core.config import Settings, get_settings
+from app.domain.external import LLM, LLMChunk, LLMResult, LLMUsage, Message
+from app.infrastructure.cache import SingleFlight
+from app.infrastructure.metrics import get_metrics_registry
+from app.infrastructure.storage.redis import get_redis_client
+
+if TYPE_CHECKING:
+    # openai导入较慢，只在创建客户端时才导入，缩短进程冷启动时间
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 大模型调用耗时远高于普通请求，使用单独的分桶
+LLM_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# 可以写入缓存的结束原因，被截断或过滤的输出不缓存
+_CACHEABLE_FINISH_REASONS = {"stop", "length"}
+
+# 不影响模型输出的参数，不参与缓存key计算
+_CACHE_IGNORED_PARAMS = {"user", "stream", "stream_options", "timeout"}
+
+
+class TokenBudget:
+    """每分钟token预算(令牌桶)，调用前按估算值预扣，完成后按实际用量多退少补，预算不足时排队等待"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self._rate = tokens_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        # 排队者按先后顺序获取预算，避免大请求被小请求持续插队
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: int) -> bool:
+        """预算充足时立即扣除并返回True，否则不等待直接返回False"""
+        if self._lock.locked():
+            return False
+        self._refill()
+        if self._tokens < min(tokens, self.capacity):
+            return False
+        self._tokens -= tokens
+        return True
+
+    async def acquire(self, tokens: int) -> float:
+        """扣除预算，不足时等待补充，返回等待时间(秒)。单次超过容量的请求按容量等待，之后记为欠额"""
+        started_at = time.monotonic()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= min(tokens, self.capacity):
+                    self._tokens -= tokens
+                    return time.monotonic() - started_at
+                await asyncio.sleep((min(tokens, self.capacity) - self._tokens) / self._rate)
+
+    def adjust(self, delta: int) -> None:
+        """按实际用量修正预扣值，delta为正表示补扣，为负表示退还"""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - delta)
+
+
+def normalize_request(messages: List[Message], model: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """归一化请求：去掉文本首尾空白、统一换行符，丢弃值为None与不影响输出的参数，用于计算缓存key"""
+    normalized = []
+    for message in messages:
+        item = {key: value for key, value in message.items() if value is not None}
+        if isinstance(item.get("content"), str):
+            item["content"] = item["content"].replace("\r\n", "\n").strip()
+        normalized.append(item)
+    return {
+        "model": model,
+        "messages": normalized,
+        "params": {key: value for key, value in params.items() if value is not None and key not in _CACHE_IGNORED_PARAMS},
+    }
+
+
+def estimate_tokens(messages: List[Message], params: Dict[str, Any]) -> int:
+    """粗略估算一次调用消耗的token数(按4字符1个token)，用于预扣预算"""
+    prompt = 0
+    for message in messages:
+        content = message.get("content")
+        prompt += 4 + (len(content) if isinstance(content, str) else len(orjson.dumps(content))) // 4
+    completion = params.get("max_completion_tokens") or params.get("max_tokens") or 0
+    return prompt + int(completion)
+
+
+class OpenAILLM(LLM):
+    """兼容OpenAI接口的大模型网关
+
+    - 每个worker共享一个httpx连接池，所有调用复用连接
+    - 并发上限与每分钟token预算按worker数平分，超出时排队
+    - 连接失败、超时、限流与5xx错误按指数退避加随机抖动重试；非流式请求可开启对冲，慢请求由先返回的副本代替
+    - 归一化请求后精确匹配Redis缓存，相同请求并发时只调用一次模型
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """构造函数，完成配置获取与指标注册；transport为自定义的httpx传输层(如测试用的httpx.MockTransport)，为空时使用默认连接池"""
+        self._settings: Settings = get_settings()
+        self._transport = transport
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._client: Optional["AsyncOpenAI"] = None
+        self._retryable: Tuple[type, ...] = ()
+        concurrency, tokens_per_minute = self._settings.llm_worker_limits()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._budget = TokenBudget(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._flight = SingleFlight()
+
+        registry = get_metrics_registry()
+        self._latency = registry.histogram(
+            "llm_request_seconds", "大模型调用耗时(秒)，流式调用为完整输出耗时", ("model", "mode", "outcome"), LLM_LATENCY_BUCKETS
+        )
+        self._first_token = registry.histogram(
+            "llm_first_token_seconds", "流式调用首个分片的等待时间(秒)", ("model",), LLM_LATENCY_BUCKETS
+        )
+        self._tokens = registry.counter("llm_tokens_total", "大模型消耗的token数", ("model", "kind"))
+        self._cache_results = registry.counter("llm_cache_total", "大模型响应缓存查询次数", ("result",))
+        self._retries = registry.counter("llm_retries_total", "大模型调用重试次数", ("model", "reason"))
+        self._hedges = registry.counter("llm_hedges_total", "对冲请求次数，outcome为won表示对冲请求先返回", ("outcome",))
+        self._budget_wait = registry.counter("llm_budget_wait_seconds_total", "等待token预算的累计时间(秒)")
+        self._inflight = registry.gauge("llm_inflight", "进行中的大模型请求数")
+
+    async def init(self) -> None:
+        """创建共享连接池与OpenAI客户端，重试由网关统一处理，关闭SDK自带的重试"""
+        if self._client is not None:
+            logger.warning("大模型客户端已初始化，无需重复操作")
+            return
+
+        import openai
+
+        self._http_client = httpx.AsyncClient(
+            transport=self._transport,
+            limits=httpx.Limits(
+                max_connections=self._settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=self._settings.LLM_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(self._settings.LLM_TIMEOUT, connect=self._settings.LLM_CONNECT_TIMEOUT),
+        )
+        self._client = openai.AsyncOpenAI(
+            api_key=self._settings.LLM_API_KEY or "EMPTY",
+            base_url=self._settings.LLM_BASE_URL,
+            max_retries=0,
+            http_client=self._http_client,
+        )
+        self._retryable = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+        logger.info(f"大模型客户端初始化成功: {self._settings.LLM_BASE_URL}")
+
+    async def shutdown(self) -> None:
+        """关闭连接池"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            self._client = None
+            logger.info("大模型客户端已关闭")
+
+        get_llm.cache_clear()
+
+    @property
+    def client(self) -> "AsyncOpenAI":
+        if self._client is None:
+            raise RuntimeError("大模型客户端未初始化，请调用init()完成初始化")
+        return self._client
+
+    async def chat(
+            self,
+            messages: List[Message],
+            model: Optional[str] = None,
+            use_cache: bool = True,
+            **params: Any,
+    ) -> LLMResult:
+        """非流式对话补全，命中缓存时直接返回，未命中时相同请求并发只调用一次模型"""
+        model = model or self._settings.LLM_MODEL
+        if not (use_cache and self._settings.LLM_CACHE_ENABLED):
+            return await self._complete(messages, model, params)
+
+        # 1.查询缓存
+        key = self._cache_key(messages, model, params)
+        cached = await self._cache_get(key)
+        if cached is not None:
+            self._latency.observe((model, "chat", "cached"), 0.0)
+            return cached
+
+        # 2.调用模型并写入缓存，相同key的并发调用共享同一个结果
+        async def load() -> LLMResult:
+            result = await self._complete(messages, model, params)
+            await self._cache_set(key, result)
+            return result
+
+        return await self._flight.do(key, load)
+
+    async def stream(
+            self,
+            messages: List[Message],
+            model: Optional[str] = None,
+            use_cache: bool = True,
+            **params: Any,
+    ) -> AsyncIterator[LLMChunk]:
+        """流式对话补全，逐个转发模型的增量输出；命中缓存时一次性返回完整内容，完整输出结束后写入缓存"""
+        model = model or self._settings.LLM_MODEL
+        caching = use_cache and self._settings.LLM_CACHE_ENABLED
+        key = self._cache_key(messages, model, params) if caching else ""
+
+        # 1.查询缓存
+        if caching:
+            cached = await self._cache_get(key)
+            if cached is not None:
+                self._latency.observe((model, "stream", "cached"), 0.0)
+                yield LLMChunk(content=cached.content, cached=True)
+                yield LLMChunk(finish_reason=cached.finish_reason, usage=cached.usage, cached=True)
+                return
+
+        # 2.预扣token预算并占用并发名额，整个流式输出期间保持占用
+        reserved = await self._reserve(messages, params)
+        started_at = time.perf_counter()
+        outcome, response, usage, parts, finish_reason = "error", None, None, [], None
+        async with self._slot():
+            try:
+                # 3.建立流并读取首个分片，失败时重试；开始输出后不再重试，避免客户端收到重复内容
+                response, raw = await self._with_retry(model, lambda: self._open_stream(messages, model, params))
+                self._first_token.observe((model,), time.perf_counter() - started_at)
+                while raw is not None:
+                    chunk = self._to_chunk(raw)
+                    finish_reason = chunk.finish_reason or finish_reason
+                    usage = chunk.usage or usage
+                    if chunk.content:
+                        parts.append(chunk.content)
+                        yield LLMChunk(content=chunk.content)
+                    raw = await anext(response, None)
+                outcome = "ok"
+            finally:
+                if outcome != "ok" and response is not None:
+                    await response.close()
+                self._latency.observe((model, "stream", outcome), time.perf_counter() - started_at)
+                self._settle(model, reserved, usage)
+
+        # 4.结束原因与用量(stream_options.include_usage)在最后一个分片中返回
+        yield LLMChunk(finish_reason=finish_reason, usage=usage)
+        if caching:
+            await self._cache_set(key, LLMResult(content="".join(parts), model=model, finish_reason=finish_reason, usage=usage))
+
+    async def _complete(self, messages: List[Message], model: str, params: Dict[str, Any]) -> LLMResult:
+        """预扣预算后调用模型，失败时重试"""
+        reserved = await self._reserve(messages, params)
+        started_at = time.perf_counter()
+        outcome, result = "error", None
+        try:
+            result = await self._with_retry(model, lambda: self._hedged(messages, model, params))
+            outcome = "ok"
+            return result
+        finally:
+            self._latency.observe((model, "chat", outcome), time.perf_counter() - started_at)
+            self._settle(model, reserved, result.usage if result is not None else None)
+
+    async def _hedged(self, messages: List[Message], model: str, params: Dict[str, Any]) -> LLMResult:
+        """发起请求，超过LLM_HEDGE_DELAY未返回且仍有空闲并发名额时再发起一个相同请求，取先成功的结果"""
+        delay = self._settings.LLM_HEDGE_DELAY
+        if delay <= 0:
+            return await self._create(messages, model, params)
+
+        primary = asyncio.create_task(self._create(messages, model, params))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            # 对冲请求不排队：并发已满或预算不足时说明服务已有压力，不再追加请求；对冲请求只预扣输入部分
+            if not done and not self._semaphore.locked() and (
+                    self._budget is None or self._budget.try_acquire(estimate_tokens(messages, {}))):
+                tasks.add(asyncio.create_task(self._create(messages, model, params)))
+                self._hedges.inc(("launched",))
+
+            # 任一请求成功即返回，全部失败时抛出主请求的异常
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._hedges.inc(("won",))
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _create(self, messages: List[Message], model: str, params: Dict[str, Any]) -> LLMResult:
+        async with self._slot():
+            response = await self.client.chat.completions.create(model=model, messages=messages, **params)
+        choice = response.choices[0]
+        usage = None
+        if response.usage is not None:
+            usage = LLMUsage(prompt_tokens=response.usage.prompt_tokens, completion_tokens=response.usage.completion_tokens)
+        return LLMResult(
+            content=choice.message.content or "",
+            model=response.model or model,
+            finish_reason=choice.finish_reason,
+            usage=usage,
+        )
+
+    async def _open_stream(self, messages: List[Message], model: str, params: Dict[str, Any]) -> Tuple[Any, Any]:
+        """建立流式请求并读取首个分片，首个分片之前的错误都可以安全重试"""
+        params = {"stream_options": {"include_usage": True}, **params}
+        response = await self.client.chat.completions.create(model=model, messages=messages, stream=True, **params)
+        try:
+            first = await anext(response, None)
+        except BaseException:
+            await response.close()
+            raise
+        return response, first
+
+    @staticmethod
+    def _to_chunk(raw: Any) -> LLMChunk:
+        chunk = LLMChunk()
+        if raw.choices:
+            choice = raw.choices[0]
+            chunk.content = (choice.delta.content if choice.delta is not None else None) or ""
+            chunk.finish_reason = choice.finish_reason
+        if getattr(raw, "usage", None) is not None:
+            chunk.usage = LLMUsage(prompt_tokens=raw.usage.prompt_tokens, completion_tokens=raw.usage.completion_tokens)
+        return chunk
+
+    async def _with_retry(self, model: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """可重试错误按指数退避加全抖动重试，服务端返回Retry-After时按其等待"""
+        attempt = 0
+        while True:
+            try:
+                return await fn()
+            except self._retryable as e:
+                if attempt >= self._settings.LLM_MAX_RETRIES:
+                    raise
+                delay = random.uniform(0, min(self._settings.LLM_RETRY_BACKOFF * 2 ** attempt, self._settings.LLM_RETRY_BACKOFF_MAX))
+                retry_after = self._retry_after(e)
+                if retry_after is not None:
+                    delay = min(retry_after, self._settings.LLM_RETRY_BACKOFF_MAX)
+                attempt += 1
+                self._retries.inc((model, type(e).__name__))
+                logger.warning(f"大模型调用失败，{delay:.2f}s后第{attempt}次重试: {type(e).__name__} {str(e)}")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        try:
+            return float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+    def _slot(self) -> "_InflightSlot":
+        return _InflightSlot(self._semaphore, self._inflight)
+
+    async def _reserve(self, messages: List[Message], params: Dict[str, Any]) -> int:
+        if self._budget is None:
+            return 0
+        reserved = estimate_tokens(messages, params)
+        waited = await self._budget.acquire(reserved)
+        if waited > 0:
+            self._budget_wait.inc((), waited)
+        return reserved
+
+    def _settle(self, model: str, reserved: int, usage: Optional[LLMUsage]) -> None:
+        """记录token用量，并按实际用量修正预扣的预算；调用失败时预扣值不退还"""
+        if usage is None:
+            return
+        self._tokens.inc((model, "prompt"), usage.prompt_tokens)
+        self._tokens.inc((model, "completion"), usage.completion_tokens)
+        if self._budget is not None:
+            self._budget.adjust(usage.total_tokens - reserved)
+
+    def _cache_key(self, messages: List[Message], model: str, params: Dict[str, Any]) -> str:
+        payload = orjson.dumps(normalize_request(messages, model, params), option=orjson.OPT_SORT_KEYS)
+        return f"{self._settings.LLM_CACHE_KEY_PREFIX}:{hashlib.blake2b(payload, digest_size=16).hexdigest()}"
+
+    async def _cache_get(self, key: str) -> Optional[LLMResult]:
+        """查询缓存，Redis不可用时视为未命中，不影响模型调用"""
+        try:
+            raw = await get_redis_client().get(key)
+        except Exception as e:
+            logger.warning(f"读取大模型响应缓存失败: {str(e)}")
+            raw = None
+        if raw is None:
+            self._cache_results.inc(("miss",))
+            return None
+        self._cache_results.inc(("hit",))
+        data = orjson.loads(raw)
+        usage = data.get("usage")
+        return LLMResult(
+            content=data["content"],
+            model=data["model"],
+            finish_reason=data.get("finish_reason"),
+            usage=LLMUsage(**usage) if usage else None,
+            cached=True,
+        )
+
+    async def _cache_set(self, key: str, result: LLMResult) -> None:
+        if result.finish_reason not in _CACHEABLE_FINISH_REASONS:
+            return
+        data = {
+            "content": result.content,
+            "model": result.model,
+            "finish_reason": result.finish_reason,
+            "usage": {"prompt_tokens": result.usage.prompt_tokens, "completion_tokens": result.usage.completion_tokens}
+            if result.usage else None,
+        }
+        try:
+            await get_redis_client().set(key, orjson.dumps(data).decode("utf-8"), ex=self._settings.LLM_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"写入大模型响应缓存失败: {str(e)}")
+
+
+class _InflightSlot:
+    """占用一个并发名额并计入进行中请求数"""
+
+    def __init__(self, semaphore: asyncio.Semaphore, gauge: Any):
+        self._semaphore = semaphore
+        self._gauge = gauge
+
+    async def __aenter__(self) -> None:
+        await self._semaphore.acquire()
+        self._gauge.inc()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._gauge.dec()
+        self._semaphore.release()
+
+
+@lru_cache()
+def get_llm() -> OpenAILLM:
+    """使用lru_cache实现单例模式，获取大模型网关"""
+    return OpenAILLM()
@@ -1,3 +1,3 @@
-from .logging import set_logging
+from .logging import set_logging, shutdown_logging
 
-__all__ = ["set_logging"]
\ No newline at end of file
+__all__ = ["set_logging", "shutdown_logging"]
\ No newline at end of file
@@ -1,41 +1,153 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, List, Optional
+
 from core.config import get_settings
-import logging
+
+# 后台日志监听器，负责在独立线程中完成格式化与写入
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """JSON格式化器，每条日志输出为一行JSON，便于日志平台采集"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """按logger名称前缀对高频日志采样，WARNING及以上级别的日志始终保留"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # 最长前缀优先匹配
+        self._rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for prefix, rate in self._rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """只负责入队的日志处理器，不在调用线程做格式化，格式化与IO全部交给后台监听线程"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 同进程内的队列无需序列化，直接传递原始记录
+        return record
+
+
+def _create_file_handler(settings) -> logging.Handler:
+    """按配置创建文件处理器
+
+    多个worker进程与任务进程会同时写日志，进程内轮转(size/time)时各进程各自重命名、截断同一文件会丢失或交错日志，
+    因此进程内轮转时文件名追加进程号，每个进程只轮转自己的文件；external模式所有进程追加写同一文件，
+    由logrotate等外部工具轮转，WatchedFileHandler发现文件被移走后自动重新打开。
+    """
+    log_file_path = Path(settings.LOG_FILE)
+    log_file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if settings.LOG_ROTATION == "external":
+        return logging.handlers.WatchedFileHandler(log_file_path, encoding="utf-8")
+
+    log_file_path = log_file_path.with_name(f"{log_file_path.stem}.{os.getpid()}{log_file_path.suffix}")
+    if settings.LOG_ROTATION == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file_path,
+            when=settings.LOG_ROTATION_WHEN,
+            backupCount=settings.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+    return logging.handlers.RotatingFileHandler(
+        log_file_path,
+        maxBytes=settings.LOG_MAX_BYTES,
+        backupCount=settings.LOG_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+
 
 def set_logging():
     """设置日志配置"""
+    global _listener
     settings = get_settings()
 
     # 获取根日志处理器
     root_logger = logging.getLogger()
-   
+
     # 设置根处理器等级
     log_level = getattr(logging, settings.LOG_LEVEL.upper())
     root_logger.setLevel(log_level)
 
+    # 重复调用(如热重载)时不再重复挂载处理器
+    if _listener is not None:
+        return
+
     # 设置根处理器格式
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
+    if settings.LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
 
-    # 创建控制台日志
+    # 创建控制台日志与文件日志，二者只挂在后台监听器上
     console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    file_handler = _create_file_handler(settings)
+    handlers: List[logging.Handler] = [console_handler, file_handler]
+    for handler in handlers:
+        handler.setFormatter(formatter)
 
-    # 创建文件日志（确保目录存在）
-    log_file_path = Path(settings.LOG_FILE)
-    log_file_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    file_handler = logging.FileHandler(settings.LOG_FILE, encoding="utf-8")
-    file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
+    # 根日志只挂一个入队处理器，业务代码记录日志时不会在事件循环上做磁盘IO
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    if settings.LOG_SAMPLING:
+        queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLING))
+    root_logger.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    # uvicorn默认自带同步处理器，改为交给根日志统一走队列
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    root_logger.info("日志配置完成，日志等级：%s，日志文件：%s", settings.LOG_LEVEL, file_handler.baseFilename)
 
-    root_logger.info("日志配置完成，日志等级：%s，日志文件：%s", settings.LOG_LEVEL, settings.LOG_FILE)
 
+def shutdown_logging():
+    """停止后台日志监听器，等待队列中的日志全部写入"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def get_logger(name: str):
     """获取日志记录器"""
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
@@ -0,0 +1,48 @@
+from app.infrastructure.storage.cos import get_cos
+from app.infrastructure.storage.postgres import get_postgres
+from app.infrastructure.storage.redis import get_redis_client
+from .registry import MetricsRegistry
+
+
+def register_pool_collectors(registry: MetricsRegistry) -> None:
+    """注册Postgres、Redis、Cos连接池/线程池的指标采集器"""
+    db_connections = registry.gauge("db_pool_connections", "Postgres连接池连接数", ("engine", "state"))
+    db_wait_seconds = registry.counter("db_pool_wait_seconds_total", "Postgres连接池累计等待时间(秒)", ("engine",))
+    db_wait_count = registry.counter("db_pool_checkouts_total", "Postgres连接池累计签出次数", ("engine",))
+    redis_connections = registry.gauge("redis_pool_connections", "Redis连接池连接数", ("state",))
+    redis_wait_seconds = registry.counter("redis_pool_wait_seconds_total", "Redis连接池累计等待时间(秒)")
+    redis_wait_count = registry.counter("redis_pool_checkouts_total", "Redis连接池累计获取连接次数")
+    cos_workers = registry.gauge("cos_executor_tasks", "Cos线程池任务数", ("state",))
+    cos_wait_seconds = registry.counter("cos_executor_wait_seconds_total", "Cos线程池任务累计排队时间(秒)")
+    cos_wait_count = registry.counter("cos_executor_tasks_total", "Cos线程池累计执行任务数")
+
+    def collect_postgres(_: MetricsRegistry) -> None:
+        for stats in get_postgres().pool_stats():
+            engine = stats["engine"]
+            db_connections.set((engine, "size"), stats["size"])
+            db_connections.set((engine, "checked_out"), stats["checked_out"])
+            db_connections.set((engine, "checked_in"), stats["checked_in"])
+            db_connections.set((engine, "overflow"), stats["overflow"])
+            db_wait_seconds.set((engine,), stats["wait_seconds_total"])
+            db_wait_count.set((engine,), stats["wait_count"])
+
+    def collect_redis(_: MetricsRegistry) -> None:
+        stats = get_redis_client().pool_stats()
+        if not stats:
+            return
+        redis_connections.set(("max",), stats["max_connections"])
+        redis_connections.set(("in_use",), stats["in_use"])
+        redis_connections.set(("idle",), stats["idle"])
+        redis_wait_seconds.set((), stats["wait_seconds_total"])
+        redis_wait_count.set((), stats["wait_count"])
+
+    def collect_cos(_: MetricsRegistry) -> None:
+        stats = get_cos().pool_stats()
+        cos_workers.set(("max_workers",), stats["max_workers"])
+        cos_workers.set(("in_flight",), stats["in_flight"])
+        cos_wait_seconds.set((), stats["wait_seconds_total"])
+        cos_wait_count.set((), stats["wait_count"])
+
+    registry.add_collector(collect_postgres)
+    registry.add_collector(collect_redis)
+    registry.add_collector(collect_cos)
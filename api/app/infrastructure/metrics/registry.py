@@ -0,0 +1,279 @@
+import asyncio
+import bisect
+import json
+import logging
+import os
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# 标签取值拼接分隔符，用于将标签元组编码为JSON可用的字符串key
+_LABEL_SEP = "\x1f"
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class _Metric:
+    """指标基类，samples以标签取值元组为key"""
+    type: str = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.samples: Dict[Tuple[str, ...], Any] = {}
+
+    def _snapshot_value(self, value: Any) -> Any:
+        return value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "samples": {_LABEL_SEP.join(key): self._snapshot_value(value) for key, value in self.samples.items()},
+        }
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+    type = "counter"
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        self.samples[labels] = self.samples.get(labels, 0) + amount
+
+    def set(self, labels: Tuple[str, ...], value: float) -> None:
+        """由采集器直接写入累计值(如连接池累计等待时间)"""
+        self.samples[labels] = value
+
+
+class Gauge(_Metric):
+    """可增可减的瞬时值"""
+    type = "gauge"
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        self.samples[labels] = self.samples.get(labels, 0) + amount
+
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        self.samples[labels] = self.samples.get(labels, 0) - amount
+
+    def set(self, labels: Tuple[str, ...], value: float) -> None:
+        self.samples[labels] = value
+
+
+class Histogram(_Metric):
+    """直方图，每个标签组合记录各桶计数、总和与总次数"""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        sample = self.samples.get(labels)
+        if sample is None:
+            # [各桶计数(最后一个为+Inf), 总和, 次数]
+            sample = self.samples[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        sample[0][bisect.bisect_left(self.buckets, value)] += 1
+        sample[1] += value
+        sample[2] += 1
+
+    def _snapshot_value(self, value: Any) -> Any:
+        return {"buckets": list(value[0]), "sum": value[1], "count": value[2]}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**super().snapshot(), "bounds": list(self.buckets)}
+
+
+class MetricsRegistry:
+    """进程内指标注册表，支持多worker进程通过共享目录汇总指标"""
+
+    def __init__(self):
+        """构造函数，完成配置获取"""
+        self._settings: Settings = get_settings()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[["MetricsRegistry"], None]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(
+            self,
+            name: str,
+            help: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[["MetricsRegistry"], None]) -> None:
+        """注册采集器，每次导出前调用，用于采集连接池等外部状态"""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """采集并返回当前进程全部指标的快照"""
+        for collector in self._collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                logger.warning(f"指标采集失败: {str(e)}")
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    @property
+    def _multiproc_dir(self) -> Optional[Path]:
+        return Path(self._settings.METRICS_MULTIPROC_DIR) if self._settings.METRICS_MULTIPROC_DIR else None
+
+    def _flush(self, snapshot: Dict[str, Any]) -> None:
+        """将当前进程快照写入共享目录，先写临时文件再原子替换，避免读到半个文件(同步文件IO，在线程中执行)"""
+        directory = self._multiproc_dir
+        if directory is None:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"metrics_{os.getpid()}.json"
+        # 临时文件名唯一，定时写入与停机写入在不同线程并发时互不覆盖
+        tmp_path = directory / f"metrics_{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        tmp_path.write_text(json.dumps(snapshot), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    async def init(self) -> None:
+        """多进程模式下启动定时写入快照的后台任务"""
+        if self._multiproc_dir is None or self._flush_task is not None:
+            return
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"指标多进程汇总已开启，目录: {self._multiproc_dir}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._settings.METRICS_FLUSH_INTERVAL)
+            try:
+                await asyncio.to_thread(self._flush, self.snapshot())
+            except Exception as e:
+                logger.warning(f"指标快照写入失败: {str(e)}")
+
+    async def shutdown(self) -> None:
+        """停止后台任务，并写入最后一次快照，保证退出进程的计数不丢失"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+            await asyncio.to_thread(self._flush, self.snapshot())
+
+    async def render(self) -> str:
+        """导出Prometheus文本格式，多进程模式下汇总所有worker的快照
+
+        采集器读取的是事件循环内的对象，快照在当前线程生成；读写各进程快照文件与格式化在线程中执行，不阻塞事件循环
+        """
+        snapshot = self.snapshot()
+        if self._multiproc_dir is None:
+            return render_prometheus([snapshot])
+        return await asyncio.to_thread(self._render_multiproc, snapshot)
+
+    def _render_multiproc(self, snapshot: Dict[str, Any]) -> str:
+        """写入当前进程快照后汇总目录中所有进程的快照"""
+        directory = self._multiproc_dir
+        self._flush(snapshot)
+        snapshots = []
+        for path in directory.glob("metrics_*.json"):
+            try:
+                snapshot = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            pid = int(path.stem.split("_", 1)[1])
+            if not _pid_alive(pid):
+                # 已退出进程的瞬时值已无意义，只保留计数类指标
+                snapshot = {name: metric for name, metric in snapshot.items() if metric["type"] != "gauge"}
+            snapshots.append(snapshot)
+        return render_prometheus(snapshots)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """合并多个进程的快照，计数器与直方图累加，瞬时值求和"""
+    merged: Dict[str, Any] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                merged[name] = target = {**metric, "samples": {}}
+            samples = target["samples"]
+            for key, value in metric["samples"].items():
+                current = samples.get(key)
+                if current is None:
+                    samples[key] = json.loads(json.dumps(value)) if isinstance(value, dict) else value
+                elif isinstance(value, dict):
+                    current["buckets"] = [a + b for a, b in zip(current["buckets"], value["buckets"])]
+                    current["sum"] += value["sum"]
+                    current["count"] += value["count"]
+                else:
+                    samples[key] = current + value
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], key: str, extra: Optional[Tuple[str, str]] = None) -> str:
+    values = key.split(_LABEL_SEP) if labelnames else []
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(snapshots: List[Dict[str, Any]]) -> str:
+    """将(多个进程的)快照渲染为Prometheus文本格式"""
+    lines: List[str] = []
+    for name, metric in sorted(merge_snapshots(snapshots).items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for key, value in sorted(metric["samples"].items()):
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labelnames, key)} {_format_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip([*metric["bounds"], float("inf")], value["buckets"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labelnames, key, ('le', _format_number(bound)))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_number(value['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labelnames, key)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+@lru_cache()
+def get_metrics_registry() -> MetricsRegistry:
+    """使用lru_cache实现单例模式，获取指标注册表"""
+    return MetricsRegistry()
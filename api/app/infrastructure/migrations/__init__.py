@@ -0,0 +1,21 @@
+from .operations import (
+    add_column_with_backfill,
+    backfill,
+    create_index_concurrently,
+    drop_index_concurrently,
+    format_timeout,
+    run_with_lock_retry,
+    set_not_null,
+    timeouts,
+)
+
+__all__ = [
+    "add_column_with_backfill",
+    "backfill",
+    "create_index_concurrently",
+    "drop_index_concurrently",
+    "format_timeout",
+    "run_with_lock_retry",
+    "set_not_null",
+    "timeouts",
+]
@@ -0,0 +1,337 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, TypeVar
+
+import sqlalchemy as sa
+from alembic import context, op
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# PostgreSQL等待锁超时(lock_timeout)的SQLSTATE
+_LOCK_NOT_AVAILABLE = "55P03"
+
+# 回填进度表，每批更新与进度在同一条语句中提交，中断后从最后提交的主键继续
+_PROGRESS_TABLE = "alembic_backfill_progress"
+
+# 回填进度日志的最小间隔(秒)
+_PROGRESS_LOG_INTERVAL = 10.0
+
+
+def format_timeout(seconds: float) -> str:
+    """秒数转换为PostgreSQL超时参数值，0表示不限制"""
+    return f"{int(seconds * 1000)}ms"
+
+
+def _bind() -> Connection:
+    if context.is_offline_mode():
+        raise RuntimeError("该迁移操作需要查询数据库，不支持离线(--sql)模式")
+    return op.get_bind()
+
+
+def _is_autocommit(bind: Connection) -> bool:
+    return bind.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+
+
+def _quote(name: str) -> str:
+    return op.get_context().dialect.identifier_preparer.quote(name)
+
+
+def _qualified(table_name: str, schema: Optional[str] = None) -> str:
+    return f"{_quote(schema)}.{_quote(table_name)}" if schema else _quote(table_name)
+
+
+def _sqlstate(error: DBAPIError) -> Optional[str]:
+    return getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+
+
+@contextmanager
+def timeouts(lock_timeout: Optional[float] = None, statement_timeout: Optional[float] = None) -> Iterator[None]:
+    """临时调整lock_timeout/statement_timeout(秒，0表示不限制)，退出时恢复原值
+
+    env.py已按MIGRATION_LOCK_TIMEOUT/MIGRATION_STATEMENT_TIMEOUT设置了连接默认值，这里用于个别语句单独放宽或收紧。
+    """
+    settings: Settings = get_settings()
+    defaults = {"lock_timeout": settings.MIGRATION_LOCK_TIMEOUT, "statement_timeout": settings.MIGRATION_STATEMENT_TIMEOUT}
+    overrides = {"lock_timeout": lock_timeout, "statement_timeout": statement_timeout}
+    overrides = {name: seconds for name, seconds in overrides.items() if seconds is not None}
+
+    # 离线模式只输出SET语句，结束时恢复为env.py设置的默认值
+    if context.is_offline_mode():
+        for name, seconds in overrides.items():
+            op.execute(f"SET {name} = '{format_timeout(seconds)}'")
+        yield
+        for name in overrides:
+            op.execute(f"SET {name} = '{format_timeout(defaults[name])}'")
+        return
+
+    bind = op.get_bind()
+    previous: Dict[str, str] = {}
+    for name, seconds in overrides.items():
+        previous[name] = bind.exec_driver_sql(f"SHOW {name}").scalar()
+        bind.exec_driver_sql(f"SET {name} = '{format_timeout(seconds)}'")
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            try:
+                bind.exec_driver_sql(f"SET {name} = '{value}'")
+            except DBAPIError:
+                # 事务已失败时无法执行，事务内的SET会随回滚一并撤销
+                pass
+
+
+def run_with_lock_retry(
+        operation: Callable[[], T],
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+) -> T:
+    """执行需要表锁的DDL，等待锁超过lock_timeout时退避重试
+
+    DDL排在长事务之后等待锁时，会阻塞其后所有读写该表的请求；设置lock_timeout后等待有上限，失败后稍后重试，
+    对线上流量的影响从"阻塞直到长事务结束"变为"最多阻塞lock_timeout"。事务内执行时以SAVEPOINT隔离每次尝试。
+    """
+    settings: Settings = get_settings()
+    retries = settings.MIGRATION_LOCK_RETRIES if retries is None else retries
+    backoff = settings.MIGRATION_LOCK_RETRY_BACKOFF if backoff is None else backoff
+    if context.is_offline_mode():
+        return operation()
+
+    bind = op.get_bind()
+    for attempt in range(retries + 1):
+        savepoint = None if _is_autocommit(bind) else bind.begin_nested()
+        try:
+            result = operation()
+        except DBAPIError as e:
+            if savepoint is not None:
+                savepoint.rollback()
+            if _sqlstate(e) != _LOCK_NOT_AVAILABLE or attempt >= retries:
+                raise
+            delay = backoff * 2 ** attempt
+            logger.warning(f"迁移语句等待锁超时，{delay:.1f}秒后第{attempt + 1}次重试: {str(e.orig)}")
+            time.sleep(delay)
+            continue
+        if savepoint is not None:
+            savepoint.commit()
+        return result
+    raise AssertionError("unreachable")
+
+
+def _drop_invalid_index(index_name: str, schema: Optional[str] = None) -> None:
+    """CREATE INDEX CONCURRENTLY失败会留下无效索引，重新创建前先删除"""
+    if context.is_offline_mode():
+        return
+    valid = op.get_bind().execute(
+        sa.text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": f"{schema}.{index_name}" if schema else index_name},
+    ).scalar()
+    if valid is False:
+        logger.warning(f"删除上次创建失败遗留的无效索引: {index_name}")
+        op.drop_index(index_name, schema=schema, postgresql_concurrently=True, if_exists=True)
+
+
+def create_index_concurrently(
+        index_name: str,
+        table_name: str,
+        columns: Sequence[Any],
+        schema: Optional[str] = None,
+        unique: bool = False,
+        **kw: Any,
+) -> None:
+    """以CREATE INDEX CONCURRENTLY在事务外创建索引，建索引期间不阻塞表的读写
+
+    CONCURRENTLY不能在事务中执行，调用前当前迁移已执行的语句会先提交，应将其放在单独的迁移文件中。
+    索引已存在时跳过；上次失败遗留的无效索引会被删除重建。构建耗时与表大小相关，不受statement_timeout限制。
+    """
+
+    def create() -> None:
+        _drop_invalid_index(index_name, schema)
+        op.create_index(
+            index_name, table_name, columns, schema=schema, unique=unique,
+            postgresql_concurrently=True, if_not_exists=True, **kw,
+        )
+
+    with op.get_context().autocommit_block(), timeouts(statement_timeout=0):
+        run_with_lock_retry(create)
+
+
+def drop_index_concurrently(index_name: str, table_name: Optional[str] = None, schema: Optional[str] = None) -> None:
+    """以DROP INDEX CONCURRENTLY在事务外删除索引，不阻塞表的读写"""
+    with op.get_context().autocommit_block(), timeouts(statement_timeout=0):
+        run_with_lock_retry(lambda: op.drop_index(
+            index_name, table_name=table_name, schema=schema, postgresql_concurrently=True, if_exists=True,
+        ))
+
+
+def _ensure_progress_table(bind: Connection) -> None:
+    bind.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {_PROGRESS_TABLE} ("
+        "name VARCHAR(255) PRIMARY KEY, "
+        "last_key TEXT NOT NULL, "
+        "rows_updated BIGINT NOT NULL DEFAULT 0, "
+        "updated_at TIMESTAMP NOT NULL DEFAULT now())"
+    )
+
+
+def _key_type(bind: Connection, table: str, pk: str) -> str:
+    key_type = bind.execute(
+        sa.text(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = to_regclass(:table) AND attname = :pk AND NOT attisdropped"
+        ),
+        {"table": table, "pk": pk},
+    ).scalar()
+    if key_type is None:
+        raise RuntimeError(f"回填的表或主键列不存在: {table}.{pk}")
+    return key_type
+
+
+def backfill(
+        table_name: str,
+        values: Dict[str, Any],
+        where: Optional[str] = None,
+        pk: str = "id",
+        schema: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        sleep: Optional[float] = None,
+        name: Optional[str] = None,
+) -> int:
+    """按主键分批回填数据，每批单独提交，返回更新的行数
+
+    - values为列名到值的映射，值为字面量时以参数绑定，为sa.text()时作为SQL表达式，表达式中可用别名t引用当前行
+    - where为只更新满足条件的行的SQL条件(可用别名t)，通常为"t.col IS NULL"，保证重复执行不会覆盖已回填的数据
+    - 每批按主键顺序取batch_size行，行锁只在单批语句内持有；批次之间间隔sleep秒，给线上写入与复制留出余量
+    - 进度(最后处理的主键)与该批更新在同一条语句中提交，迁移中断后重新执行会从断点继续，完成后删除进度记录
+    """
+    settings: Settings = get_settings()
+    batch_size = batch_size or settings.MIGRATION_BACKFILL_BATCH_SIZE
+    sleep = settings.MIGRATION_BACKFILL_SLEEP if sleep is None else sleep
+    name = name or f"{table_name}:{','.join(values)}"
+    table = _qualified(table_name, schema)
+    column = _quote(pk)
+
+    # 1.组装单批语句：取下一批主键 -> 更新其中满足条件的行 -> 记录进度
+    params: Dict[str, Any] = {"name": name, "limit": batch_size}
+    assignments = []
+    for index, (key, value) in enumerate(values.items()):
+        if isinstance(value, sa.TextClause):
+            assignments.append(f"{_quote(key)} = {value.text}")
+        else:
+            assignments.append(f"{_quote(key)} = :value_{index}")
+            params[f"value_{index}"] = value
+    condition = f" AND ({where})" if where else ""
+
+    with op.get_context().autocommit_block():
+        bind = _bind()
+        _ensure_progress_table(bind)
+        cursor = f"WHERE {column} > CAST(CAST(:last_key AS TEXT) AS {_key_type(bind, table, pk)})"
+        statements = {
+            first: sa.text(
+                f"WITH batch AS ("
+                f"SELECT {column} FROM {table} {'' if first else cursor} ORDER BY {column} LIMIT :limit"
+                f"), updated AS ("
+                f"UPDATE {table} AS t SET {', '.join(assignments)} FROM batch "
+                f"WHERE t.{column} = batch.{column}{condition} RETURNING 1"
+                f"), tail AS ("
+                f"SELECT {column}::text AS last_key FROM batch ORDER BY {column} DESC LIMIT 1"
+                f"), progress AS ("
+                f"INSERT INTO {_PROGRESS_TABLE} (name, last_key, rows_updated, updated_at) "
+                f"SELECT :name, last_key, (SELECT count(*) FROM updated), now() FROM tail "
+                f"ON CONFLICT (name) DO UPDATE SET last_key = EXCLUDED.last_key, "
+                f"rows_updated = {_PROGRESS_TABLE}.rows_updated + EXCLUDED.rows_updated, updated_at = EXCLUDED.updated_at"
+                f") SELECT (SELECT last_key FROM tail), (SELECT count(*) FROM updated)"
+            )
+            for first in (True, False)
+        }
+
+        # 2.读取断点与预估行数(pg_class.reltuples，仅用于进度日志)
+        last_key, total = bind.execute(
+            sa.text(f"SELECT last_key, rows_updated FROM {_PROGRESS_TABLE} WHERE name = :name"), {"name": name}
+        ).first() or (None, 0)
+        estimated = bind.execute(
+            sa.text("SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table},
+        ).scalar() or 0
+        if last_key is not None:
+            logger.info(f"回填{name}从断点继续: {pk} > {last_key}，此前已更新{total}行")
+
+        # 3.逐批执行，单批超时不影响已提交的批次
+        started_at = logged_at = time.monotonic()
+        scanned = batches = updated_rows = 0
+        with timeouts(statement_timeout=settings.MIGRATION_BACKFILL_STATEMENT_TIMEOUT):
+            while True:
+                cursor_params = params if last_key is None else {**params, "last_key": last_key}
+                last_key, updated = bind.execute(statements[last_key is None], cursor_params).one()
+                if last_key is None:
+                    break
+                batches += 1
+                scanned += batch_size
+                updated_rows += updated
+                if time.monotonic() - logged_at >= _PROGRESS_LOG_INTERVAL:
+                    logged_at = time.monotonic()
+                    rate = scanned / max(logged_at - started_at, 1e-6)
+                    progress = f"{min(scanned / estimated * 100, 100):.1f}%" if estimated else "-"
+                    logger.info(f"回填{name}: 第{batches}批 扫描约{scanned}/{estimated}行({progress}) "
+                                f"更新{updated_rows}行 {rate:.0f}行/s 断点{pk}={last_key}")
+                if sleep:
+                    time.sleep(sleep)
+
+        bind.execute(sa.text(f"DELETE FROM {_PROGRESS_TABLE} WHERE name = :name"), {"name": name})
+    logger.info(f"回填{name}完成: {batches}批 更新{updated_rows}行 耗时{time.monotonic() - started_at:.1f}秒")
+    return total + updated_rows
+
+
+def set_not_null(table_name: str, column_name: str, schema: Optional[str] = None) -> None:
+    """为已有数据的列加NOT NULL约束，不在持有排他锁期间扫描全表
+
+    先添加NOT VALID的CHECK约束(只需短暂加锁)，再VALIDATE(扫描全表但不阻塞读写)，
+    PostgreSQL 12+执行SET NOT NULL时会利用已验证的CHECK约束跳过全表扫描，最后删除该CHECK约束。
+    """
+    table = _qualified(table_name, schema)
+    column = _quote(column_name)
+    constraint = _quote(f"ck_{table_name}_{column_name}_not_null")
+    with op.get_context().autocommit_block():
+        run_with_lock_retry(lambda: op.execute(
+            f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}, "
+            f"ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID"
+        ))
+        with timeouts(statement_timeout=0):
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}")
+        run_with_lock_retry(lambda: op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+        run_with_lock_retry(lambda: op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}"))
+
+
+def add_column_with_backfill(
+        table_name: str,
+        column: sa.Column,
+        value: Any,
+        schema: Optional[str] = None,
+        **backfill_kw: Any,
+) -> None:
+    """为大表添加列并回填已有行，全程不长时间持有排他锁，中断后可重新执行
+
+    1.以可空、无默认值的方式添加列，只修改元数据
+    2.列定义了server_default时设置默认值，只影响之后写入的行
+    3.按主键分批回填已有行(见backfill)
+    4.列定义为NOT NULL时最后加上约束(见set_not_null)
+    """
+    server_default = column.server_default
+    nullable = column.nullable
+    name = column.name
+    with op.get_context().autocommit_block():
+        run_with_lock_retry(lambda: op.add_column(
+            table_name, sa.Column(name, column.type, nullable=True), schema=schema, if_not_exists=True,
+        ))
+        if server_default is not None:
+            run_with_lock_retry(lambda: op.alter_column(
+                table_name, name, server_default=server_default.arg, schema=schema,
+            ))
+    backfill(table_name, {name: value}, where=f"t.{_quote(name)} IS NULL", schema=schema, **backfill_kw)
+    if not nullable:
+        set_not_null(table_name, name, schema=schema)
@@ -1,4 +1,5 @@
 from .base import Base
+from .file import FileModel
 from .test_demo import DemoModel
 
-__all__ = ["Base", "DemoModel"]
\ No newline at end of file
+__all__ = ["Base", "DemoModel", "FileModel"]
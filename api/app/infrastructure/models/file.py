@@ -0,0 +1,27 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, PrimaryKeyConstraint, UUID, TIMESTAMP, text, BigInteger, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+
+class FileModel(Base):
+    """客户端直传到COS的文件元数据，文件内容不经过API服务"""
+    __tablename__ = "files"
+    __table_args__ = (
+        PrimaryKeyConstraint("id", name="pk_files_id"),
+        Index("uq_files_key", "key", unique=True),
+        Index("ix_files_created_at_id", "created_at", "id"),
+    )
+    id: Mapped[uuid.UUID] = mapped_column(UUID, nullable=False, primary_key=True, default=uuid.uuid4)
+    key: Mapped[str] = mapped_column(String(1024), nullable=False)
+    filename: Mapped[str] = mapped_column(String(255), nullable=False, server_default=text("''::character varying"))
+    content_type: Mapped[str] = mapped_column(String(255), nullable=False, server_default=text("''::character varying"))
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    etag: Mapped[str] = mapped_column(String(128), nullable=False, server_default=text("''::character varying"))
+    status: Mapped[str] = mapped_column(String(16), nullable=False, server_default=text("'pending'::character varying"))
+    upload_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, default=datetime.now)
+    updated_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, default=datetime.now, onupdate=datetime.now)
+    uploaded_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
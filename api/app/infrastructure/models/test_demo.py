@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import  String, PrimaryKeyConstraint, UUID, TEXT, TIMESTAMP, text, Integer
+from sqlalchemy import  String, PrimaryKeyConstraint, UUID, TEXT, TIMESTAMP, text, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from .base import Base
 
@@ -9,6 +9,7 @@ class DemoModel(Base):
     __tablename__ = "demos"
     __table_args__ = (
         PrimaryKeyConstraint("id", name="pk_demos_id"),
+        Index("ix_demos_created_at_id", "created_at", "id"),
     )
     id: Mapped[uuid.UUID] = mapped_column(UUID, nullable=False, primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False, server_default=text("''::character varying"))
@@ -0,0 +1,7 @@
+from .job_queue import JobQueue, StreamMessage, get_job_queue
+
+__all__ = [
+    "JobQueue",
+    "StreamMessage",
+    "get_job_queue",
+]
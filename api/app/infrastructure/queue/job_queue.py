@@ -0,0 +1,193 @@
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from core.config import Settings, get_settings
+from app.domain.model.job import Job, JobStatus
+from app.infrastructure.storage.redis import RedisClient, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 将到期的重试任务从延迟集合移回Stream，ZREM成功才投递，多个worker并发执行时不会重复投递
+_PROMOTE_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local moved = 0
+for _, job_id in ipairs(due) do
+    if redis.call('ZREM', KEYS[1], job_id) == 1 then
+        redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], '*', 'job_id', job_id)
+        moved = moved + 1
+    end
+end
+return moved
+"""
+
+# Stream消息: (消息ID, 任务ID)
+StreamMessage = Tuple[str, str]
+
+
+class JobQueue:
+    """基于Redis Streams消费者组的任务队列
+
+    - 任务状态与结果保存在独立的Hash中，Stream消息只携带任务ID
+    - 执行成功后XACK；失败时按指数退避放入延迟集合，到期后重新投递；超过最大次数后写入死信Stream
+    - worker失联时消息停留在PEL中，空闲超时后由其他worker通过XAUTOCLAIM接管
+    """
+
+    def __init__(self):
+        """构造函数，完成配置获取"""
+        self._settings: Settings = get_settings()
+        prefix = self._settings.JOB_KEY_PREFIX
+        self.stream_key = f"{prefix}:stream"
+        self.dead_key = f"{prefix}:dead"
+        self.delayed_key = f"{prefix}:delayed"
+        self.group = self._settings.JOB_CONSUMER_GROUP
+        self._job_prefix = f"{prefix}:job"
+        # XAUTOCLAIM扫描游标，每次从上次结束的位置继续
+        self._claim_cursor = "0-0"
+
+    @property
+    def _redis(self) -> RedisClient:
+        return get_redis_client()
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self._job_prefix}:{job_id}"
+
+    @staticmethod
+    def _dump(job: Job) -> Dict[str, str]:
+        return {
+            "id": job.id,
+            "name": job.name,
+            "payload": orjson.dumps(job.payload).decode("utf-8"),
+            "max_attempts": str(job.max_attempts),
+            "status": job.status.value,
+            "attempts": str(job.attempts),
+            "result": orjson.dumps(job.result).decode("utf-8"),
+            "error": job.error or "",
+            "created_at": str(job.created_at),
+            "updated_at": str(job.updated_at),
+        }
+
+    @staticmethod
+    def _load(data: Dict[str, str]) -> Job:
+        return Job(
+            id=data["id"],
+            name=data["name"],
+            payload=orjson.loads(data["payload"]),
+            max_attempts=int(data["max_attempts"]),
+            status=JobStatus(data["status"]),
+            attempts=int(data["attempts"]),
+            result=orjson.loads(data["result"]),
+            error=data["error"] or None,
+            created_at=float(data["created_at"]),
+            updated_at=float(data["updated_at"]),
+        )
+
+    async def ensure_group(self) -> None:
+        """创建消费者组，从Stream起始位置消费，保证组创建前入队的任务也会被执行"""
+        if await self._redis.xgroup_create(self.stream_key, self.group, id="0"):
+            logger.info(f"任务消费者组已创建: {self.stream_key} -> {self.group}")
+
+    async def enqueue(self, name: str, payload: Optional[Dict[str, Any]] = None, max_attempts: Optional[int] = None) -> Job:
+        """写入任务状态并投递到Stream，两步在一个事务中完成"""
+        job = Job(name=name, payload=payload or {}, max_attempts=max_attempts or self._settings.JOB_MAX_ATTEMPTS)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._job_key(job.id), mapping=self._dump(job))
+            pipe.expire(self._job_key(job.id), self._settings.JOB_RESULT_TTL)
+            pipe.xadd(self.stream_key, {"job_id": job.id}, maxlen=self._settings.JOB_STREAM_MAXLEN, approximate=True)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        data = await self._redis.hgetall(self._job_key(job_id))
+        return self._load(data) if data else None
+
+    async def read(self, consumer: str, count: int, block_ms: int) -> List[StreamMessage]:
+        """读取分配给当前消费者的新消息，没有消息时最多阻塞block_ms毫秒"""
+        response = await self._redis.xreadgroup(self.group, consumer, {self.stream_key: ">"}, count=count, block=block_ms)
+        if not response:
+            return []
+        return [(message_id, fields.get("job_id", "")) for message_id, fields in response[0][1]]
+
+    async def claim_stale(self, consumer: str, count: int) -> List[StreamMessage]:
+        """接管空闲超时(worker失联)的消息"""
+        next_cursor, messages, deleted_ids = await self._redis.xautoclaim(
+            self.stream_key, self.group, consumer, self._settings.JOB_CLAIM_IDLE_MS, start_id=self._claim_cursor, count=count
+        )
+        self._claim_cursor = next_cursor
+        # 已被Stream裁剪掉的消息仍留在PEL中，直接确认
+        if deleted_ids:
+            await self._redis.xack(self.stream_key, self.group, *deleted_ids)
+        return [(message_id, fields.get("job_id", "")) for message_id, fields in messages if fields]
+
+    async def heartbeat(self, consumer: str, message_ids: List[str]) -> None:
+        """为执行中的消息续租，重置空闲时间，避免执行时间较长的任务被误接管"""
+        await self._redis.xclaim_ids(self.stream_key, self.group, consumer, 0, message_ids)
+
+    async def promote_due(self, limit: int = 100) -> int:
+        """将到期的重试任务重新投递到Stream"""
+        return await self._redis.eval_script(
+            _PROMOTE_DUE_SCRIPT,
+            [self.delayed_key, self.stream_key],
+            [time.time(), limit, self._settings.JOB_STREAM_MAXLEN],
+        )
+
+    async def mark_running(self, job: Job) -> Job:
+        """标记任务开始执行并累加执行次数，被接管的任务同样计数，反复导致worker崩溃的任务最终会进入死信"""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(self._job_key(job.id), "attempts", 1)
+            pipe.hset(self._job_key(job.id), mapping={"status": JobStatus.RUNNING.value, "updated_at": str(time.time())})
+            attempts, _ = await pipe.execute()
+        job.attempts = attempts
+        job.status = JobStatus.RUNNING
+        return job
+
+    async def complete(self, message_id: str, job: Job, result: Any) -> None:
+        """保存结果并确认消息"""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._job_key(job.id), mapping={
+                "status": JobStatus.SUCCEEDED.value,
+                "result": orjson.dumps(result).decode("utf-8"),
+                "error": "",
+                "updated_at": str(time.time()),
+            })
+            pipe.expire(self._job_key(job.id), self._settings.JOB_RESULT_TTL)
+            pipe.xack(self.stream_key, self.group, message_id)
+
+    async def retry(self, message_id: str, job: Job, error: str, delay: float) -> None:
+        """确认当前消息并放入延迟集合，delay秒后重新投递"""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._job_key(job.id), mapping={
+                "status": JobStatus.RETRYING.value,
+                "error": error,
+                "updated_at": str(time.time()),
+            })
+            pipe.zadd(self.delayed_key, {job.id: time.time() + delay})
+            pipe.xack(self.stream_key, self.group, message_id)
+
+    async def dead_letter(self, message_id: str, job: Job, error: str) -> None:
+        """写入死信Stream并确认消息"""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._job_key(job.id), mapping={
+                "status": JobStatus.DEAD.value,
+                "error": error,
+                "updated_at": str(time.time()),
+            })
+            pipe.expire(self._job_key(job.id), self._settings.JOB_RESULT_TTL)
+            pipe.xadd(
+                self.dead_key,
+                {"job_id": job.id, "name": job.name, "error": error, "message_id": message_id},
+                maxlen=self._settings.JOB_STREAM_MAXLEN,
+                approximate=True,
+            )
+            pipe.xack(self.stream_key, self.group, message_id)
+
+    async def ack(self, message_id: str) -> None:
+        await self._redis.xack(self.stream_key, self.group, message_id)
+
+
+@lru_cache()
+def get_job_queue() -> JobQueue:
+    """使用lru_cache实现单例模式，获取任务队列"""
+    return JobQueue()
@@ -0,0 +1,5 @@
+from .base import SQLAlchemyRepository
+from .demo_repository import DemoRepository
+from .file_repository import FileRepository
+
+__all__ = ["SQLAlchemyRepository", "DemoRepository", "FileRepository"]
@@ -0,0 +1,205 @@
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Generic, Iterable, List, Mapping, Optional, Sequence, Type, TypeVar
+
+from sqlalchemy import Column, RowMapping, Table, literal, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from app.domain.repositories.base import BulkRepository, BulkWriteResult, Page
+from app.infrastructure.models import Base
+from .pagination import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar('ModelT', bound=Base)
+
+# Postgres单条语句最多支持32767个绑定参数
+_MAX_BIND_PARAMS = 32767
+
+
+class SQLAlchemyRepository(BulkRepository[ModelT], Generic[ModelT]):
+    """基于SQLAlchemy的通用异步仓储，提供COPY批量插入、ON CONFLICT批量upsert与按主键批量查询"""
+
+    model: Type[ModelT]
+    # 默认分页/流式读取排序列，最后一列必须唯一(通常为主键)，为空时使用主键；应有对应的联合索引
+    default_order_by: Sequence[str] = ()
+
+    def __init__(self, session: AsyncSession, batch_size: Optional[int] = None):
+        """构造函数，session可以是AsyncSession或惰性会话LazySession"""
+        self._session = session
+        self._batch_size = batch_size or get_settings().DATABASE_BULK_BATCH_SIZE
+
+    @property
+    def table(self) -> Table:
+        return self.model.__table__
+
+    def _batches(self, rows: Sequence[Any], column_count: int = 1) -> Iterable[Sequence[Any]]:
+        """按批次大小切分，同时保证单条语句的绑定参数不超过上限"""
+        size = max(1, min(self._batch_size, _MAX_BIND_PARAMS // max(column_count, 1)))
+        for offset in range(0, len(rows), size):
+            yield rows[offset:offset + size]
+
+    def _prepare_rows(self, rows: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+        """补全Python端默认值(如created_at)，服务端默认值由数据库填充"""
+        prepared = []
+        for row in rows:
+            values = dict(row)
+            for column in self.table.columns:
+                if column.key in values or column.default is None or column.default.is_sequence:
+                    continue
+                default = column.default
+                values[column.key] = default.arg(None) if default.is_callable else default.arg
+            prepared.append(values)
+        return prepared
+
+    @staticmethod
+    def _dedupe(rows: List[Dict[str, Any]], columns: Sequence[str]) -> List[Dict[str, Any]]:
+        """按冲突列去重，同一冲突键保留最后一行
+
+        同一条INSERT ... ON CONFLICT DO UPDATE中冲突键重复时，Postgres会报CardinalityViolation
+        (command cannot affect row a second time)，整批失败。冲突列含NULL的行不会冲突，原样保留。
+        """
+        unique: Dict[tuple, Dict[str, Any]] = {}
+        passthrough: List[Dict[str, Any]] = []
+        for row in rows:
+            key = tuple(row.get(column) for column in columns)
+            if any(value is None for value in key):
+                passthrough.append(row)
+                continue
+            unique.pop(key, None)
+            unique[key] = row
+        return [*unique.values(), *passthrough]
+
+    def _report(self, action: str, rows: int, started_at: float) -> BulkWriteResult:
+        result = BulkWriteResult(rows=rows, seconds=time.perf_counter() - started_at)
+        logger.info(
+            f"{self.table.name}批量{action}完成，行数: {result.rows}，耗时: {result.seconds:.3f}s，"
+            f"吞吐: {result.rows_per_second:.0f} rows/s"
+        )
+        return result
+
+    async def get_many(self, ids: Sequence[Any]) -> List[ModelT]:
+        """按主键批量查询，按批次发送IN查询，返回顺序不保证与ids一致"""
+        primary_key = self.table.primary_key.columns.values()[0]
+        result: List[ModelT] = []
+        for batch in self._batches(list(ids)):
+            scalars = await self._session.scalars(select(self.model).where(primary_key.in_(batch)))
+            result.extend(scalars.all())
+        return result
+
+    def _order_columns(self, order_by: Optional[Sequence[str]]) -> List[Column]:
+        keys = order_by or self.default_order_by
+        if not keys:
+            return list(self.table.primary_key.columns)
+        return [self.table.columns[key] for key in keys]
+
+    async def list_page(
+            self,
+            limit: int,
+            cursor: Optional[str] = None,
+            order_by: Optional[Sequence[str]] = None,
+            descending: bool = False,
+    ) -> Page[ModelT]:
+        """键集(游标)分页，通过行比较 (a, b) > (:a, :b) 定位起点，任意页的查询代价都与第一页相同"""
+        columns = self._order_columns(order_by)
+        statement = select(self.model)
+
+        # 1.根据游标添加起点条件
+        if cursor:
+            values = decode_cursor(columns, cursor)
+            key = tuple_(*columns)
+            bound = tuple_(*[literal(value, column.type) for column, value in zip(columns, values)])
+            statement = statement.where(key < bound if descending else key > bound)
+
+        # 2.多取一行用于判断是否还有下一页
+        statement = statement.order_by(*[column.desc() if descending else column.asc() for column in columns])
+        items = list((await self._session.scalars(statement.limit(limit + 1))).all())
+        if len(items) <= limit:
+            return Page(items=items, next_cursor=None)
+
+        items = items[:limit]
+        last = items[-1]
+        return Page(items=items, next_cursor=encode_cursor(columns, [getattr(last, column.key) for column in columns]))
+
+    async def stream(
+            self,
+            order_by: Optional[Sequence[str]] = None,
+            batch_size: Optional[int] = None,
+    ) -> AsyncIterator[RowMapping]:
+        """通过服务端游标按批读取全表，返回行映射而非ORM对象，不进入identity map，内存占用与表大小无关"""
+        columns = self._order_columns(order_by)
+        statement = (
+            select(self.table)
+            .order_by(*columns)
+            .execution_options(yield_per=batch_size or self._batch_size)
+        )
+        result = await self._session.stream(statement)
+        async for row in result.mappings():
+            yield row
+
+    async def bulk_insert(self, rows: Iterable[Mapping[str, Any]], use_copy: bool = True) -> BulkWriteResult:
+        """批量插入，默认走asyncpg的COPY协议，所有行需包含相同的列"""
+        started_at = time.perf_counter()
+        prepared = self._prepare_rows(rows)
+        if not prepared:
+            return self._report("插入", 0, started_at)
+
+        if not use_copy:
+            for batch in self._batches(prepared, len(prepared[0])):
+                await self._session.execute(insert(self.table), batch)
+            return self._report("插入", len(prepared), started_at)
+
+        # 1.获取会话当前连接，先执行一条语句保证asyncpg事务已开启，COPY与会话处于同一事务
+        connection = await self._session.connection()
+        await connection.execute(text("SELECT 1"))
+        raw_connection = await connection.get_raw_connection()
+
+        # 2.按列顺序组装记录后通过COPY写入
+        columns = [self.table.columns[key].name for key in prepared[0]]
+        keys = list(prepared[0])
+        await raw_connection.driver_connection.copy_records_to_table(
+            self.table.name,
+            records=[tuple(row[key] for key in keys) for row in prepared],
+            columns=columns,
+            schema_name=self.table.schema,
+        )
+        return self._report("插入", len(prepared), started_at)
+
+    async def bulk_upsert(
+            self,
+            rows: Iterable[Mapping[str, Any]],
+            conflict_columns: Optional[Sequence[str]] = None,
+            update_columns: Optional[Sequence[str]] = None,
+    ) -> BulkWriteResult:
+        """批量upsert，按批次执行INSERT ... ON CONFLICT DO UPDATE，默认以主键判定冲突、更新其余已提供的列
+
+        冲突键重复的行只保留最后一行(后写覆盖先写)。
+        """
+        started_at = time.perf_counter()
+        rows = list(rows)
+        prepared = self._prepare_rows(rows)
+        if not prepared:
+            return self._report("upsert", 0, started_at)
+
+        # 默认只更新调用方显式提供的列，补全的默认值(如created_at)不覆盖已有数据
+        conflict_columns = list(conflict_columns or [column.key for column in self.table.primary_key.columns])
+        if update_columns is None:
+            update_columns = [key for key in rows[0] if key not in conflict_columns]
+        prepared = self._dedupe(prepared, conflict_columns)
+
+        statement = insert(self.table)
+        if update_columns:
+            set_ = {key: statement.excluded[key] for key in update_columns}
+            # 带onupdate的列(如updated_at)在更新时同步刷新
+            for column in self.table.columns:
+                if column.key not in set_ and column.onupdate is not None and column.onupdate.is_callable:
+                    set_[column.key] = column.onupdate.arg(None)
+            statement = statement.on_conflict_do_update(index_elements=conflict_columns, set_=set_)
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=conflict_columns)
+
+        for batch in self._batches(prepared, len(prepared[0])):
+            await self._session.execute(statement, batch)
+        return self._report("upsert", len(prepared), started_at)
@@ -0,0 +1,9 @@
+from app.infrastructure.models import DemoModel
+from .base import SQLAlchemyRepository
+
+
+class DemoRepository(SQLAlchemyRepository[DemoModel]):
+    """Demo数据仓储"""
+
+    model = DemoModel
+    default_order_by = ("created_at", "id")
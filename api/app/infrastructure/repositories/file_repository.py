@@ -0,0 +1,9 @@
+from app.infrastructure.models import FileModel
+from .base import SQLAlchemyRepository
+
+
+class FileRepository(SQLAlchemyRepository[FileModel]):
+    """文件元数据仓储"""
+
+    model = FileModel
+    default_order_by = ("created_at", "id")
@@ -0,0 +1,48 @@
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Sequence
+
+from sqlalchemy import Column
+
+from app.application.errors.exceptions import BadRequestError
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def _decode_value(column: Column, value: Any) -> Any:
+    python_type = column.type.python_type
+    if value is None or isinstance(value, python_type):
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(columns: Sequence[Column], values: Sequence[Any]) -> str:
+    """将排序列的取值编码为不透明游标，同时记录排序列名，防止游标被用于不同的排序"""
+    payload = {"c": [column.key for column in columns], "v": [_encode_value(value) for value in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(columns: Sequence[Column], cursor: str) -> List[Any]:
+    """解析游标并按列类型还原取值，游标非法时抛出BadRequestError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["c"] != [column.key for column in columns] or len(payload["v"]) != len(columns):
+            raise ValueError("cursor columns mismatch")
+        return [_decode_value(column, value) for column, value in zip(columns, payload["v"])]
+    except Exception:
+        raise BadRequestError("分页游标无效，请重新从第一页开始查询")
@@ -0,0 +1,49 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from app.infrastructure.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """启动耗时记录器，逐阶段记录耗时，启动完成后输出报告，便于追踪扩容时的冷启动耗时变化"""
+
+    def __init__(self, timeout: float):
+        self._timeout = timeout
+        self._started_at = time.perf_counter()
+        self._phases: List[Tuple[str, float]] = []
+
+    def record(self, name: str, seconds: float) -> None:
+        self._phases.append((name, seconds))
+
+    async def run(self, name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """执行一个初始化阶段，超时视为启动失败"""
+        started_at = time.perf_counter()
+        try:
+            async with asyncio.timeout(self._timeout):
+                return await fn()
+        except TimeoutError:
+            raise RuntimeError(f"{name}初始化超时({self._timeout}s)") from None
+        finally:
+            self.record(name, time.perf_counter() - started_at)
+
+    async def gather(self, *stages: Awaitable[Any]) -> None:
+        """并发执行多个初始化阶段，全部结束后若有失败则抛出第一个异常"""
+        results = await asyncio.gather(*stages, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def report(self, registry: Optional[MetricsRegistry] = None) -> str:
+        """生成启动耗时报告，并写入启动阶段耗时指标"""
+        total = time.perf_counter() - self._started_at
+        if registry is not None:
+            gauge = registry.gauge("app_startup_phase_seconds", "应用启动各阶段耗时(秒)", ("phase",))
+            for name, seconds in self._phases:
+                gauge.set((name,), seconds)
+            gauge.set(("lifespan_total",), total)
+        phases = " | ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in self._phases)
+        return f"启动耗时报告: {phases} | lifespan总计 {total * 1000:.1f}ms"
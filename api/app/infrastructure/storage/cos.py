@@ -1,11 +1,20 @@
+import asyncio
+import io
 import logging
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
-from typing import Optional
-
-from qcloud_cos import CosS3Client, CosConfig
+from typing import TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, BinaryIO, Callable, Dict, Iterable, List, Optional, Union
 
 from core.config import Settings, get_settings
 
+if TYPE_CHECKING:
+    # qcloud_cos导入较慢，只在创建客户端时才导入，缩短进程冷启动时间
+    from qcloud_cos import CosS3Client
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,25 +24,66 @@ class Cos:
     def __init__(self):
         """构造函数，完成配置获取+Cos客户端初始化赋值"""
         self._settings: Settings = get_settings()
-        self._client: Optional[CosS3Client] = None
+        self._client: Optional["CosS3Client"] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._setup_task: Optional[asyncio.Future] = None
+        self._setup_lock = threading.Lock()
+        self._in_flight = 0
+        self._wait_seconds_total = 0.0
+        self._wait_count = 0
+        self._stats_lock = threading.Lock()
 
     async def init(self) -> None:
-        """完成cos腾讯云对象存储客户端的创建"""
+        """完成cos腾讯云对象存储客户端的创建，开启延迟初始化时推迟到首次使用"""
         # 1.判断客户端是否存在，如果存则则记录日志并终止程序
         if self._client is not None:
             logger.warning("Cos腾讯云对象存储已初始化，无需重复操作")
             return
 
+        # 2.导入SDK耗时数百毫秒，在线程中执行；延迟初始化时在后台预热，不阻塞启动，也不阻塞首个请求的事件循环
+        if self._settings.COS_LAZY_INIT:
+            self._setup_task = asyncio.ensure_future(asyncio.to_thread(self._setup))
+            logger.info("Cos腾讯云对象存储将在后台完成初始化")
+            return
+        await asyncio.to_thread(self._setup)
+
+    async def _ensure_setup(self) -> None:
+        """等待后台初始化完成，尚未开始或上次失败时重新发起"""
+        if self._executor is not None:
+            return
+        if self._setup_task is None or self._setup_task.done():
+            self._setup_task = asyncio.ensure_future(asyncio.to_thread(self._setup))
+        await asyncio.shield(self._setup_task)
+
+    def _setup(self) -> None:
+        """导入SDK并创建客户端与线程池，可在线程中执行，重复调用只初始化一次"""
+        with self._setup_lock:
+            if self._executor is not None:
+                return
+            self._create_client()
+
+    def _create_client(self) -> None:
+        from qcloud_cos import CosConfig, CosS3Client
+
         try:
-            # 2.创建cos配置
+            # 2.创建cos配置，连接池大小与线程池保持一致，避免线程等待连接
             config = CosConfig(
                 Region=self._settings.COS_REGION,
                 SecretId=self._settings.COS_SECRETID,
                 SecretKey=self._settings.COS_SECRETKEY,
                 Token=None,
                 Scheme=self._settings.COS_SCHEME,
+                Endpoint=self._settings.COS_ENDPOINT or None,
+                PoolConnections=self._settings.COS_MAX_WORKERS,
+                PoolMaxSize=self._settings.COS_MAX_WORKERS,
             )
             self._client = CosS3Client(config)
+
+            # 3.创建有界线程池，同步SDK调用全部在线程池内执行，不阻塞事件循环
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._settings.COS_MAX_WORKERS,
+                thread_name_prefix="cos",
+            )
             logger.info("Cos腾讯云对象存储初始化成功")
         except Exception as e:
             logger.error(f"Cos腾讯云对象存储初始化失败: {str(e)}")
@@ -41,21 +91,317 @@ class Cos:
 
     async def shutdown(self) -> None:
         """关闭cos腾讯云对象存储"""
+        if self._setup_task is not None:
+            await asyncio.gather(self._setup_task, return_exceptions=True)
+            self._setup_task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
         if self._client is not None:
             self._client = None
             logger.info("关闭腾讯云Cos对象存储成功")
-            
+
         get_cos.cache_clear()
 
     @property
-    def client(self) -> CosS3Client:
-        """只读属性，返回腾讯云Cos对象存储客户端"""
-        if self._client is None:
-            raise RuntimeError("腾讯云Cos对象存储未初始化，请调用init()完成初始化")
+    def client(self) -> "CosS3Client":
+        """只读属性，返回腾讯云Cos对象存储客户端
+
+        延迟初始化时客户端在后台创建，尚未完成时不在事件循环中同步创建(导入SDK会阻塞数百毫秒)，直接抛出异常；
+        调用SDK请使用_call，它会先等待初始化完成。
+        """
+        if self._executor is None:
+            raise RuntimeError("Cos客户端未初始化，请调用init()并等待初始化完成")
         return self._client
 
+    @property
+    def bucket(self) -> str:
+        """只读属性，返回默认存储桶名"""
+        return self._settings.COS_BUKET
+
+    async def _call(self, method: str, **kwargs: Any) -> Any:
+        """等待初始化完成后在线程池中调用SDK方法，客户端在初始化完成后才取用，不会在事件循环中同步初始化"""
+        await self._ensure_setup()
+        return await self._run(getattr(self._client, method), **kwargs)
+
+    async def _run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """在有界线程池中执行同步SDK调用"""
+        await self._ensure_setup()
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+
+        def call() -> Any:
+            # 统计任务在线程池队列中的等待时间
+            waited = time.perf_counter() - submitted_at
+            with self._stats_lock:
+                self._wait_seconds_total += waited
+                self._wait_count += 1
+            return func(*args, **kwargs)
+
+        self._in_flight += 1
+        try:
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            self._in_flight -= 1
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """返回线程池统计信息"""
+        return {
+            "max_workers": self._settings.COS_MAX_WORKERS,
+            "in_flight": self._in_flight,
+            "wait_seconds_total": self._wait_seconds_total,
+            "wait_count": self._wait_count,
+        }
+
+    async def put_object(
+            self,
+            key: str,
+            body: Union[bytes, BinaryIO, Iterable[bytes], AsyncIterable[bytes]],
+            content_type: Optional[str] = None,
+            **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """异步上传对象，超过阈值时自动切换为并行分块上传
+
+        body可以是bytes、文件对象或按块产出bytes的(异步)迭代器；不可seek的流与迭代器先缓冲到临时文件，
+        不超过COS_MULTIPART_THRESHOLD时只占用内存。
+        """
+        if content_type:
+            kwargs["ContentType"] = content_type
+
+        # 1.不可seek的流与迭代器无法取得大小、也无法按偏移读取分块，先完整缓冲
+        if not isinstance(body, (bytes, bytearray, memoryview)) and not self._seekable(body):
+            spooled = await self._spool(body)
+            try:
+                return await self.put_object(key, spooled, **kwargs)
+            finally:
+                spooled.close()
+
+        # 2.计算对象大小，bytes直接取长度，文件对象通过seek获取
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            size = len(body)
+        else:
+            size = body.seek(0, io.SEEK_END)
+            body.seek(0)
+
+        # 3.小对象直接单次上传
+        if size < self._settings.COS_MULTIPART_THRESHOLD:
+            data = body if isinstance(body, (bytes, bytearray, memoryview)) else await self._run(body.read)
+            return await self._call("put_object", Bucket=self.bucket, Key=key, Body=bytes(data), **kwargs)
+
+        # 4.大对象走并行分块上传
+        return await self._multipart_upload(key, body, size, **kwargs)
+
+    @staticmethod
+    def _seekable(body: Any) -> bool:
+        seekable = getattr(body, "seekable", None)
+        try:
+            return bool(seekable()) if callable(seekable) else False
+        except (OSError, ValueError):
+            return False
+
+    async def _spool(self, body: Union[BinaryIO, Iterable[bytes], AsyncIterable[bytes]]) -> BinaryIO:
+        """将不可seek的流或迭代器写入SpooledTemporaryFile，超过分块阈值后转存磁盘"""
+        spooled = tempfile.SpooledTemporaryFile(max_size=self._settings.COS_MULTIPART_THRESHOLD)
+        try:
+            if hasattr(body, "read"):
+                await asyncio.to_thread(shutil.copyfileobj, body, spooled, 1024 * 1024)
+            elif isinstance(body, AsyncIterable):
+                async for chunk in body:
+                    spooled.write(chunk)
+            elif isinstance(body, Iterable):
+                await asyncio.to_thread(lambda: [spooled.write(chunk) for chunk in body])
+            else:
+                raise TypeError(f"不支持的上传对象类型: {type(body).__name__}")
+        except BaseException:
+            spooled.close()
+            raise
+        spooled.seek(0)
+        return spooled
+
+    async def _multipart_upload(
+            self,
+            key: str,
+            body: Union[bytes, BinaryIO],
+            size: int,
+            **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """并行分块上传，任一分块失败时中止整个上传任务"""
+        part_size = self._settings.COS_PART_SIZE
+        semaphore = asyncio.Semaphore(self._settings.COS_MULTIPART_CONCURRENCY)
+        read_lock = threading.Lock()
+
+        def read_part(offset: int, length: int) -> bytes:
+            """读取分块数据，文件对象共享游标，需要加锁"""
+            if isinstance(body, (bytes, bytearray, memoryview)):
+                return bytes(body[offset:offset + length])
+            with read_lock:
+                body.seek(offset)
+                return body.read(length)
+
+        async def upload_part(part_number: int, offset: int) -> Dict[str, Any]:
+            async with semaphore:
+                data = await self._run(read_part, offset, min(part_size, size - offset))
+                response = await self._call(
+                    "upload_part",
+                    Bucket=self.bucket,
+                    Key=key,
+                    Body=data,
+                    PartNumber=part_number,
+                    UploadId=upload_id,
+                )
+                return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+        # 1.创建分块上传任务
+        response = await self._call("create_multipart_upload", Bucket=self.bucket, Key=key, **kwargs)
+        upload_id = response["UploadId"]
+
+        try:
+            # 2.并行上传所有分块
+            parts: List[Dict[str, Any]] = await asyncio.gather(*[
+                upload_part(index + 1, offset)
+                for index, offset in enumerate(range(0, size, part_size))
+            ])
+
+            # 3.合并分块
+            result = await self._call(
+                "complete_multipart_upload",
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Part": parts},
+            )
+            logger.info(f"Cos分块上传完成: {key}, 大小: {size}, 分块数: {len(parts)}")
+            return result
+        except BaseException:
+            logger.error(f"Cos分块上传失败，中止上传任务: {key}")
+            try:
+                await self._call("abort_multipart_upload", Bucket=self.bucket, Key=key, UploadId=upload_id)
+            except Exception as e:
+                logger.error(f"Cos中止分块上传失败: {key}, {str(e)}")
+            raise
+
+    async def get_object(self, key: str, size: Optional[int] = None) -> bytes:
+        """异步下载对象，不小于COS_MULTIPART_THRESHOLD的对象按Range分段并行下载
+
+        size为已知的对象大小，未传入时先通过HEAD获取
+        """
+        # 1.确定对象大小，小对象一次普通请求即可完成
+        if size is None:
+            head = await self.head_object(key)
+            size = int(head.get("Content-Length", 0))
+        if size < self._settings.COS_MULTIPART_THRESHOLD:
+            response = await self._call("get_object", Bucket=self.bucket, Key=key)
+            return await self._run(self._read_body, response)
+
+        # 2.大对象按分段并行下载
+        part_size = self._settings.COS_PART_SIZE
+        semaphore = asyncio.Semaphore(self._settings.COS_MULTIPART_CONCURRENCY)
+
+        async def download_range(offset: int) -> bytes:
+            async with semaphore:
+                end = min(offset + part_size, size) - 1
+                part = await self._call(
+                    "get_object", Bucket=self.bucket, Key=key, Range=f"bytes={offset}-{end}"
+                )
+                return await self._run(self._read_body, part)
+
+        parts = await asyncio.gather(*[download_range(offset) for offset in range(0, size, part_size)])
+        return b"".join(parts)
+
+    async def download_to_file(self, key: str, path: str, max_size: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """流式下载对象到本地文件并返回响应头，内存占用与对象大小无关；对象超过max_size时不下载，返回None"""
+
+        def download() -> Optional[Dict[str, Any]]:
+            response = self._client.get_object(Bucket=self.bucket, Key=key)
+            raw = response["Body"].get_raw_stream()
+            try:
+                if max_size is not None and int(response.get("Content-Length", 0)) > max_size:
+                    return None
+                with open(path, "wb") as file:
+                    shutil.copyfileobj(raw, file, 1024 * 1024)
+                return response
+            finally:
+                raw.close()
+
+        return await self._run(download)
+
+    @staticmethod
+    def _read_body(response: Dict[str, Any]) -> bytes:
+        """读取完整响应体（在线程池中执行）"""
+        return response["Body"].get_raw_stream().read()
+
+    async def stream_object(self, key: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """异步流式读取对象，按块产出数据，适合直接转发给StreamingResponse"""
+        response = await self._call("get_object", Bucket=self.bucket, Key=key)
+        body = response["Body"]
+        chunks = body.get_stream(chunk_size=chunk_size)
+        try:
+            while True:
+                chunk = await self._run(next, chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            # 提前退出时也要释放底层连接
+            body.get_raw_stream().close()
+
+    async def delete_object(self, key: str) -> None:
+        """异步删除对象"""
+        await self._call("delete_object", Bucket=self.bucket, Key=key)
+
+    async def head_object(self, key: str) -> Dict[str, Any]:
+        """异步获取对象元数据"""
+        return await self._call("head_object", Bucket=self.bucket, Key=key)
+
+    async def presign_url(
+            self,
+            key: str,
+            method: str = "GET",
+            expires: Optional[int] = None,
+            params: Optional[Dict[str, str]] = None,
+            headers: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """生成预签名URL，客户端凭URL直接读写COS；headers中的请求头参与签名，客户端必须原样携带
+
+        签名只是本地HMAC计算，不访问网络，等待初始化完成后直接在事件循环中执行
+        """
+        await self._ensure_setup()
+        return self._client.get_presigned_url(
+            Bucket=self.bucket,
+            Key=key,
+            Method=method,
+            Expired=expires or self._settings.COS_PRESIGN_EXPIRES,
+            Params=params or {},
+            Headers=headers or {},
+        )
+
+    async def create_multipart_upload(self, key: str, content_type: Optional[str] = None) -> str:
+        """创建分块上传任务，返回UploadId"""
+        kwargs = {"ContentType": content_type} if content_type else {}
+        response = await self._call("create_multipart_upload", Bucket=self.bucket, Key=key, **kwargs)
+        return response["UploadId"]
+
+    async def complete_multipart_upload(self, key: str, upload_id: str, parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """合并分块，parts为[{"PartNumber": 1, "ETag": "..."}]，按分块号升序"""
+        return await self._call(
+            "complete_multipart_upload",
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Part": sorted(parts, key=lambda part: part["PartNumber"])},
+        )
+
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        """中止分块上传任务，释放已上传的分块"""
+        await self._call("abort_multipart_upload", Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+    async def head_bucket(self) -> None:
+        """异步检查存储桶是否可访问"""
+        await self._call("head_bucket", Bucket=self.bucket)
+
 
 @lru_cache()
 def get_cos() -> Cos:
     """使用lru_cache实现单例模式，获取腾讯云cos对象存储"""
-    return Cos()
\ No newline at end of file
+    return Cos()
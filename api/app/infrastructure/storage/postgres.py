@@ -1,16 +1,65 @@
 
+import asyncio
+import itertools
 import logging
+import time
 from functools import lru_cache
-from typing import Optional
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional
 
-from sqlalchemy import text
+from fastapi import Depends
+from sqlalchemy import Connection, event, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from core.config import get_settings
 from core.config import Settings
 logger = logging.getLogger(__name__)
 
 
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """带等待时间统计的连接池，用于观察连接池是否成为并发瓶颈"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.wait_seconds_total = 0.0
+        self.wait_count = 0
+
+    def _do_get(self) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_seconds_total += time.perf_counter() - started_at
+            self.wait_count += 1
+
+
+class ReplicaRouter:
+    """只读副本路由，在健康的副本之间轮询，所有副本不可用时返回None(回退到主库)"""
+
+    def __init__(self, session_factories: List[async_sessionmaker[AsyncSession]]):
+        self._session_factories = session_factories
+        self._healthy = [True] * len(session_factories)
+        self._counter = itertools.count()
+
+    def next(self) -> Optional[async_sessionmaker[AsyncSession]]:
+        """按轮询顺序返回下一个健康副本的会话工厂"""
+        total = len(self._session_factories)
+        for _ in range(total):
+            index = next(self._counter) % total
+            if self._healthy[index]:
+                return self._session_factories[index]
+        return None
+
+    def mark(self, index: int, healthy: bool) -> None:
+        """更新副本健康状态"""
+        self._healthy[index] = healthy
+
+    @property
+    def healthy_count(self) -> int:
+        return sum(self._healthy)
+
+
 class Postgres:
     """Postgres数据库基础类，用于完成数据库连接等配置操作"""
 
@@ -18,8 +67,39 @@ class Postgres:
         """构造函数，完成postgres数据库引擎、会话工厂的创建"""
         self._engine: Optional[AsyncEngine] = None
         self._session_factory: Optional[async_sessionmaker] = None
+        self._replica_engines: List[AsyncEngine] = []
+        self._replica_router: Optional[ReplicaRouter] = None
+        self._replica_health_task: Optional[asyncio.Task] = None
         self._settings: Settings = get_settings()
 
+    def _create_engine(self, url: str) -> AsyncEngine:
+        """按Settings中的连接池参数创建异步引擎，配置了连接预算时按worker数均分"""
+        pool_size, max_overflow = self._settings.database_pool_limits()
+        return create_async_engine(
+            url,
+            echo=True if self._settings.ENV == "development" else False,
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=self._settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=self._settings.DATABASE_POOL_RECYCLE,
+            pool_pre_ping=self._settings.DATABASE_POOL_PRE_PING,
+            # 使用 connect_args 显式指定连接参数，避免服务名解析问题
+            connect_args={
+                "statement_cache_size": self._settings.DATABASE_STATEMENT_CACHE_SIZE,
+                "server_settings": {
+                    "application_name": "minimus_api"
+                }
+            }
+        )
+
+    def _create_session_factory(self, engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=engine,
+        )
+
     async def init(self) -> None:
         """初始化postgres连接"""
         # 1.判断是否已经创建好引擎，如果连上了则中断程序
@@ -30,36 +110,77 @@ class Postgres:
         try:
             # 2.创建异步引擎
             logger.info("正在初始化Postgres连接...")
-            # 使用 connect_args 显式指定连接参数，避免服务名解析问题
-            self._engine = create_async_engine(
-                self._settings.DATABASE_URL,
-                echo=True if self._settings.ENV == "development" else False,
-                connect_args={
-                    "server_settings": {
-                        "application_name": "minimus_api"
-                    }
-                }
-            )
+            self._engine = self._create_engine(self._settings.DATABASE_URL)
 
             # 3.创建会话工厂
-            self._session_factory = async_sessionmaker(
-                autocommit=False,
-                autoflush=False,
-                bind=self._engine,
-            )
-            logger.info("Postgres会话工厂创建完毕")
-
-            # 4.连接Postgres并执行预操作
-            async with self._engine.begin() as async_conn:
-                # 5.检查是否安装了uuid扩展，如果没有的话则安装
-                await async_conn.execute(text('CREATE EXTENSION IF NOT EXISTS "uuid-ossp";'))
-                logger.info("成功连接Postgres并安装uuid-ossp扩展")
+            self._session_factory = self._create_session_factory(self._engine)
+            pool_size, max_overflow = self._settings.database_pool_limits()
+            logger.info(f"Postgres会话工厂创建完毕，连接池大小: {pool_size}，最大溢出: {max_overflow}")
+
+            # 4.创建只读副本引擎
+            if self._settings.DATABASE_REPLICA_URLS:
+                self._replica_engines = [self._create_engine(url) for url in self._settings.DATABASE_REPLICA_URLS]
+                self._replica_router = ReplicaRouter(
+                    [self._create_session_factory(engine) for engine in self._replica_engines]
+                )
+
+            # 5.连接主库(同时预热一个池连接)与探测副本并发进行
+            await asyncio.gather(self._prepare_primary(), self._check_replicas())
+            if self._replica_router is not None:
+                self._replica_health_task = asyncio.create_task(self._replica_health_loop())
+                logger.info(
+                    f"Postgres只读副本初始化完毕，副本数: {len(self._replica_engines)}，"
+                    f"健康副本数: {self._replica_router.healthy_count}"
+                )
         except Exception as e:
             logger.error(f"连接Postgres失败: {str(e)}")
             raise
 
+    async def _prepare_primary(self) -> None:
+        """连接主库；扩展等一次性的库结构准备由alembic迁移完成，不在每个worker启动时执行DDL"""
+        if not self._settings.DATABASE_ENSURE_EXTENSIONS:
+            await self.ping()
+            logger.info("成功连接Postgres")
+            return
+
+        async with self._engine.begin() as async_conn:
+            # 检查是否安装了uuid扩展，如果没有的话则安装
+            await async_conn.execute(text('CREATE EXTENSION IF NOT EXISTS "uuid-ossp";'))
+            logger.info("成功连接Postgres并安装uuid-ossp扩展")
+
+    async def _check_replicas(self) -> None:
+        """并发探测所有副本，更新健康状态"""
+
+        async def ping(index: int, engine: AsyncEngine) -> None:
+            try:
+                async with asyncio.timeout(self._settings.DATABASE_POOL_TIMEOUT):
+                    async with engine.connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+                healthy = True
+            except Exception as e:
+                logger.warning(f"Postgres只读副本不可用: {engine.url.render_as_string(hide_password=True)}, {str(e)}")
+                healthy = False
+            if self._replica_router is not None:
+                self._replica_router.mark(index, healthy)
+
+        await asyncio.gather(*[ping(index, engine) for index, engine in enumerate(self._replica_engines)])
+
+    async def _replica_health_loop(self) -> None:
+        """定期检查副本健康状态，已下线的副本恢复后重新加入轮询"""
+        while True:
+            await asyncio.sleep(self._settings.DATABASE_REPLICA_RETRY_INTERVAL)
+            await self._check_replicas()
+
     async def shutdown(self) -> None:
         """关闭Postgres连接"""
+        if self._replica_health_task is not None:
+            self._replica_health_task.cancel()
+            self._replica_health_task = None
+        for engine in self._replica_engines:
+            await engine.dispose()
+        self._replica_engines = []
+        self._replica_router = None
+
         if self._engine:
             await self._engine.dispose()
             self._engine = None
@@ -68,6 +189,38 @@ class Postgres:
 
         get_postgres.cache_clear()
 
+    async def ping(self) -> None:
+        """从主库连接池取出连接执行SELECT 1，用于就绪检查"""
+        if self._engine is None:
+            raise RuntimeError("Postgres未初始化，请先调用init()函数初始化")
+        async with self._engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    def pool_stats(self) -> List[Dict[str, Any]]:
+        """返回主库与各副本连接池的统计信息"""
+        engines = [("primary", self._engine)] if self._engine is not None else []
+        engines += [(f"replica_{index}", engine) for index, engine in enumerate(self._replica_engines)]
+
+        stats = []
+        for name, engine in engines:
+            pool = engine.pool
+            if not isinstance(pool, InstrumentedAsyncQueuePool):
+                continue
+            stats.append({
+                "engine": name,
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "wait_seconds_total": pool.wait_seconds_total,
+                "wait_count": pool.wait_count,
+            })
+        return stats
+
+    @property
+    def settings(self) -> Settings:
+        return self._settings
+
     @property
     def session_factory(self) -> async_sessionmaker[AsyncSession]:
         """只读属性，返回已初始化的会话工厂"""
@@ -75,6 +228,15 @@ class Postgres:
             raise RuntimeError("Postgres未初始化，请先调用init()函数初始化")
         return self._session_factory
 
+    @property
+    def read_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """只读属性，轮询返回健康只读副本的会话工厂，未配置副本或副本全部不可用时返回主库会话工厂"""
+        if self._replica_router is not None:
+            session_factory = self._replica_router.next()
+            if session_factory is not None:
+                return session_factory
+        return self.session_factory
+
 
 @lru_cache()
 def get_postgres() -> Postgres:
@@ -82,18 +244,82 @@ def get_postgres() -> Postgres:
     return Postgres()
 
 
-async def get_db_session() -> AsyncSession:
-    """FastAPI依赖项，用于在每个请求中异步获取数据库会话实例，确保会话在正确使用后被关闭"""
-    # 1.获取引擎和会话工厂
-    db = get_postgres()
-    session_factory = db.session_factory
+class LazySession:
+    """惰性数据库会话：首次访问时才创建AsyncSession，未使用数据库的请求不会占用连接
+
+    属性访问会代理到底层AsyncSession，可按AsyncSession的方式使用(execute/add/get等)。
+    read_only为True时会路由到只读副本、不提交事务，并可在事务开始时执行SET TRANSACTION READ ONLY。
+    """
+
+    def __init__(self, read_only: bool = False):
+        self._read_only = read_only
+        self._session: Optional[AsyncSession] = None
+
+    @property
+    def read_only(self) -> bool:
+        return self._read_only
+
+    @property
+    def session(self) -> AsyncSession:
+        """获取底层会话，首次访问时创建"""
+        if self._session is None:
+            db = get_postgres()
+            if self._read_only:
+                self._session = db.read_session_factory()
+                if db.settings.DATABASE_ENFORCE_READ_ONLY:
+                    event.listen(self._session.sync_session, "after_begin", _set_transaction_read_only)
+            else:
+                self._session = db.session_factory()
+        return self._session
 
-    # 2.创建会话上下文，在上下文内完成数据提交
-    async with session_factory() as session:
+    @property
+    def in_use(self) -> bool:
+        """是否已经创建过会话"""
+        return self._session is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    async def release(self, commit: bool = True) -> None:
+        """结束数据库操作并把连接归还连接池，可在处理函数中途主动调用以尽早释放连接"""
+        if self._session is None:
+            return
+
+        session, self._session = self._session, None
         try:
-            yield session
-            await session.commit()
-        except Exception as _:
-            await session.rollback()
-            raise
+            if commit and not self._read_only:
+                await session.commit()
+            else:
+                await session.rollback()
+        finally:
+            await session.close()
+
+
+def _set_transaction_read_only(session: Session, transaction: Any, connection: Connection) -> None:
+    """事务开始时声明只读，误写入时由数据库直接报错"""
+    connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+
+
+async def get_db_session() -> AsyncIterator[LazySession]:
+    """FastAPI依赖项，用于在每个请求中获取惰性数据库会话实例，首次使用时才签出连接，正常结束时提交，异常时回滚"""
+    session = LazySession()
+    try:
+        yield session
+    except Exception as _:
+        await session.release(commit=False)
+        raise
+    await session.release()
+
+
+async def get_read_only_db_session() -> AsyncIterator[LazySession]:
+    """FastAPI依赖项，获取只读惰性会话，优先路由到只读副本，结束时不提交"""
+    session = LazySession(read_only=True)
+    try:
+        yield session
+    finally:
+        await session.release(commit=False)
+
 
+# 使用function作用域：处理函数返回后立即归还连接，而不是等到响应(包括流式响应)发送完毕
+DBSession = Annotated[LazySession, Depends(get_db_session, scope="function")]
+ReadOnlyDBSession = Annotated[LazySession, Depends(get_read_only_db_session, scope="function")]
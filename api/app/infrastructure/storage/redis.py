@@ -1,14 +1,105 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
 from functools import lru_cache
 import logging
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, ConnectionPool, Redis
+from redis.asyncio.client import Pipeline, PubSub
+from redis.exceptions import ResponseError
+from redis.commands.core import AsyncScript
 from core.config import get_settings, Settings
-from typing import Any, List, Dict
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
+
+class RedisAutoBatcher:
+    """自动批处理器：将同一个事件循环tick内发出的命令合并到一个pipeline中执行，只消耗一次网络往返"""
+
+    def __init__(self, client: Redis, max_batch_size: int) -> None:
+        self._client = client
+        self._max_batch_size = max_batch_size
+        self._pending: List[Tuple[str, tuple, dict, asyncio.Future]] = []
+        self._flush_scheduled = False
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, command: str, *args: Any, **kwargs: Any) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((command, args, kwargs, future))
+
+        # 攒满一批立即发送，否则在当前tick结束后统一发送
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return future
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._execute(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, pending: List[Tuple[str, tuple, dict, asyncio.Future]]) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        for command, args, kwargs, _ in pending:
+            getattr(pipe, command)(*args, **kwargs)
+
+        try:
+            results = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            for *_, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (*_, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """带等待时间统计的阻塞连接池"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_seconds_total = 0.0
+        self.wait_count = 0
+
+    async def get_connection(self, *args: Any, **kwargs: Any):
+        started_at = time.perf_counter()
+        try:
+            return await super().get_connection(*args, **kwargs)
+        finally:
+            self.wait_seconds_total += time.perf_counter() - started_at
+            self.wait_count += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "in_use": len(self._in_use_connections),
+            "idle": len(self._available_connections),
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_count": self.wait_count,
+        }
+
+
 class RedisClient:
     def __init__(self) -> None:
         self._client : Redis | None = None
+        self._pool: InstrumentedConnectionPool | None = None
+        self._pubsub_client: Redis | None = None
+        self._batcher: RedisAutoBatcher | None = None
+        self._scripts: Dict[str, AsyncScript] = {}
         self._settings: Settings = get_settings()
 
     async def init(self) -> None:
@@ -16,12 +107,39 @@ class RedisClient:
             return
         
         try:
-            self._client = Redis(host=self._settings.REDIS_HOST, port=self._settings.REDIS_PORT, db=self._settings.REDIS_DB
-                ,decode_responses=True)
+            # 显式创建连接池，连接数按worker设置；连接耗尽时排队等待而不是直接报错
+            self._pool = InstrumentedConnectionPool(
+                host=self._settings.REDIS_HOST,
+                port=self._settings.REDIS_PORT,
+                db=self._settings.REDIS_DB,
+                decode_responses=True,
+                max_connections=self._settings.REDIS_MAX_CONNECTIONS,
+                timeout=self._settings.REDIS_POOL_TIMEOUT,
+                socket_timeout=self._settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=self._settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+                socket_keepalive=True,
+                health_check_interval=self._settings.REDIS_HEALTH_CHECK_INTERVAL,
+                retry_on_timeout=self._settings.REDIS_RETRY_ON_TIMEOUT,
+            )
+            self._client = Redis(connection_pool=self._pool)
+            # pub/sub连接长时间空闲等待消息，使用独立连接池且不设置读超时，避免空闲时被读超时断开重连而丢消息；
+            # 失效连接由health_check_interval的PING与TCP keepalive发现
+            self._pubsub_client = Redis(connection_pool=ConnectionPool(
+                host=self._settings.REDIS_HOST,
+                port=self._settings.REDIS_PORT,
+                db=self._settings.REDIS_DB,
+                decode_responses=True,
+                socket_timeout=None,
+                socket_connect_timeout=self._settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+                socket_keepalive=True,
+                health_check_interval=self._settings.REDIS_HEALTH_CHECK_INTERVAL,
+            ))
         except Exception as e:
             logger.error(f"Failed to initialize Redis client: {e}")
             raise e
         await self.is_alive()
+        if self._settings.REDIS_AUTO_BATCH:
+            self._batcher = RedisAutoBatcher(self._client, self._settings.REDIS_AUTO_BATCH_MAX_SIZE)
         logger.info("Redis client initialized")
 
     async def is_alive(self) -> bool:
@@ -30,8 +148,15 @@ class RedisClient:
     async def close(self) -> None:
         if self._client is None:
             return
-        await self._client.close()
+        await self._client.aclose()
+        await self._pool.disconnect()
+        await self._pubsub_client.aclose()
+        await self._pubsub_client.connection_pool.disconnect()
         self._client = None
+        self._pool = None
+        self._pubsub_client = None
+        self._scripts.clear()
+        self._batcher = None
         logger.info("Redis client closed")
         get_redis_client.cache_clear()
 
@@ -43,60 +168,140 @@ class RedisClient:
             raise ValueError("Redis client is not initialized")
         return self._client
 
+    def pubsub(self, **kwargs: Any) -> PubSub:
+        """创建pub/sub对象，连接来自不设读超时的独立连接池；读取消息请使用get_message(timeout=...)轮询"""
+        if self._pubsub_client is None:
+            raise ValueError("Redis client is not initialized")
+        return self._pubsub_client.pubsub(**kwargs)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self._pool.stats() if self._pool is not None else {}
+
+    async def _execute(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        # 开启自动批处理时，同一tick内的命令会被合并到一个pipeline中
+        if self._batcher is not None:
+            return await self._batcher.submit(command, *args, **kwargs)
+        return await getattr(self.client, command)(*args, **kwargs)
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False) -> AsyncIterator[Pipeline]:
+        """pipeline上下文，退出时自动发送未执行的命令；transaction=True时使用MULTI/EXEC保证原子性"""
+        async with self.client.pipeline(transaction=transaction) as pipe:
+            yield pipe
+            if len(pipe):
+                await pipe.execute()
+
+    async def get(self, key: str) -> Any:
+        return await self._execute("get", key)
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        return await self._execute("set", key, value, ex=ex)
+
+    async def mget(self, keys: Iterable[str]) -> List[Any]:
+        keys = list(keys)
+        if not keys:
+            return []
+        return await self._execute("mget", keys)
+
+    async def mset(self, mapping: Dict[str, Any], ex: Optional[int] = None) -> None:
+        if not mapping:
+            return
+        # MSET不支持过期时间，带TTL时改为在一个pipeline中批量SET EX
+        if ex is None:
+            await self._execute("mset", mapping)
+            return
+        async with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ex)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        if not keys:
+            return 0
+        # UNLINK在后台线程释放内存，批量删除大key时不会阻塞Redis
+        return await self._execute("unlink", *keys)
+
+    async def hgetall_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        async with self.pipeline() as pipe:
+            for key in keys:
+                pipe.hgetall(key)
+            results = await pipe.execute()
+        return dict(zip(keys, results))
+
+    async def hset_many(self, mapping: Dict[str, Dict[str, Any]], ex: Optional[int] = None) -> None:
+        mapping = {key: fields for key, fields in mapping.items() if fields}
+        if not mapping:
+            return
+        async with self.pipeline() as pipe:
+            for key, fields in mapping.items():
+                pipe.hset(key, mapping=fields)
+                if ex is not None:
+                    pipe.expire(key, ex)
 
     async def setnxex(self, key: str, value: Any, seconds: int) -> bool:
-        return await self._client.setnxex(key, value, seconds)
-    
-    async def setnxex(self, key: str, value: Any, seconds: int) -> bool:
-        return await self._client.setnxex(key, value, seconds)
+        return bool(await self._execute("set", key, value, nx=True, ex=seconds))
+
+    async def setnxpx(self, key: str, value: Any, milliseconds: int) -> bool:
+        return bool(await self._execute("set", key, value, nx=True, px=milliseconds))
+
+    async def eval_script(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        # 脚本对象按内容缓存，之后走EVALSHA，避免每次发送完整脚本
+        command = self._scripts.get(script)
+        if command is None:
+            command = self.client.register_script(script)
+            self._scripts[script] = command
+        return await command(keys=keys, args=args)
     
     async def delete(self, key: str) -> None:
-        await self._client.delete(key)
+        await self._execute("delete", key)
     
     async def exists(self, key: str) -> bool:
-        return await self._client.exists(key)
+        return await self._execute("exists", key)
     
     async def incr(self, key: str) -> int:
-        return await self._client.incr(key)
+        return await self._execute("incr", key)
     
     async def decr(self, key: str) -> int:
-        return await self._client.decr(key)
+        return await self._execute("decr", key)
     
     async def incrby(self, key: str, amount: int) -> int:
-        return await self._client.incrby(key, amount)
+        return await self._execute("incrby", key, amount)
     
     async def decrby(self, key: str, amount: int) -> int:
-        return await self._client.decrby(key, amount)
+        return await self._execute("decrby", key, amount)
     
     async def hget(self, key: str, field: str) -> Any:
-        return await self._client.hget(key, field)
+        return await self._execute("hget", key, field)
     
     async def hset(self, key: str, field: str, value: Any) -> None:
-        await self._client.hset(key, field, value)
+        await self._execute("hset", key, field, value)
     
     async def hgetall(self, key: str) -> Dict[str, Any]:
-        return await self._client.hgetall(key)
+        return await self._execute("hgetall", key)
     
     async def hdel(self, key: str, field: str) -> None:
-        await self._client.hdel(key, field)
+        await self._execute("hdel", key, field)
     
     async def hkeys(self, key: str) -> List[str]:
-        return await self._client.hkeys(key)
+        return await self._execute("hkeys", key)
     
     async def hvals(self, key: str) -> List[Any]:
-        return await self._client.hvals(key)
+        return await self._execute("hvals", key)
     
     async def hlen(self, key: str) -> int:
-        return await self._client.hlen(key)
+        return await self._execute("hlen", key)
     
     async def hsetnx(self, key: str, field: str, value: Any) -> bool:
-        return await self._client.hsetnx(key, field, value)
+        return await self._execute("hsetnx", key, field, value)
     
     async def hmget(self, key: str, fields: List[str]) -> List[Any]:
-        return await self._client.hmget(key, fields)
+        return await self._execute("hmget", key, fields)
     
     async def hmset(self, key: str, mapping: Dict[str, Any]) -> None:
-        await self._client.hmset(key, mapping)
+        await self._execute("hmset", key, mapping)
     
     async def hmgetall(self, key: str) -> Dict[str, Any]:
         return await self._client.hmgetall(key)
@@ -107,14 +312,63 @@ class RedisClient:
     async def hmgetall(self, key: str) -> Dict[str, Any]:
         return await self._client.hmgetall(key)
     
+    async def scan_iter(self, match: str = "*", count: Optional[int] = None, _type: Optional[str] = None) -> AsyncIterator[str]:
+        # SCAN按游标增量遍历，不会像KEYS一样阻塞整个Redis
+        async for key in self.client.scan_iter(match=match, count=count or self._settings.REDIS_SCAN_COUNT, _type=_type):
+            yield key
+
+    async def hscan_iter(self, key: str, match: Optional[str] = None, count: Optional[int] = None) -> AsyncIterator[Tuple[str, Any]]:
+        async for item in self.client.hscan_iter(key, match=match, count=count or self._settings.REDIS_SCAN_COUNT):
+            yield item
+
+    async def sscan_iter(self, key: str, match: Optional[str] = None, count: Optional[int] = None) -> AsyncIterator[Any]:
+        async for member in self.client.sscan_iter(key, match=match, count=count or self._settings.REDIS_SCAN_COUNT):
+            yield member
+
     async def keys(self, pattern: str) -> List[str]:
-        return await self._client.keys(pattern)
+        # 基于SCAN实现，结果量大时请直接使用scan_iter流式遍历
+        return [key async for key in self.scan_iter(match=pattern)]
 
     async def ttl(self, key: str) -> int:
-        return await self._client.ttl(key)
+        return await self._execute("ttl", key)
 
     async def expire(self, key: str, seconds: int) -> bool:
-        return await self._client.expire(key, seconds)
+        return await self._execute("expire", key, seconds)
+
+    async def xadd(self, key: str, fields: Dict[str, Any], maxlen: Optional[int] = None) -> str:
+        # 按近似长度裁剪，Redis可以整块删除节点，开销远小于精确裁剪
+        return await self._execute("xadd", key, fields, maxlen=maxlen, approximate=True)
+
+    async def xack(self, key: str, group: str, *ids: str) -> int:
+        if not ids:
+            return 0
+        return await self._execute("xack", key, group, *ids)
+
+    async def xgroup_create(self, key: str, group: str, id: str = "0") -> bool:
+        """创建消费者组(Stream不存在时一并创建)，组已存在时返回False"""
+        try:
+            return await self.client.xgroup_create(key, group, id=id, mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+            return False
+
+    async def xreadgroup(
+            self, group: str, consumer: str, streams: Dict[str, str], count: Optional[int] = None, block: Optional[int] = None
+    ) -> List[Any]:
+        # 阻塞读取会占用连接直到有消息或超时，不能进入自动批处理的pipeline
+        return await self.client.xreadgroup(group, consumer, streams, count=count, block=block)
+
+    async def xautoclaim(
+            self, key: str, group: str, consumer: str, min_idle_time: int, start_id: str = "0-0", count: Optional[int] = None
+    ) -> List[Any]:
+        return await self._execute("xautoclaim", key, group, consumer, min_idle_time, start_id=start_id, count=count)
+
+    async def xclaim_ids(self, key: str, group: str, consumer: str, min_idle_time: int, ids: List[str]) -> List[str]:
+        """以JUSTID方式认领消息，只重置空闲时间，常用于为执行中的消息续租"""
+        if not ids:
+            return []
+        return await self._execute("xclaim", key, group, consumer, min_idle_time, ids, justid=True)
 
 
 @lru_cache
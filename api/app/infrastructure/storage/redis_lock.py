@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import random
+import time
+import uuid
+from typing import Optional
+
+from core.config import get_settings
+from .redis import RedisClient
+
+logger = logging.getLogger(__name__)
+
+# 只有持有者(token一致)才能释放/续期，避免误删其他实例在锁过期后重新获取的锁
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class LockNotAcquiredError(RuntimeError):
+    """在超时时间内未能获取分布式锁"""
+
+
+class RedisLock:
+    """基于Redis的分布式锁：SET NX PX加锁，Lua脚本校验token后释放，持有期间后台自动续期"""
+
+    def __init__(
+            self,
+            redis: RedisClient,
+            name: str,
+            lease_ms: Optional[int] = None,
+            auto_renew: bool = True,
+    ):
+        """构造函数，lease_ms为锁的租期，auto_renew开启时每1/3租期续期一次"""
+        settings = get_settings()
+        self._redis = redis
+        self.name = name
+        self._lease_ms = lease_ms or settings.LOCK_LEASE_MS
+        self._retry_interval = settings.LOCK_RETRY_INTERVAL
+        self._auto_renew = auto_renew
+        self._token: Optional[str] = None
+        self._renew_task: Optional[asyncio.Task] = None
+
+    @property
+    def locked(self) -> bool:
+        """当前实例是否持有锁"""
+        return self._token is not None
+
+    async def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        """获取锁，blocking为False时只尝试一次，timeout为None时一直等待"""
+        token = uuid.uuid4().hex
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            if await self._redis.setnxpx(self.name, token, self._lease_ms):
+                self._token = token
+                if self._auto_renew:
+                    self._renew_task = asyncio.create_task(self._renew_loop(token))
+                return True
+
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                return False
+
+            # 加随机抖动，避免大量等待者同时重试
+            await asyncio.sleep(self._retry_interval * (0.5 + random.random()))
+
+    async def release(self) -> bool:
+        """释放锁，只有token一致时才会删除，返回是否释放成功"""
+        if self._token is None:
+            return False
+
+        token, self._token = self._token, None
+        if self._renew_task is not None:
+            # 等待续期任务真正结束，避免其在释放后仍持有连接或输出告警
+            renew_task, self._renew_task = self._renew_task, None
+            renew_task.cancel()
+            await asyncio.gather(renew_task, return_exceptions=True)
+        return bool(await self._redis.eval_script(_RELEASE_SCRIPT, [self.name], [token]))
+
+    async def renew(self) -> bool:
+        """手动续期，返回是否仍持有锁"""
+        if self._token is None:
+            return False
+        return bool(await self._redis.eval_script(_RENEW_SCRIPT, [self.name], [self._token, self._lease_ms]))
+
+    async def _renew_loop(self, token: str) -> None:
+        """后台续期任务，锁丢失(已过期或被他人持有)后停止"""
+        interval = self._lease_ms / 3000
+        while self._token == token:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.renew():
+                    logger.warning(f"分布式锁已丢失，停止续期: {self.name}")
+                    return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"分布式锁续期失败: {self.name}, {str(e)}")
+
+    async def __aenter__(self) -> "RedisLock":
+        if not await self.acquire():
+            raise LockNotAcquiredError(f"获取分布式锁失败: {self.name}")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.release()
@@ -0,0 +1,47 @@
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, Query
+import logging
+from app.interfaces.schemas.base import Response
+from app.interfaces.schemas.demo import DemoItem, DemoPage
+from app.interfaces.responses import NDJSONResponse, iter_ndjson
+from app.infrastructure.repositories import DemoRepository
+from app.infrastructure.storage.postgres import LazySession, ReadOnlyDBSession
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/demos", tags=["Demo模块"])
+
+
+@router.get(path="", response_model=Response[DemoPage],
+            summary="Demo列表",
+            description="按创建时间游标分页查询Demo数据，使用返回的next_cursor获取下一页")
+async def list_demos(
+        db: ReadOnlyDBSession,
+        limit: int = Query(default=20, ge=1, le=100, description="每页条数"),
+        cursor: Optional[str] = Query(default=None, description="分页游标"),
+) -> Response[DemoPage]:
+    """游标分页查询Demo列表"""
+    page = await DemoRepository(db).list_page(limit=limit, cursor=cursor)
+    return Response.success(data=DemoPage(
+        items=[DemoItem.model_validate(item) for item in page.items],
+        next_cursor=page.next_cursor,
+    ))
+
+
+@router.get(path="/stream",
+            summary="Demo全量导出",
+            description="以NDJSON格式流式导出全部Demo数据，服务端游标分批读取，内存占用与数据量无关")
+async def stream_demos() -> NDJSONResponse:
+    """流式导出Demo数据"""
+
+    async def rows() -> AsyncIterator[Dict[str, Any]]:
+        # 流式响应在处理函数返回后才发送，会话需要在生成器内部管理
+        session = LazySession(read_only=True)
+        try:
+            async for row in DemoRepository(session).stream():
+                yield dict(row)
+        finally:
+            await session.release(commit=False)
+
+    return NDJSONResponse(iter_ndjson(rows()))
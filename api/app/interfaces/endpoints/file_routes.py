@@ -0,0 +1,109 @@
+import uuid
+from typing import Union
+from urllib.parse import quote
+
+from fastapi import APIRouter, Query
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+import logging
+from app.interfaces.schemas.base import Response
+from app.interfaces.schemas.file import (
+    CompleteUploadRequest,
+    CreateUploadRequest,
+    DownloadUrl,
+    FileItem,
+    PresignedPartItem,
+    PresignedParts,
+    PresignPartsRequest,
+    UploadTicketInfo,
+)
+from app.application.services.file_service import FileService
+from app.infrastructure.storage.cos import get_cos
+from app.infrastructure.storage.postgres import DBSession, ReadOnlyDBSession
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/files", tags=["文件模块"])
+
+
+@router.post(path="/uploads", response_model=Response[UploadTicketInfo], status_code=201,
+             summary="创建文件直传",
+             description="签发直传COS的预签名URL，大文件返回各分块的上传URL，文件内容不经过API服务；上传完成后调用完成回调接口")
+async def create_upload(db: DBSession, request: CreateUploadRequest) -> Response[UploadTicketInfo]:
+    """创建文件直传"""
+    ticket = await FileService(db).create_upload(request.filename, request.size, request.content_type)
+    return Response.success(data=UploadTicketInfo.model_validate(ticket))
+
+
+@router.post(path="/{file_id}/parts", response_model=Response[PresignedParts],
+             summary="重新签发分块上传URL",
+             description="分块上传耗时超过URL有效期时，为尚未上传的分块重新签发URL")
+async def presign_parts(file_id: uuid.UUID, db: ReadOnlyDBSession, request: PresignPartsRequest) -> Response[PresignedParts]:
+    """重新签发分块上传URL"""
+    parts, expires_at = await FileService(db).presign_parts(file_id, request.part_numbers)
+    return Response.success(data=PresignedParts(
+        expires_at=expires_at,
+        parts=[PresignedPartItem.model_validate(part) for part in parts],
+    ))
+
+
+@router.post(path="/{file_id}/complete", response_model=Response[FileItem],
+             summary="文件上传完成回调",
+             description="客户端直传完成后调用，服务端合并分块并确认对象大小后记录文件元数据，重复调用幂等")
+async def complete_upload(file_id: uuid.UUID, db: DBSession, request: CompleteUploadRequest) -> Response[FileItem]:
+    """文件上传完成回调"""
+    parts = {part.part_number: part.etag for part in request.parts}
+    record = await FileService(db).complete_upload(file_id, parts)
+    return Response.success(data=FileItem.model_validate(record))
+
+
+@router.get(path="/{file_id}", response_model=Response[FileItem],
+            summary="文件详情",
+            description="查询文件元数据与上传状态")
+async def get_file(file_id: uuid.UUID, db: ReadOnlyDBSession) -> Response[FileItem]:
+    """查询文件元数据"""
+    record = await FileService(db).get(file_id)
+    return Response.success(data=FileItem.model_validate(record))
+
+
+@router.get(path="/{file_id}/download", response_model=Response[DownloadUrl],
+            summary="文件下载",
+            description="签发预签名下载URL，redirect为true时直接307重定向到COS，文件内容不经过API服务")
+async def download_file(
+        file_id: uuid.UUID,
+        db: ReadOnlyDBSession,
+        redirect: bool = Query(default=False, description="是否直接重定向到下载URL"),
+) -> Union[Response[DownloadUrl], RedirectResponse]:
+    """签发文件下载URL"""
+    url, expires_at = await FileService(db).presign_download(file_id)
+    if redirect:
+        return RedirectResponse(url, status_code=307)
+    return Response.success(data=DownloadUrl(url=url, expires_at=expires_at))
+
+
+@router.api_route(path="/{file_id}/content", methods=["GET", "HEAD"], response_class=FileResponse, response_model=None,
+                  summary="读取文件内容",
+                  description="经本机磁盘缓存返回文件内容，支持Range请求；对象超出缓存上限时直接从COS流式转发")
+async def read_file_content(
+        file_id: uuid.UUID,
+        db: ReadOnlyDBSession,
+) -> Union[FileResponse, StreamingResponse]:
+    """读取文件内容"""
+    record, entry = await FileService(db).open_content(file_id)
+    media_type = record.content_type or "application/octet-stream"
+    if entry is None:
+        return StreamingResponse(
+            get_cos().stream_object(record.key),
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f"inline; filename*=UTF-8''{quote(record.filename)}",
+                "Content-Length": str(record.size),
+                "ETag": f'"{record.etag}"',
+            },
+        )
+    return FileResponse(
+        entry.path,
+        media_type=media_type,
+        filename=record.filename,
+        content_disposition_type="inline",
+        headers={"ETag": f'"{entry.etag}"'},
+    )
@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+import logging
+from app.interfaces.schemas.base import Response
+from app.interfaces.schemas.job import JobInfo, SubmitJobRequest
+from app.application.services.job_service import get_job_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/jobs", tags=["任务模块"])
+
+
+@router.post(path="", response_model=Response[JobInfo], status_code=202,
+             summary="投递后台任务",
+             description="将耗时任务投递到任务队列后立即返回任务ID，由独立的worker进程执行，通过任务详情接口查询状态与结果")
+async def submit_job(request: SubmitJobRequest) -> Response[JobInfo]:
+    """投递后台任务"""
+    job = await get_job_service().submit(request.name, request.payload, max_attempts=request.max_attempts)
+    return Response.success(data=JobInfo.model_validate(job))
+
+
+@router.get(path="/{job_id}", response_model=Response[JobInfo],
+            summary="任务详情",
+            description="查询任务状态、执行次数与结果")
+async def get_job(job_id: str) -> Response[JobInfo]:
+    """查询任务状态与结果"""
+    job = await get_job_service().get(job_id)
+    return Response.success(data=JobInfo.model_validate(job))
@@ -1,10 +1,18 @@
 from fastapi import APIRouter
 from .status_routes import router as status_routes
+from .demo_routes import router as demo_routes
+from .file_routes import router as file_routes
+from .job_routes import router as job_routes
+from .session_routes import router as session_routes
 
 def create_api_router() -> APIRouter:
     """创建API总路由, 涵盖所有API路由"""
     router = APIRouter()
     router.include_router(status_routes)
+    router.include_router(demo_routes)
+    router.include_router(job_routes)
+    router.include_router(session_routes)
+    router.include_router(file_routes)
     return router
 
 routers = create_api_router()
\ No newline at end of file
@@ -0,0 +1,79 @@
+import asyncio
+from typing import AsyncIterator, Optional
+
+import orjson
+from fastapi import APIRouter, Header, Query
+import logging
+from app.application.errors.exceptions import BadRequestError
+from app.interfaces.schemas.base import Response
+from app.interfaces.schemas.session import PublishEventRequest, PublishedEvent
+from app.interfaces.responses import EventSourceResponse, format_sse
+from app.infrastructure.events import END_EVENT, SessionEvent, get_event_broker, is_stream_id, stream_id_key
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/sessions", tags=["会话模块"])
+
+
+@router.get(path="/{session_id}/events",
+            summary="订阅会话事件",
+            description="以SSE推送会话的增量输出，断线重连时通过Last-Event-ID从历史中续传，收到end事件后连接关闭")
+async def stream_session_events(
+        session_id: str,
+        last_event_id: Optional[str] = Header(default=None, description="浏览器重连时自动携带的最后事件ID"),
+        after: Optional[str] = Query(default=None, description="从该事件ID之后开始推送，用于无法设置请求头的首次连接"),
+        replay: bool = Query(default=False, description="是否从头推送会话的全部历史事件"),
+) -> EventSourceResponse:
+    """订阅会话事件"""
+    settings = get_settings()
+    broker = get_event_broker()
+    resume_from = last_event_id or after
+    # 非法的事件ID必须在返回响应前拒绝，否则会在推送retry之后才报错，浏览器将无限重连
+    if resume_from is not None and not is_stream_id(resume_from):
+        raise BadRequestError(f"非法的事件ID: {resume_from}")
+
+    async def events() -> AsyncIterator[bytes]:
+        # 1.先订阅实时事件再读取历史，避免两者之间发布的事件丢失
+        async with broker.subscribe(session_id) as subscription:
+            yield f"retry: {settings.SSE_RETRY_MS}\n\n".encode("utf-8")
+            last_id = resume_from
+            if resume_from or replay:
+                for event in await broker.history(session_id, after=resume_from):
+                    yield _encode(event)
+                    last_id = event.id
+                    if event.event == END_EVENT:
+                        return
+
+            # 2.推送实时事件，空闲时发送心跳注释，防止代理因空闲断开连接
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=settings.SSE_HEARTBEAT_INTERVAL)
+                except TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if event is None:
+                    # 订阅被关闭(消费过慢或实例停机)，客户端会携带Last-Event-ID重连
+                    return
+                if last_id is not None and stream_id_key(event.id) <= stream_id_key(last_id):
+                    continue
+                yield _encode(event)
+                last_id = event.id
+                if event.event == END_EVENT:
+                    return
+
+    return EventSourceResponse(events())
+
+
+def _encode(event: SessionEvent) -> bytes:
+    return format_sse(event.data, event=event.event, event_id=event.id)
+
+
+@router.post(path="/{session_id}/events", response_model=Response[PublishedEvent],
+             summary="发布会话事件",
+             description="向会话的所有订阅者推送一条事件，事件同时写入会话历史用于断线续传")
+async def publish_session_event(session_id: str, request: PublishEventRequest) -> Response[PublishedEvent]:
+    """发布会话事件"""
+    data = request.data if isinstance(request.data, str) else orjson.dumps(request.data).decode("utf-8")
+    event_id = await get_event_broker().publish(session_id, request.event, data)
+    return Response.success(data=PublishedEvent(id=event_id))
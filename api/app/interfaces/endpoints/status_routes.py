@@ -1,26 +1,61 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 import logging
 from app.interfaces.schemas.base import Response
-from app.application.errors.exceptions import BadRequestError, NotFoundError
-from app.infrastructure.storage.redis import get_redis_client
+from app.interfaces.responses import ORJSONResponse, PreRenderedJSONResponse
+from app.interfaces.schemas.status import ReadinessStatus
+from app.application.services.health_service import get_health_service
+from app.infrastructure.metrics import get_metrics_registry
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/status", tags=["状态模块"])
 
-@router.get(path="/healthz", response_model=Response,
-            summary="健康检查",
-            description="用于检测系统的运行状态")
-async def healthz() -> Response:
-    """健康检查"""
-    logger.info("健康检查")
-    # todo 检查redis postgres 等组件的运行状态
-    redis_client = get_redis_client()
+# 存活检查响应体固定不变，启动时序列化一次
+_LIVEZ_BODY = Response.success(data={"status": "ok"}).model_dump_json().encode("utf-8")
+
+@router.get(path="/livez", response_model=Response,
+            summary="存活检查",
+            description="只检测进程能否响应请求，不访问任何外部依赖，供存活探针使用")
+async def livez() -> PreRenderedJSONResponse:
+    """存活检查"""
+    return PreRenderedJSONResponse(content=_LIVEZ_BODY)
+
+
+async def _readiness() -> ORJSONResponse:
+    """执行就绪检查，依赖不可用时返回503，便于编排系统摘除流量"""
+    report = await get_health_service().readiness()
+    data = ReadinessStatus.model_validate(report)
+    if report.ready:
+        return ORJSONResponse(content=Response.success(data=data))
+    return ORJSONResponse(
+        content=Response.error(code=503, msg="服务正在停机" if report.draining else "依赖服务不可用", data=data),
+        status_code=503,
+    )
 
-    is_alive = await redis_client.is_alive()
-    if not is_alive:
-        return Response.error(code=500, message="Redis is not alive")
 
+@router.get(path="/readyz", response_model=Response[ReadinessStatus],
+            summary="就绪检查",
+            description="并发检查Redis、Postgres与COS，单个依赖超时即视为不可用，检查结果短时间缓存")
+async def readyz() -> ORJSONResponse:
+    """就绪检查"""
+    return await _readiness()
+
+
+@router.get(path="/healthz", response_model=Response[ReadinessStatus],
+            summary="健康检查",
+            description="用于检测系统的运行状态，等同于就绪检查")
+async def healthz() -> ORJSONResponse:
+    """健康检查"""
+    return await _readiness()
 
-    return Response.success(data={"status": "ok"})
 
+@router.get(path="/metrics", response_class=PlainTextResponse,
+            summary="监控指标",
+            description="以Prometheus文本格式导出请求与连接池指标，多worker时汇总所有进程")
+async def metrics() -> PlainTextResponse:
+    """导出Prometheus指标"""
+    return PlainTextResponse(
+        await get_metrics_registry().render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,57 +1,58 @@
+from http import HTTPStatus
+
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
 from fastapi.requests import Request
 import logging
 from fastapi import HTTPException
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from app.interfaces.schemas.base import Response
 from app.application.errors.exceptions import AppException
+from app.interfaces.responses import envelope_response
 
 logger = logging.getLogger(__name__)
 
+
+def _is_default_detail(exc: StarletteHTTPException) -> bool:
+    """未指定detail时为状态码的标准短语(如404 Not Found)，属于固定响应体"""
+    try:
+        return exc.detail == HTTPStatus(exc.status_code).phrase
+    except ValueError:
+        return False
+
+
 def register_exception_handlers(app: FastAPI):
     """注册异常处理"""
     
     async def request_validation_error_handler(request: Request, exc: RequestValidationError):
         """请求验证异常处理"""
         logger.error(f"请求验证异常处理: {exc}", exc_info=True)
-        return JSONResponse(
-            content=Response.error(msg=str(exc.errors()), code=400).model_dump(), 
-            status_code=400
-        )
+        return envelope_response(code=400, msg=str(exc.errors()), status_code=400)
 
     async def starlette_http_exception_handler(request: Request, exc: StarletteHTTPException):
         """Starlette HTTP异常处理（包括404等）"""
         logger.error(f"Starlette HTTP异常处理: {exc.status_code} - {exc.detail}", exc_info=True)
-        return JSONResponse(
-            content=Response.error(msg=str(exc.detail), code=exc.status_code).model_dump(), 
-            status_code=exc.status_code
+        return envelope_response(
+            code=exc.status_code, msg=str(exc.detail), status_code=exc.status_code, headers=exc.headers,
+            cache=_is_default_detail(exc),
         )
 
     async def http_exception_handler(request: Request, exc: HTTPException):
         """HTTP异常处理"""
         logger.error(f"HTTP异常处理: {exc}", exc_info=True)
-        return JSONResponse(
-            content=Response.error(msg=exc.detail, code=exc.status_code).model_dump(), 
-            status_code=exc.status_code
+        return envelope_response(
+            code=exc.status_code, msg=str(exc.detail), status_code=exc.status_code, headers=exc.headers,
+            cache=_is_default_detail(exc),
         )
 
     async def app_exception_handler(request: Request, exc: AppException):
         """应用异常处理"""
         logger.error(f"应用异常处理被调用 - 异常类型: {type(exc)}, 消息: {exc.msg}, 状态码: {exc.status_code}", exc_info=True)
-        return JSONResponse(
-            content=Response.error(msg=exc.msg, code=exc.code).model_dump(), 
-            status_code=exc.status_code
-        )
+        return envelope_response(code=exc.code, msg=exc.msg, status_code=exc.status_code)
 
     async def exception_handler(request: Request, exc: Exception):
         """异常处理, 捕获所有未注册的异常"""
         logger.error(f"通用异常处理被调用 - 异常类型: {type(exc)}, 异常: {exc}", exc_info=True)
-        return JSONResponse(
-            content=Response.error(msg="Internal Server Error", code=500).model_dump(), 
-            status_code=500
-        )
+        return envelope_response(code=500, msg="Internal Server Error", status_code=500, cache=True)
 
     # 注册异常处理器
     # StarletteHTTPException 会捕获所有 HTTP 错误，包括 404
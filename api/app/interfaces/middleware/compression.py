@@ -0,0 +1,214 @@
+import asyncio
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Sequence
+
+import brotli
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import Settings, get_settings
+
+
+class _Encoder(ABC):
+    """增量压缩器：compress写入数据，flush输出目前为止可以解压的全部数据，finish结束压缩流"""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """压缩一段数据，返回压缩器当前可输出的部分"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def flush(self) -> bytes:
+        """输出目前为止写入数据的全部压缩结果，压缩流保持可继续写入"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        """结束压缩流并输出剩余数据"""
+        raise NotImplementedError
+
+
+class _GzipEncoder(_Encoder):
+    def __init__(self, level: int):
+        # wbits=31表示输出gzip格式(带gzip头与校验)
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder(_Encoder):
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdEncoder(_Encoder):
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def _encoder_factories(settings: Settings) -> Dict[str, Callable[[], _Encoder]]:
+    return {
+        "zstd": lambda: _ZstdEncoder(settings.COMPRESSION_ZSTD_LEVEL),
+        "br": lambda: _BrotliEncoder(settings.COMPRESSION_BROTLI_QUALITY),
+        "gzip": lambda: _GzipEncoder(settings.COMPRESSION_GZIP_LEVEL),
+    }
+
+
+def select_encoding(accept_encoding: str, supported: Sequence[str]) -> Optional[str]:
+    """按Accept-Encoding的q值选择压缩算法，q值相同时按supported中的顺序优先，q=0表示拒绝"""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """响应压缩中间件，根据Accept-Encoding选择zstd/brotli/gzip
+
+    普通响应整体压缩并重新计算Content-Length；流式响应逐块压缩并在每块后flush，不缓冲整个响应体，
+    客户端可以实时收到数据。小于最小字节数、已经压缩过、分段(206/Content-Range)、Content-Type不可压缩或声明了no-transform的响应原样发送。
+    """
+
+    def __init__(self, app: ASGIApp):
+        settings = get_settings()
+        self.app = app
+        self._supported = list(settings.COMPRESSION_ENCODINGS)
+        self._factories = _encoder_factories(settings)
+        self._min_size = settings.COMPRESSION_MIN_SIZE
+        self._offload_size = settings.COMPRESSION_OFFLOAD_SIZE
+        self._content_types = tuple(settings.COMPRESSION_CONTENT_TYPES)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding", ""), self._supported)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            # 1.响应头暂存到第一个响应体消息，届时才能确定是否压缩
+            if message["type"] == "http.response.start":
+                if self._compressible(message):
+                    start = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            # 2.首个响应体消息：小响应直接发送，其余开始压缩
+            if encoder is None:
+                headers = MutableHeaders(scope=start)
+                headers.add_vary_header("Accept-Encoding")
+                content_length = headers.get("content-length")
+                size = int(content_length) if content_length is not None else (None if more_body else len(body))
+                if size is not None and size < self._min_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                encoder = self._factories[encoding]()
+                headers["Content-Encoding"] = encoding
+                _weaken_etag(headers)
+                if not more_body:
+                    # 完整响应一次性压缩
+                    compressed = await self._run(body, lambda data: encoder.compress(data) + encoder.finish())
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                # 流式响应长度未知，改为chunked传输
+                del headers["Content-Length"]
+                await send(start)
+
+            # 3.流式响应逐块压缩
+            data = await self._run(body, encoder.compress) if body else b""
+            # 每块之后flush，客户端无需等待压缩缓冲区填满即可解压出已发送的内容
+            data += encoder.flush() if more_body else encoder.finish()
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _compressible(self, message: Message) -> bool:
+        status = message["status"]
+        # 206分段响应的Content-Range按原始字节计算，压缩后偏移量失效，客户端拼接会出错
+        if status < 200 or status in (204, 206, 304):
+            return False
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers or "content-range" in headers or "no-transform" in headers.get("cache-control", ""):
+            return False
+        return headers.get("content-type", "").lower().startswith(self._content_types)
+
+    async def _run(self, data: bytes, fn: Callable[[bytes], bytes]) -> bytes:
+        """较大的数据块放到线程池压缩，三种压缩库在压缩时都会释放GIL"""
+        if len(data) >= self._offload_size:
+            return await asyncio.to_thread(fn, data)
+        return fn(data)
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    """压缩后的表示与原始响应体不同，强ETag改为弱ETag，If-None-Match弱比较时仍能命中"""
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
@@ -0,0 +1,74 @@
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.metrics import DEFAULT_SIZE_BUCKETS, MetricsRegistry, get_metrics_registry
+
+
+class MetricsMiddleware:
+    """请求指标中间件，按路由模板与状态码记录请求数、延迟直方图、响应大小与进行中请求数"""
+
+    def __init__(self, app: ASGIApp, registry: Optional[MetricsRegistry] = None):
+        self.app = app
+        registry = registry or get_metrics_registry()
+        self._requests = registry.counter(
+            "http_requests_total", "HTTP请求总数", ("method", "route", "status")
+        )
+        self._latency = registry.histogram(
+            "http_request_duration_seconds", "HTTP请求处理耗时(秒)", ("method", "route", "status")
+        )
+        self._response_size = registry.histogram(
+            "http_response_size_bytes", "HTTP响应体大小(字节)", ("method", "route", "status"), DEFAULT_SIZE_BUCKETS
+        )
+        # 路由在进入应用后才能确定，进行中请求数只按方法区分
+        self._in_flight = registry.gauge("http_requests_in_flight", "进行中的HTTP请求数", ("method",))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_flight_labels = (method,)
+        status_code = 500
+        response_size = 0
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        self._in_flight.inc(in_flight_labels)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._in_flight.dec(in_flight_labels)
+            labels = (method, _route_template(scope), str(status_code))
+            self._requests.inc(labels)
+            self._latency.observe(labels, time.perf_counter() - started_at)
+            self._response_size.observe(labels, response_size)
+
+
+def _route_template(scope: Scope) -> str:
+    """获取路由模板作为标签，而不是原始路径，避免路径参数导致标签基数爆炸
+
+    include_router的前缀不一定体现在scope["route"]上，这里用路由正则匹配请求路径的后缀来还原完整模板。
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return "unmatched"
+
+    path = scope["path"]
+    path_regex = getattr(route, "path_regex", None)
+    if path_regex is None or path_regex.match(path):
+        return path_format
+    for index, char in enumerate(path):
+        if char == "/" and index and path_regex.match(path[index:]):
+            return path[:index] + path_format
+    return path_format
@@ -0,0 +1,224 @@
+import hashlib
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import RateLimitRule, get_settings
+from app.application.errors.exceptions import TooManusRequestsError
+from app.infrastructure.storage.redis import get_redis_client
+from app.interfaces.responses import envelope_bytes
+
+logger = logging.getLogger(__name__)
+
+# 滑动窗口计数：用上一个固定窗口按剩余比例加权+当前窗口计数近似滑动窗口，每个客户端只占两个key
+_SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local weighted = previous * (window - elapsed) / window + current
+if weighted + 1 > limit then
+    return {0, 0, window - elapsed}
+end
+redis.call('INCR', KEYS[1])
+redis.call('PEXPIRE', KEYS[1], window * 2)
+return {1, math.floor(limit - weighted - 1), window - elapsed}
+"""
+
+# 令牌桶：按时间差补充令牌，桶中至少有一个令牌时放行
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) + 1000)
+if allowed == 1 then
+    wait = math.ceil((capacity - tokens) / rate)
+end
+return {allowed, math.floor(tokens), wait}
+"""
+
+
+@dataclass
+class RateLimitResult:
+    """限流判定结果，reset_after为窗口重置(或桶补满)还需的秒数"""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+
+
+class LocalRateLimiter:
+    """本地限流预检：记录本worker内的窗口计数与Redis返回的封禁时间，明显超限的请求无需访问Redis即可拒绝"""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        # key -> (窗口序号, 本地计数, 封禁截止时间)
+        self._entries: "OrderedDict[str, Tuple[int, int, float]]" = OrderedDict()
+
+    def check(self, key: str, rule: RateLimitRule, now: float) -> Optional[RateLimitResult]:
+        """返回拒绝结果，或None表示需要交给Redis判定"""
+        window_index = int(now // rule.window)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        index, count, blocked_until = entry
+        if blocked_until > now:
+            return RateLimitResult(allowed=False, limit=rule.limit, remaining=0, reset_after=blocked_until - now)
+
+        # 本worker在当前窗口内已放行的请求就超出了全局上限，全局计数只会更多
+        ceiling = rule.limit if rule.algorithm == "sliding_window" else rule.limit + (rule.burst or rule.limit)
+        if index == window_index and count >= ceiling:
+            return RateLimitResult(
+                allowed=False, limit=rule.limit, remaining=0, reset_after=(window_index + 1) * rule.window - now
+            )
+        return None
+
+    def record(self, key: str, rule: RateLimitRule, now: float, result: RateLimitResult) -> None:
+        """记录Redis判定结果"""
+        window_index = int(now // rule.window)
+        index, count, _ = self._entries.get(key, (window_index, 0, 0.0))
+        if index != window_index:
+            count = 0
+        if result.allowed:
+            self._entries[key] = (window_index, count + 1, 0.0)
+        else:
+            self._entries[key] = (window_index, count, now + result.reset_after)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+class RateLimitMiddleware:
+    """基于Redis Lua脚本的限流中间件，支持滑动窗口与令牌桶算法，按路由与客户端维度限流"""
+
+    def __init__(self, app: ASGIApp, rules: Optional[List[RateLimitRule]] = None):
+        settings = get_settings()
+        self.app = app
+        # 最长前缀优先匹配
+        self._rules = sorted(rules or settings.RATE_LIMIT_RULES, key=lambda rule: len(rule.path), reverse=True)
+        self._key_header = settings.RATE_LIMIT_KEY_HEADER.lower().encode("latin-1")
+        # 只有已登记的API Key才作为限流维度，伪造或轮换任意请求头取值不能绕过按IP的限流；Redis key中只保存摘要
+        self._api_keys = {
+            key.encode("latin-1"): hashlib.sha256(key.encode("latin-1")).hexdigest()[:16]
+            for key in settings.RATE_LIMIT_API_KEYS
+        }
+        self._key_prefix = settings.RATE_LIMIT_KEY_PREFIX
+        self._local = LocalRateLimiter(max_size=settings.RATE_LIMIT_LOCAL_MAX_KEYS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rule = self._match_rule(scope)
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        result = await self._check(rule, f"{rule.path}:{self._client_key(scope)}")
+        if result is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not result.allowed:
+            await self._reject(result, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self._apply_headers(MutableHeaders(scope=message), result)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _match_rule(self, scope: Scope) -> Optional[RateLimitRule]:
+        path = scope["path"]
+        method = scope["method"]
+        for rule in self._rules:
+            if path.startswith(rule.path) and (not rule.methods or method in rule.methods):
+                return rule
+        return None
+
+    def _client_key(self, scope: Scope) -> str:
+        """已登记的API Key按Key限流，未携带或未登记时按客户端IP限流"""
+        for name, value in scope["headers"]:
+            if name == self._key_header:
+                digest = self._api_keys.get(value)
+                if digest is not None:
+                    return f"key:{digest}"
+                break
+        client = scope.get("client")
+        return f"ip:{client[0]}" if client else "anonymous"
+
+    async def _check(self, rule: RateLimitRule, key: str) -> Optional[RateLimitResult]:
+        """先做本地预检，再到Redis中原子判定；Redis不可用时放行"""
+        now = time.time()
+        result = self._local.check(key, rule, now)
+        if result is not None:
+            return result
+
+        try:
+            redis_client = get_redis_client()
+            window_ms = int(rule.window * 1000)
+            now_ms = int(now * 1000)
+            if rule.algorithm == "sliding_window":
+                window_index = now_ms // window_ms
+                allowed, remaining, reset_ms = await redis_client.eval_script(
+                    _SLIDING_WINDOW_SCRIPT,
+                    [f"{self._key_prefix}:{key}:{window_index}", f"{self._key_prefix}:{key}:{window_index - 1}"],
+                    [rule.limit, window_ms, now_ms % window_ms],
+                )
+            else:
+                allowed, remaining, reset_ms = await redis_client.eval_script(
+                    _TOKEN_BUCKET_SCRIPT,
+                    [f"{self._key_prefix}:{key}"],
+                    [rule.burst or rule.limit, rule.limit / window_ms, now_ms],
+                )
+        except Exception as e:
+            logger.warning(f"限流检查失败，放行请求: {str(e)}")
+            return None
+
+        result = RateLimitResult(
+            allowed=bool(allowed), limit=rule.limit, remaining=max(int(remaining), 0), reset_after=int(reset_ms) / 1000
+        )
+        self._local.record(key, rule, now, result)
+        return result
+
+    @staticmethod
+    def _apply_headers(headers: MutableHeaders, result: RateLimitResult) -> None:
+        headers["RateLimit-Limit"] = str(result.limit)
+        headers["RateLimit-Remaining"] = str(result.remaining)
+        headers["RateLimit-Reset"] = str(math.ceil(result.reset_after))
+
+    async def _reject(self, result: RateLimitResult, send: Send) -> None:
+        """返回统一响应结构的429错误"""
+        error = TooManusRequestsError()
+        body = envelope_bytes(error.code, error.msg)
+        headers = MutableHeaders(raw=[])
+        headers["Content-Type"] = "application/json"
+        headers["Content-Length"] = str(len(body))
+        headers["Retry-After"] = str(max(math.ceil(result.reset_after), 1))
+        self._apply_headers(headers, result)
+        await send({"type": "http.response.start", "status": error.status_code, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
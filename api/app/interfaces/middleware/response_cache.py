@@ -0,0 +1,151 @@
+import logging
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import ResponseCacheRule, get_settings
+from app.infrastructure.cache import CachedResponse, compute_etag, etag_matches, get_response_cache
+from app.infrastructure.metrics import MetricsRegistry, get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# 不写入缓存的响应头，Content-Length与ETag在发送时重新生成
+_SKIPPED_HEADERS = {"content-length", "etag", "set-cookie"}
+# 304响应中保留的响应头
+_NOT_MODIFIED_HEADERS = {"cache-control", "content-location", "expires", "vary"}
+
+
+class ResponseCacheMiddleware:
+    """基于Redis的HTTP响应缓存中间件
+
+    只缓存配置了规则的GET路由的200响应，缓存key由路径、查询参数与规则中的vary请求头组成。
+    响应携带由响应体计算的强ETag，请求的If-None-Match匹配时返回304不再发送响应体。
+    Redis不可用时直接透传请求。
+    """
+
+    def __init__(self, app: ASGIApp, rules: Optional[List[ResponseCacheRule]] = None, registry: Optional[MetricsRegistry] = None):
+        settings = get_settings()
+        self.app = app
+        self._rules: Dict[str, ResponseCacheRule] = {rule.path: rule for rule in rules or settings.RESPONSE_CACHE_RULES}
+        self._max_body_size = settings.RESPONSE_CACHE_MAX_BODY_SIZE
+        self._store = get_response_cache()
+        self._results = (registry or get_metrics_registry()).counter(
+            "http_response_cache_total", "HTTP响应缓存查询结果数", ("route", "result")
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        rule = self._rules.get(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        # 1.携带认证信息的请求只有在规则声明按Authorization区分时才缓存，避免不同用户共享响应
+        headers = Headers(scope=scope)
+        vary = [name.lower() for name in rule.vary]
+        if "authorization" in headers and "authorization" not in vary:
+            self._results.inc((rule.path, "bypass"))
+            await self.app(scope, receive, send)
+            return
+
+        key = self._store.build_key(rule.path, scope["query_string"], [headers.get(name, "") for name in vary])
+        if_none_match = headers.get("if-none-match")
+
+        # 2.查询缓存，请求声明no-cache时跳过查询但仍会回写
+        if "no-cache" not in headers.get("cache-control", ""):
+            try:
+                cached = await self._store.get(key)
+            except Exception as e:
+                logger.warning(f"响应缓存查询失败，透传请求: {str(e)}")
+                await self.app(scope, receive, send)
+                return
+            if cached is not None:
+                not_modified = etag_matches(if_none_match, cached.etag)
+                self._results.inc((rule.path, "not_modified" if not_modified else "hit"))
+                await self._send(send, rule, cached, not_modified, head=scope["method"] == "HEAD", hit=True)
+                return
+
+        self._results.inc((rule.path, "miss"))
+        if scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        # 3.未命中时缓冲响应，200且大小不超限的响应写入缓存后再发送
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        size = 0
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, size, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                response_headers = Headers(raw=message["headers"])
+                if message["status"] != 200 or "set-cookie" in response_headers:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            if size > self._max_body_size:
+                # 响应过大(如流式导出)，发送已缓冲的内容后转为透传
+                passthrough = True
+                await send(start)
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": message.get("more_body", False)})
+                return
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            cached = CachedResponse(
+                status=start["status"],
+                headers=[
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in start["headers"] if name.decode("latin-1").lower() not in _SKIPPED_HEADERS
+                ],
+                body=body,
+                etag=compute_etag(body),
+            )
+            try:
+                await self._store.set(key, cached, ttl=rule.ttl, tags=rule.tags)
+            except UnicodeDecodeError:
+                pass
+            except Exception as e:
+                logger.warning(f"响应缓存写入失败: {str(e)}")
+            await self._send(send, rule, cached, etag_matches(if_none_match, cached.etag), head=False, hit=False)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    async def _send(send: Send, rule: ResponseCacheRule, cached: CachedResponse, not_modified: bool, head: bool, hit: bool) -> None:
+        """发送缓存的响应，not_modified时只发送304与校验相关的响应头"""
+        headers = MutableHeaders(raw=[
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in cached.headers if not not_modified or name.lower() in _NOT_MODIFIED_HEADERS
+        ])
+        headers["ETag"] = cached.etag
+        if "cache-control" not in headers:
+            # 允许客户端保存响应，但每次使用前都需要携带If-None-Match重新校验
+            headers["Cache-Control"] = "no-cache"
+        if rule.vary:
+            headers["Vary"] = ", ".join(rule.vary)
+        headers["X-Cache"] = "HIT" if hit else "MISS"
+
+        if not_modified:
+            await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers["Content-Length"] = str(len(cached.body))
+        await send({"type": "http.response.start", "status": cached.status, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": b"" if head else cached.body})
@@ -0,0 +1,95 @@
+from functools import lru_cache
+from typing import Any, AsyncIterator, Mapping, Optional
+
+import orjson
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from app.interfaces.schemas.base import Response as Envelope
+
+
+def _dumps(content: Any) -> bytes:
+    # pydantic模型直接由pydantic-core序列化为bytes，不经过中间dict；其余数据交给orjson
+    if isinstance(content, BaseModel):
+        return to_json(content)
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+class ORJSONResponse(JSONResponse):
+    """基于orjson的JSON响应，content可以是普通数据也可以是pydantic模型(如统一响应结构Response)"""
+
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
+
+
+class PreRenderedJSONResponse(Response):
+    """已序列化好的JSON响应，content为bytes，直接写出不再编码"""
+    media_type = "application/json"
+
+
+@lru_cache(maxsize=64)
+def envelope_bytes(code: int, msg: str) -> bytes:
+    """不带data的固定统一响应结构(如限流、500)序列化结果，按(code, msg)缓存；只用于常量msg，动态消息会挤占缓存"""
+    return to_json(Envelope.error(code=code, msg=msg))
+
+
+def envelope_response(
+        code: int,
+        msg: str,
+        status_code: int,
+        data: Any = None,
+        headers: Optional[Mapping[str, str]] = None,
+        cache: bool = False,
+) -> Response:
+    """返回统一响应结构，只序列化一次；msg为常量的固定响应体(如404/500)可传cache=True缓存序列化结果"""
+    if data is None and cache:
+        body = envelope_bytes(code, msg)
+    else:
+        body = to_json(Envelope.error(code=code, msg=msg, data=data))
+    return PreRenderedJSONResponse(content=body, status_code=status_code, headers=headers)
+
+
+class NDJSONResponse(StreamingResponse):
+    """NDJSON流式响应，每行一个JSON对象"""
+    media_type = "application/x-ndjson"
+
+
+async def iter_ndjson(items: AsyncIterator[Any], chunk_rows: int = 100) -> AsyncIterator[bytes]:
+    """将异步迭代的数据编码为NDJSON，每chunk_rows行合并为一次发送，减少send调用次数"""
+    lines = []
+    async for item in items:
+        lines.append(_dumps(item))
+        if len(lines) >= chunk_rows:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+class EventSourceResponse(StreamingResponse):
+    """SSE流式响应，禁止中间代理缓冲与缓存"""
+    media_type = "text/event-stream"
+
+    def __init__(self, content: AsyncIterator[bytes], **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self.headers["Cache-Control"] = "no-cache"
+        self.headers["X-Accel-Buffering"] = "no"
+
+
+def format_sse(data: str, event: Optional[str] = None, event_id: Optional[str] = None) -> bytes:
+    """编码一条SSE事件，多行数据逐行加data前缀"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
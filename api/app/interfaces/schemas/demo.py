@@ -0,0 +1,23 @@
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class DemoItem(BaseModel):
+    """Demo数据"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    name: str
+    age: int
+    description: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class DemoPage(BaseModel):
+    """Demo游标分页结果"""
+    items: List[DemoItem] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(default=None, description="下一页游标，为空表示没有更多数据")
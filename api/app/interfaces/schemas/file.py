@@ -0,0 +1,81 @@
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.domain.model.file import FileStatus
+
+
+class CreateUploadRequest(BaseModel):
+    """创建直传上传请求"""
+    filename: str = Field(min_length=1, max_length=255, description="原始文件名，下载时作为附件名")
+    size: int = Field(ge=0, description="文件字节数，上传的内容长度必须与之一致")
+    content_type: str = Field(default="application/octet-stream", max_length=255, description="文件MIME类型")
+
+
+class PresignedPartItem(BaseModel):
+    """分块上传URL"""
+    model_config = ConfigDict(from_attributes=True)
+
+    part_number: int = Field(description="分块号，从1开始")
+    url: str = Field(description="预签名PUT URL")
+    size: int = Field(description="该分块的字节数")
+    headers: Dict[str, str] = Field(default_factory=dict, description="上传时必须携带的请求头")
+
+
+class UploadTicketInfo(BaseModel):
+    """直传凭证：url不为空时单次PUT上传；upload_id不为空时按parts分块上传，完成后回调时提交各分块响应头中的ETag"""
+    model_config = ConfigDict(from_attributes=True)
+
+    file_id: uuid.UUID
+    key: str = Field(description="COS对象key")
+    expires_at: datetime = Field(description="URL过期时间")
+    url: Optional[str] = Field(default=None, description="单次上传的预签名PUT URL")
+    headers: Dict[str, str] = Field(default_factory=dict, description="单次上传时必须携带的请求头")
+    upload_id: Optional[str] = Field(default=None, description="分块上传任务ID")
+    part_size: Optional[int] = Field(default=None, description="分块大小(字节)，最后一块可以更小")
+    parts: List[PresignedPartItem] = Field(default_factory=list, description="各分块的上传URL")
+
+
+class PresignPartsRequest(BaseModel):
+    """重新签发分块上传URL请求"""
+    part_numbers: List[int] = Field(min_length=1, max_length=1000, description="需要签发的分块号")
+
+
+class PresignedParts(BaseModel):
+    """重新签发的分块上传URL"""
+    expires_at: datetime
+    parts: List[PresignedPartItem]
+
+
+class UploadedPart(BaseModel):
+    """已上传的分块"""
+    part_number: int = Field(ge=1, description="分块号")
+    etag: str = Field(description="上传分块时响应头中的ETag")
+
+
+class CompleteUploadRequest(BaseModel):
+    """上传完成回调请求，单次上传时parts为空"""
+    parts: List[UploadedPart] = Field(default_factory=list, description="分块上传时各分块的ETag")
+
+
+class FileItem(BaseModel):
+    """文件元数据"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    key: str
+    filename: str
+    content_type: str
+    size: int
+    etag: str
+    status: FileStatus
+    created_at: datetime
+    uploaded_at: Optional[datetime] = None
+
+
+class DownloadUrl(BaseModel):
+    """预签名下载URL"""
+    url: str
+    expires_at: datetime
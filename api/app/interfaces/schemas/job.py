@@ -0,0 +1,27 @@
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.domain.model.job import JobStatus
+
+
+class SubmitJobRequest(BaseModel):
+    """投递任务请求"""
+    name: str = Field(description="任务类型，对应注册的任务处理函数，如 demo.summary")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="任务参数")
+    max_attempts: Optional[int] = Field(default=None, ge=1, le=20, description="最大执行次数，为空时使用默认配置")
+
+
+class JobInfo(BaseModel):
+    """任务状态与结果"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    name: str
+    status: JobStatus
+    attempts: int = Field(description="已执行次数")
+    max_attempts: int
+    result: Any = Field(default=None, description="执行结果，成功后才有值")
+    error: Optional[str] = Field(default=None, description="最近一次失败的原因")
+    created_at: float = Field(description="创建时间(Unix时间戳)")
+    updated_at: float = Field(description="最后更新时间(Unix时间戳)")
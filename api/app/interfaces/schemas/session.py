@@ -0,0 +1,14 @@
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class PublishEventRequest(BaseModel):
+    """发布会话事件请求"""
+    event: str = Field(default="message", pattern=r"^[A-Za-z0-9_.:-]+$", description="事件类型，发布end事件表示会话输出结束")
+    data: Any = Field(description="事件数据，字符串原样发送，其余数据编码为JSON")
+
+
+class PublishedEvent(BaseModel):
+    """已发布的会话事件"""
+    id: str = Field(description="事件ID，即SSE的id字段")
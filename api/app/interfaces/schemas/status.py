@@ -0,0 +1,24 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class DependencyStatus(BaseModel):
+    """单个依赖的检查结果"""
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str
+    status: str = Field(description="ok/error/timeout")
+    latency_ms: float = Field(description="检查耗时(毫秒)")
+    error: Optional[str] = None
+
+
+class ReadinessStatus(BaseModel):
+    """就绪检查结果"""
+    model_config = ConfigDict(from_attributes=True)
+
+    ready: bool
+    checked_at: float = Field(description="检查时间(Unix时间戳)")
+    cached: bool = Field(description="是否为缓存的检查结果")
+    draining: bool = Field(default=False, description="是否正在停机排空")
+    dependencies: List[DependencyStatus] = Field(default_factory=list)
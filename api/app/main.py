@@ -1,5 +1,8 @@
+import time
+_import_started_at = time.perf_counter()
+
 from fastapi import FastAPI
-import uvicorn
+from fastapi.datastructures import Default
 import logging
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,9 +10,20 @@ from core.config import get_settings
 from .infrastructure.logging import set_logging
 from .interfaces.endpoints.routes import routers
 from .interfaces.errors.exception_handler import register_exception_handlers
+from .interfaces.responses import ORJSONResponse
+from .interfaces.middleware.rate_limit import RateLimitMiddleware
+from .interfaces.middleware.metrics import MetricsMiddleware
+from .interfaces.middleware.response_cache import ResponseCacheMiddleware
+from .interfaces.middleware.compression import CompressionMiddleware
 from .infrastructure.storage.redis import get_redis_client
 from .infrastructure.storage.postgres import get_postgres
 from .infrastructure.storage.cos import get_cos
+from .infrastructure.cache import get_cache_manager, get_cos_disk_cache
+from .infrastructure.events import get_event_broker
+from .infrastructure.external import get_llm
+from .infrastructure.metrics import get_metrics_registry, register_pool_collectors
+from .infrastructure.startup import StartupTimer
+from .server import install_drain_handler, run
 # 1.加载全局配置
 settings = get_settings()
 
@@ -23,6 +37,22 @@ openapi_tags = [
     {
         "name": "状态模块",
         "descripetion" : "包含 **健康检查** 等 API 接口， 用于检测系统的运行状态"
+    },
+    {
+        "name": "Demo模块",
+        "description": "包含 **Demo数据游标分页与流式导出** 等 API 接口"
+    },
+    {
+        "name": "任务模块",
+        "description": "包含 **后台任务投递与状态查询** 等 API 接口，任务由独立的worker进程执行"
+    },
+    {
+        "name": "会话模块",
+        "description": "包含 **会话事件SSE推送与发布** 等 API 接口"
+    },
+    {
+        "name": "文件模块",
+        "description": "包含 **文件直传COS的预签名上传/下载与上传完成回调** 等 API 接口"
     }
 ]
 
@@ -31,34 +61,88 @@ async def lifespan(app: FastAPI):
     """异步生命周期上下文管理"""
     logger.info("Minimus API is starting...")
 
-    # todo
-    # 8.注册Redis客户端
+    startup = StartupTimer(timeout=settings.STARTUP_TIMEOUT)
+    startup.record("模块导入", _import_seconds)
     redis_client = get_redis_client()
-    await redis_client.init()
+    cache_manager = get_cache_manager()
+    event_broker = get_event_broker()
     postgres_client = get_postgres()
-    await postgres_client.init()
     cos_client = get_cos()
-    await cos_client.init()
+    cos_disk_cache = get_cos_disk_cache()
+    llm = get_llm()
+    metrics_registry = get_metrics_registry()
+
+    async def init_redis_and_cache() -> None:
+        # 缓存管理器与事件代理依赖Redis，在Redis之后初始化，整体与其他依赖并发
+        await startup.run("redis", redis_client.init)
+        await startup.run("cache", cache_manager.init)
+        await startup.run("events", event_broker.init)
+
+    async def init_cos() -> None:
+        await startup.run("cos", cos_client.init)
+        if settings.COS_DISK_CACHE_ENABLED:
+            await startup.run("cos_disk_cache", cos_disk_cache.init)
+
+    async def init_metrics() -> None:
+        register_pool_collectors(metrics_registry)
+        await metrics_registry.init()
 
     try:
+        # 8.并发初始化各依赖，单个依赖超时即视为启动失败
+        await startup.gather(
+            init_redis_and_cache(),
+            startup.run("postgres", postgres_client.init),
+            init_cos(),
+            startup.run("llm", llm.init),
+            startup.run("metrics", init_metrics),
+        )
+        logger.info(startup.report(metrics_registry))
+        install_drain_handler()
+
         # lifespam节点/分界
         yield
     finally:
+        await metrics_registry.shutdown()
+        await event_broker.shutdown()
+        await cache_manager.shutdown()
         await redis_client.close()
         await postgres_client.shutdown()
+        await cos_disk_cache.shutdown()
         await cos_client.shutdown()
+        await llm.shutdown()
         logger.info("Minimus API is shutting down...")
 
+# 模块导入(含日志配置)耗时，计入启动耗时报告
+_import_seconds = time.perf_counter() - _import_started_at
+
 # 4.创建FastAPI应用实例
 app = FastAPI(
     title="Minimus 通用智能体",
     description="A minimal API project",
     lifespan=lifespan,
     openapi_tags=openapi_tags,
-    version="0.1.0"
+    version="0.1.0",
+    # 以Default包装，声明了响应模型的路由仍走FastAPI由pydantic直接序列化为bytes的快速路径，其余走orjson
+    default_response_class=Default(ORJSONResponse),
 )
 
-# 5.配置CORS中间件
+# 5.配置响应缓存中间件，位于限流内层，命中缓存的请求同样计入限流
+if settings.RESPONSE_CACHE_ENABLED:
+    app.add_middleware(ResponseCacheMiddleware)
+
+# 6.配置限流中间件（需在CORS之前注册，保证429响应也带有CORS响应头）
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+# 7.配置压缩中间件，位于指标内层，指标记录的是实际发送的字节数
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# 8.配置指标中间件，放在限流外层，被限流的请求也会被统计
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# 9.配置CORS中间件
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -67,10 +151,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 7.注册异常处理
+# 10.注册异常处理
 register_exception_handlers(app)
 
-# 6.包含所有API路由
+# 11.包含所有API路由
 app.include_router(routers, prefix="/api")
 
 
@@ -81,4 +165,4 @@ async def read_root():
     return {"message": "Hello, World!"}
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    run()
\ No newline at end of file
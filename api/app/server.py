@@ -0,0 +1,125 @@
+"""生产环境服务入口
+
+运行方式(在api目录下): python -m app.server
+"""
+import asyncio
+import logging
+import math
+import os
+import signal
+import threading
+from pathlib import Path
+from typing import Optional
+
+import uvicorn
+
+from core.config import get_settings
+from app.application.services.health_service import get_health_service
+from app.infrastructure.events import get_event_broker
+
+logger = logging.getLogger(__name__)
+
+
+def install_drain_handler() -> None:
+    """在uvicorn的SIGTERM处理前插入排空阶段
+
+    收到SIGTERM后先让就绪检查失败并继续正常服务SERVER_DRAIN_DELAY秒，等负载均衡摘除该实例后，
+    再交给uvicorn停止接收新连接、等待进行中请求完成(最长SERVER_GRACEFUL_TIMEOUT秒)，最后执行lifespan关闭连接池。
+    需在lifespan启动阶段调用，此时uvicorn已注册好自己的信号处理器。
+    """
+    settings = get_settings()
+    if settings.SERVER_DRAIN_DELAY <= 0 or threading.current_thread() is not threading.main_thread():
+        return
+    previous = signal.getsignal(signal.SIGTERM)
+    if not callable(previous):
+        return
+
+    loop = asyncio.get_running_loop()
+    draining = False
+
+    def begin_shutdown(sig: int, frame) -> None:
+        previous(sig, frame)
+        # SSE长连接不会自行结束，主动关闭订阅，避免uvicorn一直等到SERVER_GRACEFUL_TIMEOUT
+        loop.call_soon_threadsafe(get_event_broker().close_subscriptions)
+
+    def handle_sigterm(sig: int, frame) -> None:
+        nonlocal draining
+        # 排空期间再次收到SIGTERM则立即进入停机流程
+        if draining:
+            begin_shutdown(sig, frame)
+            return
+        draining = True
+        get_health_service().mark_draining()
+        logger.info(f"收到SIGTERM，{settings.SERVER_DRAIN_DELAY}s后停止接收新连接")
+        loop.call_soon_threadsafe(loop.call_later, settings.SERVER_DRAIN_DELAY, begin_shutdown, sig, frame)
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+
+def _clean_metrics_dir(directory: str) -> None:
+    """清理上次运行遗留的指标快照，避免已退出进程的计数被重复汇总"""
+    if not directory:
+        return
+    for path in Path(directory).glob("metrics_*"):
+        path.unlink(missing_ok=True)
+
+
+def _cgroup_cpu_limit() -> Optional[int]:
+    """读取容器的CPU配额(cgroup v2的cpu.max或v1的cfs_quota)，未限制时返回None"""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()[:2]
+    except (OSError, ValueError):
+        try:
+            quota = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text().strip()
+            period = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text().strip()
+        except OSError:
+            return None
+    if quota in ("max", "-1"):
+        return None
+    try:
+        return max(math.ceil(int(quota) / int(period)), 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def available_cpus() -> int:
+    """当前进程实际可用的CPU数
+
+    os.cpu_count()返回宿主机核数，容器内会高估；这里取CPU亲和性与cgroup配额中较小者。
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    return max(min(cpus, limit) if limit else cpus, 1)
+
+
+def run() -> None:
+    """启动多进程服务"""
+    settings = get_settings()
+    workers = settings.SERVER_WORKERS or available_cpus()
+
+    # 1.将实际worker数写回环境变量，worker进程据此按连接预算计算自己的连接池大小
+    os.environ["SERVER_WORKERS"] = str(workers)
+    get_settings.cache_clear()
+    _clean_metrics_dir(settings.METRICS_MULTIPROC_DIR)
+
+    # 2.显式使用uvloop事件循环与httptools解析器，日志由应用统一配置
+    uvicorn.run(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,210 @@
+"""后台任务worker入口，与API服务独立部署、独立扩容
+
+运行方式(在api目录下): python -m app.worker [--concurrency N]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+from typing import Dict, Optional
+
+import uvloop
+
+from core.config import Settings, get_settings
+from app.application.services.job_service import get_job_handler, load_job_handlers
+from app.domain.model.job import Job
+from app.infrastructure.external import get_llm
+from app.infrastructure.logging import set_logging
+from app.infrastructure.queue import JobQueue, get_job_queue
+from app.infrastructure.startup import StartupTimer
+from app.infrastructure.storage.cos import get_cos
+from app.infrastructure.storage.postgres import get_postgres
+from app.infrastructure.storage.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """任务worker：从消费者组拉取任务，以协程并发执行，并周期性续租、接管失联任务、投递到期重试任务"""
+
+    def __init__(self, concurrency: Optional[int] = None, queue: Optional[JobQueue] = None):
+        self._settings: Settings = get_settings()
+        self._queue = queue or get_job_queue()
+        self._concurrency = concurrency or self._settings.JOB_WORKER_CONCURRENCY
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        # 消息ID -> 执行任务
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+
+    @property
+    def _free_slots(self) -> int:
+        return self._concurrency - len(self._inflight)
+
+    def stop(self) -> None:
+        """停止拉取新任务，执行中的任务在JOB_SHUTDOWN_TIMEOUT内继续完成"""
+        if not self._stopping.is_set():
+            logger.info("worker收到停止信号，等待执行中的任务完成")
+            self._stopping.set()
+
+    async def run(self) -> None:
+        await self._queue.ensure_group()
+        logger.info(f"worker已启动: consumer={self.consumer}, concurrency={self._concurrency}")
+        loops = [
+            asyncio.create_task(self._fetch_loop(), name="job-fetch"),
+            asyncio.create_task(self._maintenance_loop(), name="job-maintenance"),
+        ]
+        try:
+            await self._stopping.wait()
+        finally:
+            for task in loops:
+                task.cancel()
+            await asyncio.gather(*loops, return_exceptions=True)
+            await self._drain()
+
+    async def _drain(self) -> None:
+        """等待执行中的任务完成，超时后取消，未确认的消息会被其他worker接管"""
+        if not self._inflight:
+            return
+        _, pending = await asyncio.wait(list(self._inflight.values()), timeout=self._settings.JOB_SHUTDOWN_TIMEOUT)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(f"{len(pending)}个任务未在停止超时内完成，将由其他worker接管")
+
+    async def _fetch_loop(self) -> None:
+        while True:
+            # 1.并发已满时等待任意任务完成，不拉取超出处理能力的消息
+            if self._free_slots <= 0:
+                await asyncio.wait(list(self._inflight.values()), return_when=asyncio.FIRST_COMPLETED)
+                continue
+            try:
+                messages = await self._queue.read(self.consumer, self._free_slots, self._settings.JOB_BLOCK_MS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"拉取任务失败，1秒后重试: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+            # 2.每条消息以独立协程执行
+            for message_id, job_id in messages:
+                self._dispatch(message_id, job_id)
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._settings.JOB_MAINTENANCE_INTERVAL)
+            try:
+                # 1.为执行中的任务续租，避免被其他worker当作失联任务接管
+                await self._queue.heartbeat(self.consumer, list(self._inflight))
+                # 2.投递到期的重试任务
+                await self._queue.promote_due()
+                # 3.接管失联worker遗留的任务
+                if self._free_slots > 0:
+                    for message_id, job_id in await self._queue.claim_stale(self.consumer, self._free_slots):
+                        logger.info(f"接管空闲超时的任务: {job_id}")
+                        self._dispatch(message_id, job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"任务队列维护失败: {str(e)}")
+
+    def _dispatch(self, message_id: str, job_id: str) -> None:
+        if message_id in self._inflight:
+            return
+        task = asyncio.create_task(self._process(message_id, job_id), name=f"job-{job_id}")
+        self._inflight[message_id] = task
+        task.add_done_callback(lambda _: self._inflight.pop(message_id, None))
+
+    async def _process(self, message_id: str, job_id: str) -> None:
+        try:
+            await self._execute(message_id, job_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 更新任务状态失败(如Redis不可用)时消息保持未确认，之后由XAUTOCLAIM重新处理
+            logger.error(f"任务处理异常: {job_id} {str(e)}", exc_info=True)
+
+    async def _execute(self, message_id: str, job_id: str) -> None:
+        # 1.任务状态已过期或已是终态(重复投递)时直接确认
+        job = await self._queue.get(job_id)
+        if job is None or job.status.finished:
+            await self._queue.ack(message_id)
+            return
+
+        handler = get_job_handler(job.name)
+        if handler is None:
+            await self._queue.dead_letter(message_id, job, f"未注册的任务类型: {job.name}")
+            return
+
+        # 2.超过最大执行次数(如反复导致worker崩溃)时直接进入死信
+        job = await self._queue.mark_running(job)
+        if job.attempts > job.max_attempts:
+            await self._queue.dead_letter(message_id, job, f"超过最大执行次数: {job.max_attempts}")
+            return
+
+        # 3.执行任务，失败后按指数退避重试
+        try:
+            async with asyncio.timeout(self._settings.JOB_TIMEOUT):
+                result = await handler(job.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}" if not isinstance(e, TimeoutError) else f"执行超时({self._settings.JOB_TIMEOUT}s)"
+            await self._handle_failure(message_id, job, error)
+            return
+
+        await self._queue.complete(message_id, job, result)
+        logger.info(f"任务执行成功: {job.name} {job.id} 第{job.attempts}次")
+
+    async def _handle_failure(self, message_id: str, job: Job, error: str) -> None:
+        if job.attempts >= job.max_attempts:
+            logger.error(f"任务执行失败，进入死信队列: {job.name} {job.id} {error}")
+            await self._queue.dead_letter(message_id, job, error)
+            return
+        delay = min(self._settings.JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1), self._settings.JOB_RETRY_BACKOFF_MAX)
+        logger.warning(f"任务执行失败，{delay}s后重试: {job.name} {job.id} 第{job.attempts}次 {error}")
+        await self._queue.retry(message_id, job, error, delay)
+
+
+async def main(concurrency: Optional[int] = None) -> None:
+    settings = get_settings()
+    set_logging()
+    load_job_handlers(settings.JOB_HANDLER_MODULES)
+
+    # 1.初始化任务处理函数依赖的基础设施
+    startup = StartupTimer(timeout=settings.STARTUP_TIMEOUT)
+    redis_client, postgres_client, cos_client, llm = get_redis_client(), get_postgres(), get_cos(), get_llm()
+    try:
+        await startup.gather(
+            startup.run("redis", redis_client.init),
+            startup.run("postgres", postgres_client.init),
+            startup.run("cos", cos_client.init),
+            startup.run("llm", llm.init),
+        )
+        logger.info(startup.report())
+
+        # 2.SIGTERM/SIGINT时停止拉取新任务并等待执行中的任务完成
+        worker = JobWorker(concurrency=concurrency)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+    finally:
+        await redis_client.close()
+        await postgres_client.shutdown()
+        await cos_client.shutdown()
+        await llm.shutdown()
+        logger.info("worker已停止")
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description="Minimus 后台任务worker")
+    parser.add_argument("--concurrency", type=int, default=None, help="同时执行的任务数，默认使用JOB_WORKER_CONCURRENCY")
+    args = parser.parse_args()
+    uvloop.run(main(args.concurrency))
+
+
+if __name__ == "__main__":
+    run()
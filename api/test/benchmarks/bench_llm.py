@@ -0,0 +1,174 @@
+"""大模型网关基准测试
+
+以fakeredis与兼容OpenAI接口的本地替身服务(独立子进程)作为依赖，验证并对比:
+- 重复请求占比较高时响应缓存的命中率与实际调用次数
+- 替身服务存在长尾时开启对冲前后的p50/p99延迟
+- 流式调用的首个分片延迟
+运行方式(在api目录下，需安装dev依赖组): python -m test.benchmarks.bench_llm
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+API_DIR = Path(__file__).resolve().parents[2]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_port(port: int, timeout: float = 15) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"端口{port}未在{timeout}s内就绪")
+            await asyncio.sleep(0.1)
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+def _summary(latencies: List[float]) -> str:
+    return (f"p50 {_percentile(latencies, 50) * 1000:7.1f}ms  p99 {_percentile(latencies, 99) * 1000:7.1f}ms  "
+            f"mean {statistics.mean(latencies) * 1000:7.1f}ms")
+
+
+async def _drive(llm: Any, prompts: List[str], concurrency: int, **params: Any) -> List[float]:
+    """以固定并发依次发出请求，返回每个请求的耗时"""
+    latencies: List[float] = []
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for prompt in prompts:
+        queue.put_nowait(prompt)
+
+    async def worker() -> None:
+        while not queue.empty():
+            prompt = queue.get_nowait()
+            started_at = time.perf_counter()
+            await llm.chat([{"role": "user", "content": prompt}], **params)
+            latencies.append(time.perf_counter() - started_at)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def _counter(snapshot: Dict[str, Any], name: str) -> Dict[str, float]:
+    return snapshot.get(name, {}).get("samples", {})
+
+
+async def run(args: argparse.Namespace) -> None:
+    from app.infrastructure.external import OpenAILLM
+    from app.infrastructure.metrics import get_metrics_registry
+    from app.infrastructure.storage.redis import get_redis_client
+    from core.config import get_settings
+
+    settings = get_settings()
+    redis_client = get_redis_client()
+    await redis_client.init()
+    registry = get_metrics_registry()
+
+    # 1.缓存：distinct个不同的提示词随机重复，对比调用次数与请求次数
+    rng = random.Random(0)
+    prompts = [f"question {rng.randrange(args.distinct)}" for _ in range(args.requests)]
+    llm = OpenAILLM()
+    await llm.init()
+    started_at = time.perf_counter()
+    latencies = await _drive(llm, prompts, args.concurrency)
+    elapsed = time.perf_counter() - started_at
+    cache = _counter(registry.snapshot(), "llm_cache_total")
+    hits, misses = cache.get("hit", 0), cache.get("miss", 0)
+    print(f"[cache] {args.requests} requests / {args.distinct} distinct prompts, concurrency {args.concurrency}")
+    print(f"        {_summary(latencies)}  {args.requests / elapsed:7.1f} req/s")
+    print(f"        hit rate {hits / max(hits + misses, 1) * 100:5.1f}%  lookups {int(hits + misses)}")
+    await llm.shutdown()
+
+    # 2.对冲：关闭缓存，替身服务每slow_every个请求有一个长尾
+    settings.LLM_CACHE_ENABLED = False
+    for hedge_delay in (0.0, args.hedge_delay):
+        settings.LLM_HEDGE_DELAY = hedge_delay
+        llm = OpenAILLM()
+        await llm.init()
+        latencies = await _drive(llm, [f"hedge {index}" for index in range(args.requests)], args.concurrency)
+        hedges = _counter(registry.snapshot(), "llm_hedges_total")
+        print(f"[hedge delay={hedge_delay}s] {_summary(latencies)}  hedges {dict(hedges)}")
+        await llm.shutdown()
+
+    # 3.流式：首个分片延迟与完整输出耗时
+    llm = OpenAILLM()
+    await llm.init()
+    first_tokens, totals = [], []
+    for index in range(args.streams):
+        started_at = time.perf_counter()
+        first = None
+        async for chunk in llm.stream([{"role": "user", "content": f"stream {index} " + "word " * 50}]):
+            if first is None and chunk.content:
+                first = time.perf_counter() - started_at
+        first_tokens.append(first or 0.0)
+        totals.append(time.perf_counter() - started_at)
+    print(f"[stream first chunk] {_summary(first_tokens)}")
+    print(f"[stream complete]    {_summary(totals)}")
+    await llm.shutdown()
+    await redis_client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="大模型网关基准测试")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--distinct", type=int, default=40, help="缓存场景中不同提示词的数量")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05, help="替身服务的基础延迟(秒)")
+    parser.add_argument("--slow-every", type=int, default=20, help="替身服务每N个请求中有一个长尾")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="长尾请求的额外延迟(秒)")
+    parser.add_argument("--hedge-delay", type=float, default=0.2)
+    parser.add_argument("--streams", type=int, default=20)
+    args = parser.parse_args()
+
+    redis_port, stub_port = _free_port(), _free_port()
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", f"from test.benchmarks.stand_ins import serve_fake_redis; serve_fake_redis('127.0.0.1', {redis_port})"],
+            cwd=API_DIR,
+        ),
+        subprocess.Popen(
+            [sys.executable, "-c", "from test.benchmarks.stand_ins import serve_openai_stub; "
+                                   f"serve_openai_stub('127.0.0.1', {stub_port}, latency={args.latency}, "
+                                   f"slow_every={args.slow_every}, slow_latency={args.slow_latency})"],
+            cwd=API_DIR,
+        ),
+    ]
+    # 配置需在应用导入前通过环境变量注入
+    os.environ.update({
+        "REDIS_HOST": "127.0.0.1",
+        "REDIS_PORT": str(redis_port),
+        "LLM_BASE_URL": f"http://127.0.0.1:{stub_port}/v1",
+        "LLM_MODEL": "stub",
+        "METRICS_MULTIPROC_DIR": "",
+    })
+    try:
+        asyncio.run(_wait_port(redis_port))
+        asyncio.run(_wait_port(stub_port))
+        asyncio.run(run(args))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
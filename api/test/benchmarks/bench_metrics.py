@@ -0,0 +1,70 @@
+"""指标中间件开销基准测试
+
+在不依赖外部服务的最小FastAPI应用上，对比挂载MetricsMiddleware前后单次请求的处理耗时。
+运行方式(在api目录下): python -m test.benchmarks.bench_metrics
+"""
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from app.infrastructure.metrics import MetricsRegistry
+from app.interfaces.middleware.metrics import MetricsMiddleware
+
+
+def create_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int) -> dict:
+        return {"id": item_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware, registry=MetricsRegistry())
+    return app
+
+
+async def drive(app: FastAPI, requests: int) -> float:
+    """直接以ASGI协议调用应用，排除网络与HTTP解析的干扰，返回每个请求的平均耗时(微秒)"""
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    def scope(index: int) -> dict:
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/items/{index}", "raw_path": f"/items/{index}".encode(),
+            "query_string": b"", "root_path": "", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+        }
+
+    # 预热，完成中间件栈构建
+    for index in range(200):
+        await app(scope(index), receive, send)
+
+    started_at = time.perf_counter()
+    for index in range(requests):
+        await app(scope(index), receive, send)
+    return (time.perf_counter() - started_at) / requests * 1e6
+
+
+async def main(requests: int = 20000) -> None:
+    baseline = await drive(create_app(with_metrics=False), requests)
+    instrumented = await drive(create_app(with_metrics=True), requests)
+    print(f"requests: {requests}")
+    print(f"baseline:     {baseline:8.2f} us/req")
+    print(f"with metrics: {instrumented:8.2f} us/req")
+    print(f"overhead:     {instrumented - baseline:8.2f} us/req ({(instrumented / baseline - 1) * 100:.1f}%)")
+
+    registry = MetricsRegistry()
+    MetricsMiddleware(create_app(False), registry=registry)
+    started_at = time.perf_counter()
+    for index in range(requests):
+        registry.histogram("http_request_duration_seconds", "").observe(("GET", "/items/{item_id}", "200"), 0.001 * (index % 50))
+    print(f"histogram observe: {(time.perf_counter() - started_at) / requests * 1e9:8.0f} ns/op")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
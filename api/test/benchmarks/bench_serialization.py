@@ -0,0 +1,82 @@
+"""响应序列化基准测试
+
+对比统一响应结构的旧序列化路径(model_dump得到dict后再由JSONResponse/json.dumps编码)
+与新路径(pydantic-core直接序列化为bytes、orjson、固定响应体缓存)单次序列化的耗时。
+运行方式(在api目录下): python -m test.benchmarks.bench_serialization
+"""
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.interfaces.responses import ORJSONResponse, _dumps, envelope_response
+from app.interfaces.schemas.base import Response
+from app.interfaces.schemas.demo import DemoItem, DemoPage
+
+
+def build_page(size: int = 20) -> Response[DemoPage]:
+    now = datetime.now()
+    items = [
+        DemoItem(id=uuid.uuid4(), name=f"demo-{index}", age=index, description="描述" * 10, created_at=now, updated_at=now)
+        for index in range(size)
+    ]
+    return Response.success(data=DemoPage(items=items, next_cursor="eyJjcmVhdGVkX2F0IjoiMjAyNiJ9"))
+
+
+def build_row() -> Dict[str, Any]:
+    now = datetime.now()
+    return {"id": uuid.uuid4(), "name": "demo", "age": 18, "description": "描述", "created_at": now, "updated_at": now}
+
+
+def measure(fn: Callable[[], Any], iterations: int) -> float:
+    """返回单次调用的平均耗时(微秒)"""
+    for _ in range(min(iterations, 200)):
+        fn()
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started_at) / iterations * 1e6
+
+
+def main(iterations: int = 20000) -> None:
+    page = build_page()
+    row = build_row()
+    cases: List[tuple] = [
+        (
+            "分页响应(20条)",
+            # 旧路径：FastAPI先转换为可JSON化的dict，再由JSONResponse调用json.dumps
+            lambda: JSONResponse(content=jsonable_encoder(page)),
+            # 新路径：声明了响应模型的路由由pydantic-core直接序列化为bytes
+            lambda: ORJSONResponse(content=page),
+        ),
+        (
+            "404错误响应",
+            lambda: JSONResponse(content=Response.error(msg="Not Found", code=404).model_dump(), status_code=404),
+            lambda: envelope_response(code=404, msg="Not Found", status_code=404),
+        ),
+        (
+            "500错误响应",
+            lambda: JSONResponse(content=Response.error(msg="Internal Server Error", code=500).model_dump(), status_code=500),
+            lambda: envelope_response(code=500, msg="Internal Server Error", status_code=500),
+        ),
+        (
+            "NDJSON单行",
+            lambda: json.dumps(row, ensure_ascii=False, default=str).encode("utf-8"),
+            lambda: _dumps(row),
+        ),
+    ]
+
+    print(f"iterations: {iterations}")
+    print(f"{'case':<16}{'before(us)':>12}{'after(us)':>12}{'speedup':>10}")
+    for name, before, after in cases:
+        before_us = measure(before, iterations)
+        after_us = measure(after, iterations)
+        print(f"{name:<16}{before_us:>12.2f}{after_us:>12.2f}{before_us / after_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""并发异步HTTP压测工具
+
+每个并发单元持有一条HTTP/1.1 keep-alive连接，使用极简的请求/响应解析，
+避免通用HTTP客户端自身的开销在高并发下成为瓶颈(压测端与服务端可能共用CPU)。
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Union
+from urllib.parse import urlsplit
+
+
+@dataclass
+class Scenario:
+    """压测场景，path可以是固定路径，也可以是按请求序号生成路径的函数"""
+    name: str
+    path: Union[str, Callable[[int], str]]
+    concurrency: int = 16
+    expected_status: Sequence[int] = (200,)
+    method: str = "GET"
+
+
+@dataclass
+class LoadResult:
+    """单个场景的压测结果，延迟单位为毫秒"""
+    requests: int
+    errors: int
+    seconds: float
+    latencies_ms: List[float] = field(default_factory=list, repr=False)
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rps": round(self.rps, 1),
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(max(self.latencies_ms, default=0.0), 3),
+        }
+
+
+class _Connection:
+    """极简HTTP/1.1 keep-alive连接，支持Content-Length与chunked响应体"""
+
+    def __init__(self, host: str, port: int):
+        self._host = host
+        self._port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str) -> int:
+        """发送请求并完整读取响应，返回状态码"""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+        self._writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self._host}\r\n\r\n".encode("latin-1"))
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("连接已被服务端关闭")
+        status = int(status_line.split()[1])
+
+        content_length, chunked, close = 0, False, False
+        while (line := await self._reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.partition(b":")
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == b"content-length":
+                content_length = int(value)
+            elif name == b"transfer-encoding":
+                chunked = value == b"chunked"
+            elif name == b"connection":
+                close = value == b"close"
+
+        if chunked:
+            while size := int((await self._reader.readline()).split(b";")[0], 16):
+                await self._reader.readexactly(size + 2)
+            await self._reader.readline()
+        elif content_length:
+            await self._reader.readexactly(content_length)
+
+        if close:
+            self.close()
+        return status
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+async def run_load(
+        base_url: str,
+        scenario: Scenario,
+        duration: float,
+        concurrency: Optional[int] = None,
+        warmup: float = 1.0,
+) -> LoadResult:
+    """以固定并发持续请求duration秒，先预热warmup秒不计入结果"""
+    concurrency = concurrency or scenario.concurrency
+    url = urlsplit(base_url)
+    counter = 0
+
+    def next_path() -> str:
+        nonlocal counter
+        counter += 1
+        return scenario.path(counter) if callable(scenario.path) else scenario.path
+
+    async def worker(deadline: float, latencies: Optional[List[float]], errors: List[int]) -> None:
+        connection = _Connection(url.hostname, url.port or 80)
+        try:
+            while time.perf_counter() < deadline:
+                started_at = time.perf_counter()
+                try:
+                    ok = await connection.request(scenario.method, next_path()) in scenario.expected_status
+                except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                    connection.close()
+                    ok = False
+                if latencies is None:
+                    continue
+                latencies.append((time.perf_counter() - started_at) * 1000)
+                if not ok:
+                    errors.append(1)
+        finally:
+            connection.close()
+
+    # 1.预热：建立连接、填充缓存
+    if warmup > 0:
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*[worker(deadline, None, []) for _ in range(concurrency)])
+
+    # 2.正式压测
+    latencies: List[float] = []
+    errors: List[int] = []
+    started_at = time.perf_counter()
+    deadline = started_at + duration
+    await asyncio.gather(*[worker(deadline, latencies, errors) for _ in range(concurrency)])
+    seconds = time.perf_counter() - started_at
+
+    return LoadResult(requests=len(latencies), errors=len(errors), seconds=seconds, latencies_ms=latencies)
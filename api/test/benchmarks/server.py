@@ -0,0 +1,40 @@
+"""基准测试用的应用进程：挂载本地依赖替身后以单worker启动应用
+
+由 test.benchmarks.suite 以子进程方式启动，也可单独运行:
+python -m test.benchmarks.server --port 8900 --redis-port 6390 --workdir /tmp/minimus-bench
+"""
+import argparse
+import os
+from pathlib import Path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="以本地依赖替身启动应用")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--redis-port", type=int, default=6390)
+    parser.add_argument("--workdir", type=Path, required=True)
+    args = parser.parse_args()
+
+    # 1.配置需在应用导入前通过环境变量注入，SQLite不支持SET TRANSACTION READ ONLY
+    os.environ.update({
+        "REDIS_HOST": args.host,
+        "REDIS_PORT": str(args.redis_port),
+        "DATABASE_ENFORCE_READ_ONLY": "false",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        "LOG_FILE": str(args.workdir / "logs" / "minimus.log"),
+        "METRICS_MULTIPROC_DIR": "",
+    })
+
+    from test.benchmarks.stand_ins import install_stand_ins
+    install_stand_ins(args.workdir)
+
+    import uvicorn
+    from app.main import app
+
+    # 2.与生产入口保持一致的事件循环与HTTP解析器，关闭访问日志避免干扰结果
+    uvicorn.run(app, host=args.host, port=args.port, loop="uvloop", http="httptools", access_log=False, log_config=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""基准测试使用的本地依赖替身
+
+- Redis: fakeredis的TCP服务，应用仍通过真实的Redis客户端与连接池访问
+- Postgres: SQLite(aiosqlite)文件库，沿用应用的引擎/连接池/仓储代码
+- COS: 本地目录实现的对象存储，接口与CosS3Client保持一致
+- 大模型: 兼容OpenAI /v1/chat/completions 的本地服务，回显最后一条消息，可模拟延迟、长尾与错误
+"""
+import io
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import quote, urlencode
+
+from sqlalchemy import CHAR, UUID, MetaData, create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.infrastructure.models import Base, DemoModel
+
+
+def serve_fake_redis(host: str, port: int) -> None:
+    """在当前进程中启动fakeredis TCP服务(阻塞)"""
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer((host, port), server_type="redis")
+    server.serve_forever()
+
+
+def serve_openai_stub(
+        host: str,
+        port: int,
+        latency: float = 0.05,
+        chunk_latency: float = 0.005,
+        slow_every: int = 0,
+        slow_latency: float = 1.0,
+        fail_every: int = 0,
+) -> None:
+    """在当前进程中启动兼容OpenAI接口的大模型替身服务(阻塞)
+
+    - 回复内容为最后一条消息的回显，token数按空格分词计算
+    - 每slow_every个请求中有一个额外等待slow_latency秒，用于模拟长尾与验证对冲
+    - 每fail_every个请求中有一个返回503，用于验证重试
+    """
+    import asyncio
+    import json
+    import time
+
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, Response, StreamingResponse
+    from starlette.routing import Route
+
+    counter = {"requests": 0}
+
+    async def chat_completions(request: Request) -> Response:
+        counter["requests"] += 1
+        number = counter["requests"]
+        if fail_every and number % fail_every == 0:
+            return JSONResponse({"error": {"message": "stub overloaded", "type": "server_error"}}, status_code=503)
+
+        body = await request.json()
+        prompt = str(body["messages"][-1].get("content", ""))
+        words = f"echo: {prompt}".split(" ")
+        usage = {
+            "prompt_tokens": sum(len(str(m.get("content", "")).split()) for m in body["messages"]),
+            "completion_tokens": len(words),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        delay = latency + (slow_latency if slow_every and number % slow_every == 0 else 0)
+        await asyncio.sleep(delay)
+        completion_id, created, model = f"chatcmpl-{number}", int(time.time()), body.get("model", "stub")
+
+        if not body.get("stream"):
+            return JSONResponse({
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        async def events() -> Any:
+            def event(choices: List[Dict[str, Any]], **extra: Any) -> bytes:
+                data = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": choices, **extra}
+                return f"data: {json.dumps(data)}\n\n".encode("utf-8")
+
+            for index, word in enumerate(words):
+                content = word if index == 0 else f" {word}"
+                yield event([{"index": 0, "delta": {"content": content}, "finish_reason": None}])
+                await asyncio.sleep(chunk_latency)
+            yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield event([], usage=usage)
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    app = Starlette(routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])])
+    uvicorn.run(app, host=host, port=port, log_level="warning", access_log=False)
+
+
+def create_sqlite_database(path: Path, rows: int) -> None:
+    """按应用模型创建SQLite表并写入测试数据
+
+    Postgres专有的server_default在SQLite中去掉；UUID列建为CHAR(32)，
+    否则SQLite按NUMERIC亲和性存储，形如"123e4567..."的十六进制串会被转换成浮点数。
+    """
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copied = table.to_metadata(metadata)
+        for column in copied.columns:
+            column.server_default = None
+            if isinstance(column.type, UUID):
+                column.type = CHAR(32)
+
+    engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+    started_at = datetime.now() - timedelta(days=1)
+    values = [
+        {
+            "id": uuid.uuid4().hex,
+            "name": f"demo-{index}",
+            "age": index % 100,
+            "description": f"benchmark row {index}",
+            "created_at": started_at + timedelta(milliseconds=index),
+            "updated_at": started_at + timedelta(milliseconds=index),
+        }
+        for index in range(rows)
+    ]
+    with engine.begin() as conn:
+        for offset in range(0, len(values), 1000):
+            conn.execute(insert(metadata.tables[DemoModel.__tablename__]), values[offset:offset + 1000])
+    engine.dispose()
+
+
+class _Body:
+    """模拟COS响应体，提供get_raw_stream/get_stream"""
+
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+
+    def get_raw_stream(self) -> io.BytesIO:
+        return self._stream
+
+    def get_stream(self, chunk_size: int = 1024) -> Iterator[bytes]:
+        while True:
+            chunk = self._stream.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class LocalObjectStore:
+    """以本地目录模拟COS存储桶，只实现应用用到的CosS3Client接口"""
+
+    def __init__(self, root: Path):
+        self._root = root
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._uploads: Dict[str, Dict[int, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self._root / key.lstrip("/")
+
+    @staticmethod
+    def _not_found(method: str, key: str) -> Exception:
+        from qcloud_cos.cos_exception import CosServiceError
+
+        return CosServiceError(method, {"code": "NoSuchKey", "message": key}, 404)
+
+    def head_bucket(self, Bucket: str) -> None:
+        return None
+
+    def put_object(self, Bucket: str, Key: str, Body: Any, **kwargs: Any) -> Dict[str, Any]:
+        path = self._path(Key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = Body if isinstance(Body, (bytes, bytearray)) else Body.read()
+        path.write_bytes(data)
+        return {"ETag": f'"{uuid.uuid5(uuid.NAMESPACE_URL, str(len(data)) + Key).hex}"'}
+
+    def get_object(self, Bucket: str, Key: str, Range: Optional[str] = None, **kwargs: Any) -> Dict[str, Any]:
+        path = self._path(Key)
+        if not path.exists():
+            raise self._not_found("GET", Key)
+        data = path.read_bytes()
+        size = len(data)
+        if Range is None:
+            return {"Body": _Body(data), "Content-Length": str(size), "ETag": f'"{uuid.uuid5(uuid.NAMESPACE_URL, str(size) + Key).hex}"'}
+        start, end = Range.removeprefix("bytes=").split("-")
+        start, end = int(start), min(int(end), size - 1)
+        if start >= size:
+            from qcloud_cos.cos_exception import CosServiceError
+
+            raise CosServiceError("GET", {"code": "InvalidRange", "message": Key}, 416)
+        return {"Body": _Body(data[start:end + 1]), "Content-Range": f"bytes {start}-{end}/{size}"}
+
+    def head_object(self, Bucket: str, Key: str, **kwargs: Any) -> Dict[str, Any]:
+        path = self._path(Key)
+        if not path.exists():
+            raise self._not_found("HEAD", Key)
+        size = path.stat().st_size
+        return {"Content-Length": str(size), "ETag": f'"{uuid.uuid5(uuid.NAMESPACE_URL, str(size) + Key).hex}"'}
+
+    def get_presigned_url(
+            self, Bucket: str, Key: str, Method: str, Expired: int = 300,
+            Params: Optional[Dict[str, str]] = None, Headers: Optional[Dict[str, str]] = None, **kwargs: Any,
+    ) -> str:
+        """返回不可访问的占位URL，替身环境中客户端直传由测试代码直接写入本地目录代替"""
+        query = urlencode({"method": Method, "expired": Expired, **(Params or {})})
+        return f"http://{Bucket}.cos.local/{quote(Key.lstrip('/'))}?{query}"
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs: Any) -> Dict[str, Any]:
+        self._path(Key).unlink(missing_ok=True)
+        return {}
+
+    def create_multipart_upload(self, Bucket: str, Key: str, **kwargs: Any) -> Dict[str, Any]:
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket: str, Key: str, Body: bytes, PartNumber: int, UploadId: str, **kwargs: Any) -> Dict[str, Any]:
+        with self._lock:
+            self._uploads[UploadId][PartNumber] = Body
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(
+            self, Bucket: str, Key: str, UploadId: str, MultipartUpload: Dict[str, List[Dict[str, Any]]], **kwargs: Any
+    ) -> Dict[str, Any]:
+        with self._lock:
+            parts = self._uploads.pop(UploadId)
+        data = b"".join(parts[part["PartNumber"]] for part in MultipartUpload["Part"])
+        return self.put_object(Bucket, Key, data)
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str, **kwargs: Any) -> Dict[str, Any]:
+        with self._lock:
+            self._uploads.pop(UploadId, None)
+        return {}
+
+
+def install_stand_ins(workdir: Path) -> None:
+    """替换Postgres引擎与COS客户端的创建逻辑，需在应用启动(lifespan)之前调用"""
+    from app.infrastructure.storage.cos import Cos
+    from app.infrastructure.storage.postgres import InstrumentedAsyncQueuePool, Postgres
+
+    database_path = workdir / "benchmark.sqlite3"
+
+    def create_engine_stand_in(self: Postgres, url: str) -> AsyncEngine:
+        pool_size, max_overflow = self.settings.database_pool_limits()
+        return create_async_engine(
+            f"sqlite+aiosqlite:///{database_path}",
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=self.settings.DATABASE_POOL_TIMEOUT,
+        )
+
+    def create_client_stand_in(self: Cos) -> None:
+        self._client = LocalObjectStore(workdir / "objects")
+        self._executor = ThreadPoolExecutor(max_workers=self._settings.COS_MAX_WORKERS, thread_name_prefix="cos")
+
+    Postgres._create_engine = create_engine_stand_in
+    Cos._create_client = create_client_stand_in
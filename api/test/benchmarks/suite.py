@@ -0,0 +1,216 @@
+"""压测基准套件
+
+以fakeredis、SQLite与本地目录对象存储作为依赖替身启动应用(独立子进程)，按场景并发压测，
+输出吞吐、p50/p95/p99延迟与服务进程内存，结果保存为JSON并与基线对比，超出阈值时以非0状态码退出。
+
+运行方式(在api目录下，需安装dev依赖组):
+    python -m test.benchmarks.suite                      # 运行并与 test/benchmarks/baseline.json 对比
+    python -m test.benchmarks.suite --save-baseline      # 运行并将结果保存为新的基线
+    python -m test.benchmarks.suite --scenarios livez demos_page --duration 5
+"""
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from test.benchmarks.load import Scenario, run_load
+from test.benchmarks.stand_ins import create_sqlite_database
+
+API_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_RESULTS_DIR = Path(__file__).with_name("results")
+
+
+def build_scenarios(deep_cursor: str) -> List[Scenario]:
+    return [
+        Scenario("livez", "/api/status/livez", concurrency=16),
+        Scenario("readyz", "/api/status/readyz", concurrency=16),
+        Scenario("demos_page", "/api/demos?limit=20", concurrency=16),
+        Scenario("demos_deep_page", f"/api/demos?limit=20&cursor={deep_cursor}", concurrency=16),
+        Scenario("demos_stream", "/api/demos/stream", concurrency=2),
+        Scenario("metrics", "/api/status/metrics", concurrency=4),
+        Scenario("not_found", "/api/not-found", concurrency=16, expected_status=(404,)),
+    ]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _memory_mb(pid: int) -> Dict[str, Optional[float]]:
+    """读取进程当前与峰值常驻内存，仅支持Linux"""
+    values: Dict[str, Optional[float]] = {"rss_mb": None, "peak_rss_mb": None}
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                values["rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+            elif line.startswith("VmHWM:"):
+                values["peak_rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return values
+
+
+async def _wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"应用进程启动失败，退出码: {process.returncode}，日志见工作目录下server.log")
+            try:
+                if (await client.get("/api/status/readyz")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("等待应用就绪超时")
+
+
+async def _deep_cursor(base_url: str, rows: int) -> str:
+    """翻页到数据中部，得到深分页场景使用的游标"""
+    cursor = ""
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(max(rows // 2 // 100, 1)):
+            params = {"limit": 100, **({"cursor": cursor} if cursor else {})}
+            data = (await client.get("/api/demos", params=params)).json()["data"]
+            if not data["next_cursor"]:
+                break
+            cursor = data["next_cursor"]
+    return cursor
+
+
+async def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix="minimus-bench-"))
+    create_sqlite_database(workdir / "benchmark.sqlite3", args.rows)
+
+    redis_port, app_port = _free_port(), _free_port()
+    base_url = f"http://127.0.0.1:{app_port}"
+    # 子进程输出写入工作目录，避免干扰压测结果输出
+    log_file = (workdir / "server.log").open("wb")
+    redis_process = subprocess.Popen(
+        [sys.executable, "-c", f"from test.benchmarks.stand_ins import serve_fake_redis; serve_fake_redis('127.0.0.1', {redis_port})"],
+        cwd=API_DIR, stdout=log_file, stderr=subprocess.STDOUT,
+    )
+    app_process = subprocess.Popen(
+        [
+            sys.executable, "-m", "test.benchmarks.server",
+            "--port", str(app_port), "--redis-port", str(redis_port), "--workdir", str(workdir),
+        ],
+        cwd=API_DIR, stdout=log_file, stderr=subprocess.STDOUT,
+    )
+    print(f"工作目录: {workdir}", flush=True)
+    try:
+        await _wait_ready(base_url, app_process)
+        scenarios = build_scenarios(await _deep_cursor(base_url, args.rows))
+        if args.scenarios:
+            scenarios = [scenario for scenario in scenarios if scenario.name in args.scenarios]
+
+        results: Dict[str, Any] = {}
+        for scenario in scenarios:
+            result = await run_load(base_url, scenario, duration=args.duration, concurrency=args.concurrency)
+            results[scenario.name] = {
+                "concurrency": args.concurrency or scenario.concurrency,
+                **result.summary(),
+                **_memory_mb(app_process.pid),
+            }
+            print(f"{scenario.name:<18} {results[scenario.name]}", flush=True)
+    finally:
+        # 先停应用再停Redis，保证应用能正常关闭连接
+        app_process.terminate()
+        app_process.wait(timeout=30)
+        redis_process.terminate()
+        redis_process.wait(timeout=10)
+        log_file.close()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "duration": args.duration,
+            "rows": args.rows,
+        },
+        "scenarios": results,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=API_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """对比基线，吞吐下降、p95延迟上升超过阈值或错误数增加即视为回退"""
+    regressions = []
+    print(f"\n{'scenario':<18}{'rps':>12}{'base':>12}{'diff':>9}{'p95_ms':>12}{'base':>12}{'diff':>9}")
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        rps_diff = result["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        p95_diff = result["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        print(
+            f"{name:<18}{result['rps']:>12.1f}{base['rps']:>12.1f}{rps_diff:>+9.1%}"
+            f"{result['p95_ms']:>12.2f}{base['p95_ms']:>12.2f}{p95_diff:>+9.1%}"
+        )
+        if rps_diff < -threshold:
+            regressions.append(f"{name}: 吞吐下降 {-rps_diff:.1%}")
+        if p95_diff > threshold:
+            regressions.append(f"{name}: p95延迟上升 {p95_diff:.1%}")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{name}: 错误数 {base['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Minimus API 压测基准套件")
+    parser.add_argument("--duration", type=float, default=10, help="每个场景的压测时长(秒)")
+    parser.add_argument("--concurrency", type=int, default=None, help="覆盖所有场景的并发数")
+    parser.add_argument("--rows", type=int, default=5000, help="Demo表测试数据行数")
+    parser.add_argument("--scenarios", nargs="*", help="只运行指定场景")
+    parser.add_argument("--output", type=Path, default=None, help="结果JSON路径，默认写入results目录")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="基线JSON路径")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=0.15, help="判定回退的相对阈值")
+    args = parser.parse_args()
+
+    current = asyncio.run(run_suite(args))
+
+    output = args.output or DEFAULT_RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n结果已保存: {output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"基线已更新: {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print("未找到基线，跳过对比(可使用 --save-baseline 保存基线)")
+        return
+
+    regressions = compare(current, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+    if regressions:
+        print("\n检测到性能回退:\n" + "\n".join(f"  - {item}" for item in regressions))
+        sys.exit(1)
+    print("\n未检测到性能回退")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""测试公共夹具
+
+- Redis: 以独立子进程运行fakeredis的TCP服务，应用代码仍通过真实的Redis客户端与连接池访问
+- Postgres: 设置TEST_DATABASE_URL(asyncpg连接URL，如postgresql+asyncpg://postgres@localhost/minimus_test)时启用，
+  每个测试前建表、测试后删表；未设置时跳过依赖数据库的测试
+- SQLite: 按应用模型建立的临时SQLite库(aiosqlite)，用于不依赖Postgres专有特性的仓储测试
+- 运行方式(在api目录下，需安装dev依赖组): python -m pytest
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import AsyncIterator, Iterator
+
+import pytest
+
+API_DIR = Path(__file__).resolve().parents[1]
+
+# 测试使用单进程指标模式，日志写入单独的文件
+os.environ.setdefault("METRICS_MULTIPROC_DIR", "")
+os.environ.setdefault("LOG_FILE", str(API_DIR / "logs" / "test.log"))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_port(port: int, timeout: float = 15) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"端口{port}未在{timeout}s内就绪")
+            time.sleep(0.05)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def redis_server() -> Iterator[int]:
+    """整个测试会话共用一个fakeredis TCP服务，返回端口"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-c", f"from test.benchmarks.stand_ins import serve_fake_redis; serve_fake_redis('127.0.0.1', {port})"],
+        cwd=API_DIR,
+    )
+    os.environ["REDIS_HOST"] = "127.0.0.1"
+    os.environ["REDIS_PORT"] = str(port)
+    try:
+        _wait_port(port)
+        yield port
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.fixture(autouse=True)
+def settings(redis_server: int):
+    """每个测试使用新的配置实例，测试内可通过monkeypatch.setattr(settings, ...)调整"""
+    from core.config import get_settings
+
+    get_settings.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+async def redis_client(settings) -> AsyncIterator:
+    """已初始化的Redis客户端，测试结束后清空数据并关闭"""
+    from app.infrastructure.storage.redis import get_redis_client
+
+    client = get_redis_client()
+    await client.init()
+    try:
+        yield client
+    finally:
+        await client.client.flushall()
+        await client.close()
+
+
+@pytest.fixture
+async def sqlite_session(tmp_path) -> AsyncIterator:
+    """连接临时SQLite库的会话，表结构与应用模型一致(去掉Postgres专有的server_default)"""
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from test.benchmarks.stand_ins import create_sqlite_database
+
+    path = tmp_path / "test.sqlite3"
+    create_sqlite_database(path, rows=0)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+def postgres_url() -> str:
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("未设置TEST_DATABASE_URL，跳过依赖Postgres的测试")
+    return url
+
+
+@pytest.fixture
+async def db_session(postgres_url: str) -> AsyncIterator:
+    """连接测试库的会话，测试前按模型建表，测试后删除"""
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from app.infrastructure.models import Base
+
+    engine = create_async_engine(postgres_url, poolclass=NullPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
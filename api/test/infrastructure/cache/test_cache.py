@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from app.infrastructure.cache import CacheManager
+from app.infrastructure.cache import cache as cache_module
+
+pytestmark = pytest.mark.anyio
+
+
+async def wait_subscribers(redis_client, channel: str, count: int) -> None:
+    for _ in range(200):
+        (_, subscribers), = await redis_client.client.pubsub_numsub(channel)
+        if subscribers >= count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{channel}订阅数未达到{count}")
+
+
+async def eventually(predicate, timeout: float = 3) -> None:
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("条件未在超时时间内满足")
+
+
+def locally_cached(manager: CacheManager, key: str) -> bool:
+    return manager.get_cache("demo")._local.get(key)[0]
+
+
+@pytest.fixture
+async def managers(redis_client, settings, monkeypatch):
+    """两个缓存管理器，模拟共享同一个Redis的两个worker"""
+    monkeypatch.setattr(settings, "CACHE_LOCK_WAIT_TIMEOUT", 0.1)
+    first, second = CacheManager(), CacheManager()
+    await first.init()
+    await second.init()
+    yield first, second
+    await first.shutdown()
+    await second.shutdown()
+
+
+async def test_waiters_do_not_load_after_lock_timeout(managers):
+    first, second = managers
+    calls = []
+
+    async def slow_loader():
+        calls.append("loaded")
+        await asyncio.sleep(0.5)
+        return {"value": 1}
+
+    async def never_called():
+        raise AssertionError("等锁超时的worker不应回源")
+
+    loading = asyncio.create_task(first.get_cache("demo").get_or_load("key", slow_loader))
+    await asyncio.sleep(0.05)
+    value = await second.get_cache("demo").get_or_load("key", never_called)
+
+    assert value == {"value": 1}
+    assert await loading == {"value": 1}
+    assert calls == ["loaded"]
+    assert second.get_cache("demo").stats.loads == 0
+
+
+async def test_waiter_loads_after_holder_fails(managers):
+    first, second = managers
+
+    async def failing_loader():
+        await asyncio.sleep(0.2)
+        raise RuntimeError("backend down")
+
+    async def loader():
+        return "recovered"
+
+    failing = asyncio.create_task(first.get_cache("demo").get_or_load("key", failing_loader))
+    await asyncio.sleep(0.05)
+
+    assert await second.get_cache("demo").get_or_load("key", loader) == "recovered"
+    with pytest.raises(RuntimeError):
+        await failing
+
+
+async def test_invalidate_clears_other_workers_local_cache(redis_client, settings, managers):
+    first, second = managers
+    await wait_subscribers(redis_client, settings.CACHE_INVALIDATION_CHANNEL, 2)
+    await first.get_cache("demo").set("key", {"value": 1})
+    assert await second.get_cache("demo").get("key") == (True, {"value": 1})
+    assert locally_cached(second, "key")
+
+    await first.get_cache("demo").invalidate("key")
+
+    await eventually(lambda: not locally_cached(second, "key"))
+    assert await second.get_cache("demo").get("key") == (False, None)
+
+
+async def test_clear_empties_namespace_everywhere(redis_client, settings, managers):
+    first, second = managers
+    await wait_subscribers(redis_client, settings.CACHE_INVALIDATION_CHANNEL, 2)
+    for key in ("a", "b"):
+        await first.get_cache("demo").set(key, key)
+        await second.get_cache("demo").get(key)
+
+    await first.get_cache("demo").clear()
+
+    await eventually(lambda: not locally_cached(second, "a") and not locally_cached(second, "b"))
+    assert await first.get_cache("demo").get_many(["a", "b"]) == {}
+
+
+async def test_idle_subscription_keeps_local_cache(redis_client, settings, managers, monkeypatch):
+    monkeypatch.setattr(cache_module, "_PUBSUB_POLL_TIMEOUT", 0.02)
+    first, second = managers
+    await second.get_cache("demo").set("key", "value")
+
+    await asyncio.sleep(0.3)
+
+    assert locally_cached(second, "key")
+
+
+async def test_disconnect_clears_local_cache_and_resubscribes(redis_client, settings, monkeypatch):
+    lost = asyncio.Event()
+    subscriptions = []
+    original_pubsub = redis_client.pubsub
+
+    def flaky_pubsub(**kwargs):
+        pubsub = original_pubsub(**kwargs)
+        subscriptions.append(pubsub)
+        if len(subscriptions) == 1:
+            async def get_message(**kwargs):
+                await lost.wait()
+                raise ConnectionError("connection lost")
+
+            pubsub.get_message = get_message
+        return pubsub
+
+    monkeypatch.setattr(redis_client, "pubsub", flaky_pubsub)
+    publisher, subscriber = CacheManager(), CacheManager()
+    # 先启动的订阅任务拿到第一个(会断线的)连接
+    await subscriber.init()
+    await eventually(lambda: len(subscriptions) == 1)
+    await publisher.init()
+    try:
+        await subscriber.get_cache("demo").set("key", "value")
+        assert locally_cached(subscriber, "key")
+
+        lost.set()
+        await eventually(lambda: not locally_cached(subscriber, "key"))
+
+        # 重新订阅后恢复接收失效消息
+        await eventually(lambda: len(subscriptions) >= 3)
+        await wait_subscribers(redis_client, settings.CACHE_INVALIDATION_CHANNEL, 2)
+        await subscriber.get_cache("demo").set("other", "value")
+        await publisher.get_cache("demo").invalidate("other")
+        await eventually(lambda: not locally_cached(subscriber, "other"))
+    finally:
+        await publisher.shutdown()
+        await subscriber.shutdown()
@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.infrastructure.cache.disk_cache import CosDiskCache
+from app.infrastructure.storage.cos import Cos
+from test.benchmarks.stand_ins import LocalObjectStore
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def cos(tmp_path, settings, monkeypatch):
+    monkeypatch.setattr(settings, "COS_LAZY_INIT", False)
+
+    def create_client(self: Cos) -> None:
+        self._client = LocalObjectStore(tmp_path / "objects")
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cos")
+
+    monkeypatch.setattr(Cos, "_create_client", create_client)
+    instance = Cos()
+    await instance.init()
+    yield instance
+    await instance.shutdown()
+
+
+@pytest.fixture
+async def disk_cache(cos, tmp_path, settings, monkeypatch):
+    monkeypatch.setattr(settings, "COS_DISK_CACHE_DIR", str(tmp_path / "cache"))
+    instance = CosDiskCache(cos)
+    await instance.init()
+    yield instance
+    await instance.shutdown()
+
+
+async def test_read_through_caches_object(cos, disk_cache):
+    await cos.put_object("file", b"data")
+
+    assert await disk_cache.read("file") == b"data"
+    assert await disk_cache.read("file") == b"data"
+    assert disk_cache.stats.misses == 1
+    assert disk_cache.stats.hits == 1
+
+
+async def test_lock_files_are_striped(cos, disk_cache, tmp_path):
+    keys = [f"file-{index}" for index in range(200)]
+    for key in keys:
+        await cos.put_object(key, key.encode("utf-8"))
+        assert await disk_cache.read(key) == key.encode("utf-8")
+
+    stripes = {disk_cache._paths(key)[2] for key in keys}
+    locks = {path for path in (tmp_path / "cache" / "locks").iterdir() if path.name != "evict.lock"}
+    assert locks == stripes
+    assert all(len(path.stem) == 3 for path in locks)
@@ -0,0 +1,206 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.infrastructure.external.openai_llm import OpenAILLM
+
+pytestmark = pytest.mark.anyio
+
+
+def completion(content: str, finish_reason: str = "stop") -> dict:
+    return {
+        "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": "stub",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+        "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5},
+    }
+
+
+def stream_events(words: list) -> bytes:
+    chunks = [
+        {"choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]} for word in words
+    ] + [
+        {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+        {"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": len(words), "total_tokens": 3 + len(words)}},
+    ]
+    lines = [
+        f"data: {json.dumps({'id': 'chatcmpl-test', 'object': 'chat.completion.chunk', 'created': 0, 'model': 'stub', **chunk})}"
+        for chunk in chunks
+    ]
+    return ("\n\n".join(lines) + "\n\ndata: [DONE]\n\n").encode("utf-8")
+
+
+class StubModel:
+    """httpx.MockTransport的处理函数：回显最后一条消息，记录请求数与最大并发数"""
+
+    def __init__(self, latency: float = 0.0, finish_reason: str = "stop", failures: int = 0):
+        self.latency = latency
+        self.finish_reason = finish_reason
+        self.failures = failures
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        if self.failures > 0:
+            self.failures -= 1
+            return httpx.Response(503, json={"error": {"message": "overloaded", "type": "server_error"}})
+        prompt = body["messages"][-1]["content"]
+        if body.get("stream"):
+            return httpx.Response(200, content=stream_events(["echo:", f" {prompt}"]), headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json=completion(f"echo: {prompt}", self.finish_reason))
+
+
+@pytest.fixture
+def llm_settings(settings, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BASE_URL", "http://llm.test/v1")
+    monkeypatch.setattr(settings, "LLM_RETRY_BACKOFF", 0.01)
+    monkeypatch.setattr(settings, "LLM_CACHE_KEY_PREFIX", "test:llm")
+    return settings
+
+
+@pytest.fixture
+async def make_llm(redis_client, llm_settings):
+    gateways = []
+
+    async def make(stub: StubModel) -> OpenAILLM:
+        llm = OpenAILLM(transport=httpx.MockTransport(stub))
+        await llm.init()
+        gateways.append(llm)
+        return llm
+
+    yield make
+    for llm in gateways:
+        await llm.shutdown()
+
+
+def user(content: str) -> list:
+    return [{"role": "user", "content": content}]
+
+
+async def test_chat_is_cached_after_normalization(make_llm):
+    stub = StubModel()
+    llm = await make_llm(stub)
+
+    first = await llm.chat(user("hello"), temperature=0)
+    second = await llm.chat(user("  hello\r\n"), temperature=0, user="someone-else")
+
+    assert len(stub.requests) == 1
+    assert (first.content, first.cached) == ("echo: hello", False)
+    assert (second.content, second.cached, second.usage.total_tokens) == ("echo: hello", True, 5)
+
+
+async def test_cache_is_keyed_on_output_affecting_params(make_llm):
+    stub = StubModel()
+    llm = await make_llm(stub)
+
+    await llm.chat(user("hello"), temperature=0)
+    await llm.chat(user("hello"), temperature=1)
+    await llm.chat(user("hello"), temperature=0, use_cache=False)
+
+    assert len(stub.requests) == 3
+
+
+async def test_filtered_output_is_not_cached(make_llm):
+    stub = StubModel(finish_reason="content_filter")
+    llm = await make_llm(stub)
+
+    await llm.chat(user("hello"))
+    await llm.chat(user("hello"))
+
+    assert len(stub.requests) == 2
+
+
+async def test_concurrent_identical_requests_call_model_once(make_llm):
+    stub = StubModel(latency=0.1)
+    llm = await make_llm(stub)
+
+    results = await asyncio.gather(*[llm.chat(user("same")) for _ in range(5)])
+
+    assert len(stub.requests) == 1
+    assert {result.content for result in results} == {"echo: same"}
+
+
+async def test_concurrency_limit_queues_excess_requests(make_llm, llm_settings, monkeypatch):
+    monkeypatch.setattr(llm_settings, "LLM_MAX_CONCURRENCY", 2)
+    stub = StubModel(latency=0.05)
+    llm = await make_llm(stub)
+
+    await asyncio.gather(*[llm.chat(user(f"prompt {index}"), use_cache=False) for index in range(6)])
+
+    assert len(stub.requests) == 6
+    assert stub.max_active == 2
+
+
+async def test_retryable_errors_are_retried(make_llm):
+    stub = StubModel(failures=2)
+    llm = await make_llm(stub)
+
+    result = await llm.chat(user("retry"), use_cache=False)
+
+    assert result.content == "echo: retry"
+    assert len(stub.requests) == 3
+
+
+async def test_stream_forwards_chunks_and_caches_full_output(make_llm):
+    stub = StubModel()
+    llm = await make_llm(stub)
+
+    chunks = [chunk async for chunk in llm.stream(user("stream me"))]
+    cached = [chunk async for chunk in llm.stream(user("stream me"))]
+
+    assert "".join(chunk.content for chunk in chunks) == "echo: stream me"
+    assert chunks[-1].finish_reason == "stop" and chunks[-1].usage.completion_tokens == 2
+    assert stub.requests[0]["stream_options"] == {"include_usage": True}
+    assert len(stub.requests) == 1
+    assert cached[0].content == "echo: stream me" and all(chunk.cached for chunk in cached)
+
+
+async def test_requests_reuse_pooled_connections(redis_client, llm_settings, monkeypatch):
+    """默认传输层下所有调用共享同一个连接池，顺序调用复用同一条keep-alive连接"""
+    connections = []
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connections.append(writer)
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                return
+            length = next(
+                int(line.split(b":", 1)[1]) for line in head.split(b"\r\n") if line.lower().startswith(b"content-length:")
+            )
+            prompt = json.loads(await reader.readexactly(length))["messages"][-1]["content"]
+            body = json.dumps(completion(f"echo: {prompt}")).encode("utf-8")
+            writer.write(b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\ncontent-length: %d\r\n\r\n%s" % (len(body), body))
+            await writer.drain()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    monkeypatch.setattr(llm_settings, "LLM_BASE_URL", f"http://127.0.0.1:{port}/v1")
+    monkeypatch.setattr(llm_settings, "LLM_MAX_CONNECTIONS", 4)
+    llm = OpenAILLM()
+    await llm.init()
+    try:
+        http_client = llm._http_client
+        for index in range(5):
+            assert (await llm.chat(user(f"call {index}"), use_cache=False)).content == f"echo: call {index}"
+        await llm.init()
+
+        assert llm._http_client is http_client
+        assert len(connections) == 1
+    finally:
+        await llm.shutdown()
+        for writer in connections:
+            writer.close()
+        server.close()
+        await server.wait_closed()
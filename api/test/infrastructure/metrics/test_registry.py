@@ -0,0 +1,61 @@
+import json
+import os
+import threading
+
+import pytest
+
+from app.infrastructure.metrics import MetricsRegistry
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_render_single_process(settings):
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "请求数", ("path",)).inc(("/a",), 2)
+
+    text = await registry.render()
+
+    assert 'requests_total{path="/a"} 2' in text
+
+
+async def test_render_merges_worker_snapshots_off_event_loop(tmp_path, settings, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "请求数", ("path",))
+    registry.gauge("in_flight", "进行中请求数").set((), 3)
+    counter.inc(("/a",), 2)
+
+    # 另一个worker写入的快照(pid不存在，视为已退出，只保留计数类指标)
+    other = MetricsRegistry()
+    other.counter("requests_total", "请求数", ("path",)).inc(("/a",), 5)
+    other.gauge("in_flight", "进行中请求数").set((), 7)
+    (tmp_path / "metrics_999999999.json").write_text(json.dumps(other.snapshot()), encoding="utf-8")
+
+    threads = []
+    render_multiproc = registry._render_multiproc
+
+    def record_thread(snapshot):
+        threads.append(threading.current_thread())
+        return render_multiproc(snapshot)
+
+    monkeypatch.setattr(registry, "_render_multiproc", record_thread)
+    text = await registry.render()
+
+    assert threads and threads[0] is not threading.main_thread()
+    assert 'requests_total{path="/a"} 7' in text
+    assert "in_flight 3" in text
+    assert (tmp_path / f"metrics_{os.getpid()}.json").exists()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+async def test_shutdown_writes_final_snapshot(tmp_path, settings, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "METRICS_FLUSH_INTERVAL", 0.01)
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "任务数").inc()
+
+    await registry.init()
+    await registry.shutdown()
+
+    snapshot = json.loads((tmp_path / f"metrics_{os.getpid()}.json").read_text(encoding="utf-8"))
+    assert "jobs_total" in snapshot
@@ -0,0 +1,179 @@
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+import sqlalchemy as sa
+from alembic import op
+from alembic.config import Config
+from alembic.operations import Operations
+from alembic.runtime.environment import EnvironmentContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.infrastructure.migrations import (
+    add_column_with_backfill,
+    backfill,
+    create_index_concurrently,
+    run_with_lock_retry,
+    set_not_null,
+)
+
+pytestmark = pytest.mark.anyio
+
+API_DIR = Path(__file__).resolve().parents[3]
+TABLE = "migration_items"
+
+
+def _in_migration_context(connection: sa.Connection, operation: Callable[[], Any]) -> Any:
+    """与env.py一致，在迁移上下文(事务性DDL)中执行，使op与context可用"""
+    config = Config(str(API_DIR / "alembic.ini"))
+    with EnvironmentContext(config, ScriptDirectory.from_config(config)) as environment:
+        environment.configure(connection=connection)
+        with environment.begin_transaction(), Operations.context(environment.get_context()):
+            return operation()
+
+
+@pytest.fixture
+async def migrate(postgres_url, settings, monkeypatch):
+    """返回在迁移上下文中执行操作的函数，测试表含1000行，测试结束后删除"""
+    monkeypatch.setattr(settings, "MIGRATION_LOCK_TIMEOUT", 0.2)
+    monkeypatch.setattr(settings, "MIGRATION_LOCK_RETRY_BACKOFF", 0.2)
+    monkeypatch.setattr(settings, "MIGRATION_BACKFILL_SLEEP", 0)
+    engine = create_async_engine(
+        postgres_url, poolclass=NullPool, connect_args={"server_settings": {"lock_timeout": "200ms"}},
+    )
+    async with engine.begin() as connection:
+        await connection.exec_driver_sql(f"DROP TABLE IF EXISTS {TABLE}")
+        await connection.exec_driver_sql("DROP TABLE IF EXISTS alembic_backfill_progress")
+        await connection.exec_driver_sql(f"CREATE TABLE {TABLE} (id BIGINT PRIMARY KEY, name TEXT NOT NULL)")
+        await connection.exec_driver_sql(f"INSERT INTO {TABLE} SELECT g, 'item-' || g FROM generate_series(1, 1000) g")
+
+    async def run(operation: Callable[[], Any]) -> Any:
+        async with engine.connect() as connection:
+            return await connection.run_sync(_in_migration_context, operation)
+
+    async def query(sql: str) -> Any:
+        async with engine.connect() as connection:
+            return (await connection.exec_driver_sql(sql)).all()
+
+    run.query = query
+    yield run
+    async with engine.begin() as connection:
+        await connection.exec_driver_sql(f"DROP TABLE IF EXISTS {TABLE}")
+        await connection.exec_driver_sql("DROP TABLE IF EXISTS alembic_backfill_progress")
+    await engine.dispose()
+
+
+@pytest.fixture
+def table_lock(postgres_url):
+    """在另一个连接中持有表的ACCESS EXCLUSIVE锁，hold(seconds)后自动释放"""
+    engine = sa.create_engine(sa.make_url(postgres_url).set(drivername="postgresql+psycopg2"), poolclass=NullPool)
+    connection = engine.connect()
+    timers = []
+
+    def hold(seconds: float) -> None:
+        transaction = connection.begin()
+        connection.exec_driver_sql(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+        timer = threading.Timer(seconds, transaction.rollback)
+        timers.append(timer)
+        timer.start()
+
+    yield hold
+    for timer in timers:
+        timer.join()
+    connection.close()
+    engine.dispose()
+
+
+async def test_backfill_updates_in_batches_and_cleans_progress(migrate):
+    await migrate(lambda: op.add_column(TABLE, sa.Column("score", sa.Integer)))
+
+    updated = await migrate(lambda: backfill(TABLE, {"score": sa.text("length(t.name)")}, where="t.score IS NULL", batch_size=128))
+
+    assert updated == 1000
+    assert await migrate.query(f"SELECT count(*) FROM {TABLE} WHERE score = length(name)") == [(1000,)]
+    assert await migrate.query("SELECT count(*) FROM alembic_backfill_progress") == [(0,)]
+    # 重复执行时where条件跳过已回填的行
+    assert await migrate(lambda: backfill(TABLE, {"score": 0}, where="t.score IS NULL", batch_size=128)) == 0
+
+
+async def test_backfill_resumes_from_checkpoint(migrate):
+    await migrate(lambda: op.add_column(TABLE, sa.Column("flag", sa.Integer)))
+    await migrate(lambda: op.execute(
+        "CREATE TABLE alembic_backfill_progress (name VARCHAR(255) PRIMARY KEY, last_key TEXT NOT NULL, "
+        "rows_updated BIGINT NOT NULL DEFAULT 0, updated_at TIMESTAMP NOT NULL DEFAULT now())"
+    ))
+    await migrate(lambda: op.execute("INSERT INTO alembic_backfill_progress VALUES ('resume', '600', 600, now())"))
+
+    total = await migrate(lambda: backfill(TABLE, {"flag": 1}, batch_size=100, name="resume"))
+
+    assert total == 1000
+    assert await migrate.query(f"SELECT min(id), count(*) FROM {TABLE} WHERE flag = 1") == [(601, 400)]
+
+
+async def test_add_column_with_backfill_not_null_with_default(migrate):
+    column = sa.Column("status", sa.String(16), nullable=False, server_default="new")
+
+    await migrate(lambda: add_column_with_backfill(TABLE, column, "legacy", batch_size=300))
+    await migrate(lambda: op.execute(f"INSERT INTO {TABLE} (id, name) VALUES (1001, 'fresh')"))
+
+    assert await migrate.query(f"SELECT status, count(*) FROM {TABLE} GROUP BY status ORDER BY status") == [
+        ("legacy", 1000), ("new", 1),
+    ]
+    assert await migrate.query(
+        f"SELECT is_nullable FROM information_schema.columns WHERE table_name = '{TABLE}' AND column_name = 'status'"
+    ) == [("NO",)]
+    assert await migrate.query(f"SELECT conname FROM pg_constraint WHERE conrelid = '{TABLE}'::regclass AND contype = 'c'") == []
+
+
+async def test_set_not_null_rejects_remaining_nulls(migrate):
+    await migrate(lambda: op.add_column(TABLE, sa.Column("note", sa.Text)))
+
+    with pytest.raises(DBAPIError):
+        await migrate(lambda: set_not_null(TABLE, "note"))
+
+
+async def test_create_index_concurrently_rebuilds_invalid_index(migrate):
+    await migrate(lambda: create_index_concurrently("ix_migration_items_name", TABLE, ["name"]))
+    # 模拟CONCURRENTLY中途失败遗留的无效索引
+    await migrate(lambda: op.execute("UPDATE pg_index SET indisvalid = false WHERE indexrelid = 'ix_migration_items_name'::regclass"))
+
+    await migrate(lambda: create_index_concurrently("ix_migration_items_name", TABLE, ["name"]))
+    await migrate(lambda: create_index_concurrently("ix_migration_items_name", TABLE, ["name"]))
+
+    assert await migrate.query("SELECT indisvalid FROM pg_index WHERE indexrelid = 'ix_migration_items_name'::regclass") == [(True,)]
+
+
+@pytest.mark.parametrize("autocommit", [True, False])
+async def test_run_with_lock_retry_waits_out_lock(migrate, table_lock, autocommit):
+    attempts = []
+
+    def alter() -> None:
+        attempts.append(time.monotonic())
+        op.add_column(TABLE, sa.Column("extra", sa.Integer))
+
+    def operation() -> None:
+        if autocommit:
+            with op.get_context().autocommit_block():
+                run_with_lock_retry(alter)
+        else:
+            run_with_lock_retry(alter)
+
+    table_lock(0.5)
+    await migrate(operation)
+
+    assert len(attempts) > 1
+    assert await migrate.query(
+        f"SELECT count(*) FROM information_schema.columns WHERE table_name = '{TABLE}' AND column_name = 'extra'"
+    ) == [(1,)]
+
+
+async def test_run_with_lock_retry_gives_up(migrate, table_lock):
+    table_lock(1.5)
+
+    with pytest.raises(DBAPIError):
+        await migrate(lambda: run_with_lock_retry(lambda: op.add_column(TABLE, sa.Column("extra", sa.Integer)), retries=1))
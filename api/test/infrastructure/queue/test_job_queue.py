@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from app.domain.model.job import JobStatus
+from app.infrastructure.queue import JobQueue
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def queue(redis_client, settings, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_CLAIM_IDLE_MS", 100)
+    queue = JobQueue()
+    await queue.ensure_group()
+    return queue
+
+
+async def test_ensure_group_is_idempotent(queue):
+    await queue.ensure_group()
+
+
+async def test_enqueue_read_complete(queue, redis_client):
+    job = await queue.enqueue("demo.echo", {"value": 1})
+
+    messages = await queue.read("worker-a", count=10, block_ms=10)
+    assert [job_id for _, job_id in messages] == [job.id]
+    assert await queue.read("worker-b", count=10, block_ms=10) == []
+
+    running = await queue.mark_running(await queue.get(job.id))
+    assert (running.status, running.attempts) == (JobStatus.RUNNING, 1)
+
+    await queue.complete(messages[0][0], running, {"echo": 1})
+    stored = await queue.get(job.id)
+    assert (stored.status, stored.result, stored.payload) == (JobStatus.SUCCEEDED, {"echo": 1}, {"value": 1})
+    assert (await redis_client.client.xpending(queue.stream_key, queue.group))["pending"] == 0
+
+
+async def test_retry_is_redelivered_when_due(queue):
+    job = await queue.enqueue("demo.echo")
+    (message_id, _), = await queue.read("worker-a", count=1, block_ms=10)
+    job = await queue.mark_running(job)
+
+    await queue.retry(message_id, job, "boom", delay=0.2)
+    assert (await queue.get(job.id)).status == JobStatus.RETRYING
+    assert await queue.promote_due() == 0
+
+    await asyncio.sleep(0.25)
+    assert await queue.promote_due() == 1
+    assert await queue.promote_due() == 0
+    assert [job_id for _, job_id in await queue.read("worker-a", count=10, block_ms=10)] == [job.id]
+
+
+async def test_dead_letter(queue, redis_client):
+    job = await queue.enqueue("demo.echo")
+    (message_id, _), = await queue.read("worker-a", count=1, block_ms=10)
+
+    await queue.dead_letter(message_id, job, "too many attempts")
+
+    stored = await queue.get(job.id)
+    assert (stored.status, stored.error) == (JobStatus.DEAD, "too many attempts")
+    (_, fields), = await redis_client.client.xrange(queue.dead_key)
+    assert fields["job_id"] == job.id and fields["message_id"] == message_id
+    assert (await redis_client.client.xpending(queue.stream_key, queue.group))["pending"] == 0
+
+
+async def test_stale_messages_are_claimed_by_other_workers(queue):
+    job = await queue.enqueue("demo.echo")
+    await queue.read("crashed-worker", count=1, block_ms=10)
+
+    assert await queue.claim_stale("worker-b", count=10) == []
+    await asyncio.sleep(0.15)
+    claimed = await queue.claim_stale("worker-b", count=10)
+
+    assert [job_id for _, job_id in claimed] == [job.id]
+
+
+async def test_heartbeat_keeps_running_messages(queue):
+    await queue.enqueue("demo.echo")
+    (message_id, _), = await queue.read("worker-a", count=1, block_ms=10)
+
+    for _ in range(3):
+        await asyncio.sleep(0.06)
+        await queue.heartbeat("worker-a", [message_id])
+        assert await queue.claim_stale("worker-b", count=10) == []
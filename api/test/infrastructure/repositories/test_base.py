@@ -0,0 +1,142 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, List
+
+import pytest
+from sqlalchemy import func, select
+
+from app.application.errors.exceptions import BadRequestError
+from app.infrastructure.models import DemoModel
+from app.infrastructure.repositories import DemoRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(params=["sqlite_session", "db_session"])
+def session(request):
+    """同一组用例分别在SQLite与Postgres上运行，未设置TEST_DATABASE_URL时跳过Postgres"""
+    return request.getfixturevalue(request.param)
+
+
+class RecordingSession:
+    """只记录执行参数的会话，用于验证发送给数据库的批次"""
+
+    def __init__(self):
+        self.batches: List[List[dict]] = []
+
+    async def execute(self, statement: Any, params: Any = None) -> None:
+        self.batches.append(list(params))
+
+
+async def test_bulk_upsert_dedupes_conflict_keys_last_write_wins():
+    session = RecordingSession()
+    first, second = uuid.uuid4(), uuid.uuid4()
+
+    result = await DemoRepository(session).bulk_upsert([
+        {"id": first, "name": "a1"},
+        {"id": second, "name": "b"},
+        {"id": first, "name": "a2"},
+    ])
+
+    assert result.rows == 2
+    rows = [row for batch in session.batches for row in batch]
+    assert {row["id"]: row["name"] for row in rows} == {first: "a2", second: "b"}
+
+
+async def test_bulk_upsert_dedupes_on_custom_conflict_columns():
+    session = RecordingSession()
+
+    await DemoRepository(session).bulk_upsert(
+        [{"id": uuid.uuid4(), "name": "x", "age": 1}, {"id": uuid.uuid4(), "name": "x", "age": 2}],
+        conflict_columns=["name"],
+    )
+
+    rows = [row for batch in session.batches for row in batch]
+    assert [row["age"] for row in rows] == [2]
+
+
+async def test_bulk_upsert_keeps_rows_with_null_conflict_keys():
+    session = RecordingSession()
+
+    await DemoRepository(session).bulk_upsert(
+        [{"id": uuid.uuid4(), "name": None}, {"id": uuid.uuid4(), "name": None}],
+        conflict_columns=["name"],
+    )
+
+    assert sum(len(batch) for batch in session.batches) == 2
+
+
+async def test_bulk_upsert_with_repeated_keys_on_postgres(db_session):
+    repository = DemoRepository(db_session, batch_size=2)
+    ids = [uuid.uuid4() for _ in range(3)]
+
+    await repository.bulk_upsert([{"id": ids[0], "name": "old"}, {"id": ids[1], "name": "b"}])
+    await repository.bulk_upsert([
+        {"id": ids[0], "name": "new1"},
+        {"id": ids[0], "name": "new2"},
+        {"id": ids[2], "name": "c"},
+        {"id": ids[2], "name": "c2"},
+    ])
+    await db_session.commit()
+
+    names = dict((await db_session.execute(select(DemoModel.id, DemoModel.name))).all())
+    assert names == {ids[0]: "new2", ids[1]: "b", ids[2]: "c2"}
+    assert await db_session.scalar(select(func.count()).select_from(DemoModel)) == 3
+
+
+async def seed(session, count: int = 25):
+    """每5行共用同一个created_at，验证排序列取值相同时按id继续分页"""
+    started_at = datetime(2026, 1, 1)
+    rows = [
+        DemoModel(id=uuid.uuid4(), name=f"demo-{index}", description="", created_at=started_at + timedelta(seconds=index // 5))
+        for index in range(count)
+    ]
+    session.add_all(rows)
+    await session.commit()
+    return sorted(rows, key=lambda row: (row.created_at, str(row.id)))
+
+
+async def collect_pages(repository, limit: int, **kwargs):
+    pages, cursor = [], None
+    while True:
+        page = await repository.list_page(limit, cursor=cursor, **kwargs)
+        pages.append([row.id for row in page.items])
+        if not page.has_more:
+            return pages
+        cursor = page.next_cursor
+
+
+async def test_list_page_walks_all_rows_in_key_order(session):
+    rows = await seed(session)
+    repository = DemoRepository(session)
+
+    pages = await collect_pages(repository, limit=7)
+
+    assert [len(page) for page in pages] == [7, 7, 7, 4]
+    assert [row_id for page in pages for row_id in page] == [row.id for row in rows]
+
+
+async def test_list_page_descending(session):
+    rows = await seed(session, count=12)
+    repository = DemoRepository(session)
+
+    pages = await collect_pages(repository, limit=5, descending=True)
+
+    assert [row_id for page in pages for row_id in page] == [row.id for row in reversed(rows)]
+
+
+async def test_list_page_exact_multiple_has_no_empty_last_page(session):
+    await seed(session, count=10)
+
+    pages = await collect_pages(DemoRepository(session), limit=5)
+
+    assert [len(page) for page in pages] == [5, 5]
+
+
+async def test_list_page_rejects_cursor_from_other_order(session):
+    await seed(session, count=3)
+    repository = DemoRepository(session)
+    page = await repository.list_page(1, order_by=["id"])
+
+    with pytest.raises(BadRequestError):
+        await repository.list_page(1, cursor=page.next_cursor)
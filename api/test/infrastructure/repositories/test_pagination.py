@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.application.errors.exceptions import BadRequestError
+from app.infrastructure.models import DemoModel
+from app.infrastructure.repositories.pagination import decode_cursor, encode_cursor
+
+COLUMNS = [DemoModel.__table__.c.created_at, DemoModel.__table__.c.id]
+
+
+def test_cursor_round_trip_restores_column_types():
+    values = [datetime(2026, 1, 2, 3, 4, 5, 678000), uuid.uuid4()]
+
+    cursor = encode_cursor(COLUMNS, values)
+
+    assert "=" not in cursor
+    assert decode_cursor(COLUMNS, cursor) == values
+
+
+def test_cursor_for_other_order_is_rejected():
+    cursor = encode_cursor([DemoModel.__table__.c.id], [uuid.uuid4()])
+
+    with pytest.raises(BadRequestError):
+        decode_cursor(COLUMNS, cursor)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", encode_cursor(COLUMNS, ["yesterday", "x"])])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(BadRequestError):
+        decode_cursor(COLUMNS, cursor)
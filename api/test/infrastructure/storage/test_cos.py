@@ -0,0 +1,159 @@
+import asyncio
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+import pytest
+
+from app.infrastructure.storage.cos import Cos
+from test.benchmarks.stand_ins import LocalObjectStore
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingObjectStore(LocalObjectStore):
+    """记录GET请求的Range参数与上传方式"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.ranges = []
+        self.multipart_uploads = 0
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        self.ranges.append(Range)
+        return super().get_object(Bucket, Key, Range=Range, **kwargs)
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self.multipart_uploads += 1
+        return super().create_multipart_upload(Bucket, Key, **kwargs)
+
+
+class NonSeekable(io.RawIOBase):
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+@pytest.fixture
+async def cos(tmp_path, settings, monkeypatch):
+    monkeypatch.setattr(settings, "COS_MULTIPART_THRESHOLD", 1000)
+    monkeypatch.setattr(settings, "COS_PART_SIZE", 300)
+    monkeypatch.setattr(settings, "COS_LAZY_INIT", False)
+    store = RecordingObjectStore(tmp_path / "objects")
+
+    def create_client(self: Cos) -> None:
+        self._client = store
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cos")
+
+    monkeypatch.setattr(Cos, "_create_client", create_client)
+    instance = Cos()
+    await instance.init()
+    yield instance
+    await instance.shutdown()
+
+
+async def test_get_object_below_threshold_uses_single_request(cos):
+    await cos.put_object("small", b"x" * 999)
+
+    assert await cos.get_object("small") == b"x" * 999
+    assert cos.client.ranges == [None]
+
+
+async def test_get_object_with_known_size_skips_head(cos):
+    await cos.put_object("small", b"abc")
+
+    assert await cos.get_object("small", size=3) == b"abc"
+    assert cos.client.ranges == [None]
+
+
+async def test_get_object_above_threshold_downloads_ranges(cos):
+    data = bytes(range(256)) * 5
+    await cos.put_object("large", data)
+
+    assert await cos.get_object("large") == data
+    assert sorted(cos.client.ranges) == ["bytes=0-299", "bytes=1200-1279", "bytes=300-599", "bytes=600-899", "bytes=900-1199"]
+
+
+async def test_get_empty_object(cos):
+    await cos.put_object("empty", b"")
+
+    assert await cos.get_object("empty") == b""
+
+
+async def test_put_object_seekable_file_uses_multipart_above_threshold(cos):
+    data = b"y" * 2500
+    await cos.put_object("file", io.BytesIO(data))
+
+    assert cos.client.multipart_uploads == 1
+    assert await cos.get_object("file") == data
+
+
+@pytest.mark.parametrize("size, multipart", [(500, 0), (2500, 1)])
+async def test_put_object_buffers_non_seekable_stream(cos, size, multipart):
+    data = bytes(range(250)) * (size // 250)
+    await cos.put_object("stream", NonSeekable(data))
+
+    assert cos.client.multipart_uploads == multipart
+    assert await cos.get_object("stream") == data
+
+
+async def test_put_object_buffers_generators(cos):
+    chunks = [b"a" * 700, b"b" * 700]
+
+    async def produce():
+        for chunk in chunks:
+            yield chunk
+
+    await cos.put_object("sync", iter(chunks))
+    await cos.put_object("async", produce())
+
+    assert await cos.get_object("sync") == b"".join(chunks)
+    assert await cos.get_object("async") == b"".join(chunks)
+    assert cos.client.multipart_uploads == 2
+
+
+async def test_put_object_rejects_unsupported_body(cos):
+    with pytest.raises(TypeError):
+        await cos.put_object("bad", 123)
+
+
+async def test_lazy_init_does_not_block_event_loop(tmp_path, settings, monkeypatch):
+    monkeypatch.setattr(settings, "COS_LAZY_INIT", True)
+    store = RecordingObjectStore(tmp_path / "objects")
+    started = threading.Event()
+    release = threading.Event()
+
+    def create_client(self: Cos) -> None:
+        started.set()
+        release.wait(5)
+        self._client = store
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cos")
+
+    monkeypatch.setattr(Cos, "_create_client", create_client)
+    instance = Cos()
+    await instance.init()
+    try:
+        # 1.后台初始化未完成时访问客户端直接报错，而不是在事件循环中同步创建
+        await anyio.to_thread.run_sync(started.wait, 5)
+        with pytest.raises(RuntimeError):
+            instance.client
+
+        # 2.SDK调用等待初始化完成，期间事件循环保持可用
+        upload = asyncio.ensure_future(instance.put_object("lazy", b"data"))
+        await asyncio.sleep(0.05)
+        assert not upload.done()
+        release.set()
+        await upload
+        assert await instance.get_object("lazy") == b"data"
+        assert instance.client is store
+    finally:
+        release.set()
+        await instance.shutdown()
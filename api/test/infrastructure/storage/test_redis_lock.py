@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from app.infrastructure.storage.redis_lock import RedisLock
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_lock_is_exclusive_until_released(redis_client):
+    first = RedisLock(redis_client, "lock:exclusive")
+    second = RedisLock(redis_client, "lock:exclusive")
+
+    assert await first.acquire()
+    assert not await second.acquire(blocking=False)
+    assert not await second.acquire(timeout=0.1)
+
+    assert await first.release()
+    assert await second.acquire(blocking=False)
+    await second.release()
+
+
+async def test_release_only_deletes_own_token(redis_client):
+    lock = RedisLock(redis_client, "lock:token", lease_ms=100, auto_renew=False)
+    assert await lock.acquire()
+    await asyncio.sleep(0.2)
+
+    # 租期过期后被其他实例获取，原持有者释放不能删掉新锁
+    other = RedisLock(redis_client, "lock:token", auto_renew=False)
+    assert await other.acquire(blocking=False)
+    assert not await lock.release()
+    assert await redis_client.client.exists("lock:token")
+    await other.release()
+
+
+async def test_auto_renew_keeps_lock_past_lease(redis_client):
+    lock = RedisLock(redis_client, "lock:renew", lease_ms=150)
+    async with lock:
+        await asyncio.sleep(0.4)
+        assert await redis_client.client.pttl("lock:renew") > 0
+        assert not await RedisLock(redis_client, "lock:renew").acquire(blocking=False)
+
+
+async def test_release_awaits_renew_task(redis_client):
+    lock = RedisLock(redis_client, "lock:release", lease_ms=150)
+    await lock.acquire()
+    renew_task = lock._renew_task
+
+    await lock.release()
+
+    assert renew_task.done()
+    assert lock._renew_task is None
+    assert not await redis_client.client.exists("lock:release")
+
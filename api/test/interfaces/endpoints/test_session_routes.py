@@ -0,0 +1,55 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.infrastructure.events import get_event_broker
+from app.interfaces.endpoints.session_routes import router
+from app.interfaces.errors.exception_handler import register_exception_handlers
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def broker(redis_client):
+    instance = get_event_broker()
+    await instance.init()
+    yield instance
+    await instance.shutdown()
+
+
+@pytest.fixture
+async def client(broker):
+    app = FastAPI()
+    register_exception_handlers(app)
+    app.include_router(router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.parametrize("event_id", ["abc", "1-", "-1", "1-2-3", "1.5", "1\n"])
+async def test_malformed_after_is_rejected(client, event_id):
+    response = await client.get("/sessions/s1/events", params={"after": event_id})
+
+    assert response.status_code == 400
+    assert response.json()["code"] == 400
+
+
+async def test_malformed_last_event_id_is_rejected(client):
+    response = await client.get("/sessions/s1/events", headers={"Last-Event-ID": "undefined"})
+
+    assert response.status_code == 400
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.json()["code"] == 400
+
+
+async def test_resume_replays_events_after_id(client, broker):
+    first = await broker.publish("s1", "message", "a")
+    await broker.publish("s1", "message", "b")
+    await broker.publish("s1", "end", "")
+
+    response = await client.get("/sessions/s1/events", headers={"Last-Event-ID": first})
+
+    assert response.status_code == 200
+    assert "data: a" not in response.text
+    assert "data: b" in response.text
+    assert "event: end" in response.text
@@ -0,0 +1,53 @@
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from app.application.errors.exceptions import NotFoundError
+from app.interfaces.errors.exception_handler import register_exception_handlers
+from app.interfaces.responses import envelope_bytes
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def client():
+    app = FastAPI()
+    register_exception_handlers(app)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        raise NotFoundError(f"数据{item_id}不存在")
+
+    @app.get("/detail/{value}")
+    async def detail(value: str):
+        raise HTTPException(status_code=400, detail=f"参数错误: {value}")
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    envelope_bytes.cache_clear()
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_dynamic_messages_are_not_cached(client):
+    for index in range(5):
+        response = await client.get(f"/items/{index}")
+        assert response.status_code == 404
+        assert response.json()["message"] == f"数据{index}不存在"
+        assert (await client.get(f"/detail/{index}")).json()["message"] == f"参数错误: {index}"
+
+    assert envelope_bytes.cache_info().currsize == 0
+
+
+async def test_static_envelopes_are_cached(client):
+    for _ in range(3):
+        missing = await client.get("/missing")
+        failed = await client.get("/boom")
+
+    assert missing.status_code == 404 and missing.json()["message"] == "Not Found"
+    assert failed.status_code == 500 and failed.json()["message"] == "Internal Server Error"
+    info = envelope_bytes.cache_info()
+    assert (info.currsize, info.hits) == (2, 4)
@@ -0,0 +1,46 @@
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.interfaces.middleware.compression import CompressionMiddleware
+
+pytestmark = pytest.mark.anyio
+
+BODY = "x" * 4096
+
+
+def create_client() -> httpx.AsyncClient:
+    async def full(request):
+        return PlainTextResponse(BODY)
+
+    async def partial(request):
+        return PlainTextResponse(BODY[:2048], status_code=206, headers={"Content-Range": f"bytes 0-2047/{len(BODY)}"})
+
+    async def ranged(request):
+        return PlainTextResponse(BODY, headers={"Content-Range": f"bytes 0-{len(BODY) - 1}/{len(BODY)}"})
+
+    app = Starlette(routes=[Route("/full", full), Route("/partial", partial), Route("/ranged", ranged)])
+    app.add_middleware(CompressionMiddleware)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def test_full_response_is_compressed():
+    async with create_client() as client:
+        response = await client.get("/full", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert int(response.headers["Content-Length"]) < len(BODY)
+    assert response.text == BODY
+
+
+@pytest.mark.parametrize("path", ["/partial", "/ranged"])
+async def test_range_responses_are_not_compressed(path):
+    async with create_client() as client:
+        response = await client.get(path, headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Content-Length"] == str(len(response.content))
+    assert response.headers["Content-Range"].startswith("bytes 0-")
+    assert response.text == BODY[:len(response.content)]
@@ -0,0 +1,82 @@
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.interfaces.middleware.rate_limit import RateLimitMiddleware
+from core.config import RateLimitRule
+
+pytestmark = pytest.mark.anyio
+
+
+def create_client(*rules: RateLimitRule, client_ip: str = "10.0.0.1") -> httpx.AsyncClient:
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/api/items", ok), Route("/health", ok)])
+    app.add_middleware(RateLimitMiddleware, rules=list(rules))
+    transport = httpx.ASGITransport(app=app, client=(client_ip, 1234))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+@pytest.fixture
+def api_keys(settings, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_API_KEYS", ["key-a", "key-b"])
+
+
+async def test_sliding_window_rejects_over_limit(redis_client):
+    async with create_client(RateLimitRule(path="/api", limit=3, window=60)) as client:
+        responses = [await client.get("/api/items") for _ in range(4)]
+
+    assert [response.status_code for response in responses] == [200, 200, 200, 429]
+    assert responses[0].headers["RateLimit-Limit"] == "3"
+    assert responses[2].headers["RateLimit-Remaining"] == "0"
+    assert int(responses[3].headers["Retry-After"]) >= 1
+    assert responses[3].json()["code"] == 429
+
+
+async def test_token_bucket_allows_burst(redis_client):
+    rule = RateLimitRule(path="/api", limit=1, window=60, algorithm="token_bucket", burst=2)
+    async with create_client(rule) as client:
+        statuses = [(await client.get("/api/items")).status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+
+
+async def test_unmatched_paths_are_not_limited(redis_client):
+    async with create_client(RateLimitRule(path="/api", limit=1, window=60)) as client:
+        statuses = [(await client.get("/health")).status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 200]
+
+
+async def test_registered_api_keys_have_separate_budgets(redis_client, api_keys):
+    async with create_client(RateLimitRule(path="/api", limit=1, window=60)) as client:
+        first = await client.get("/api/items", headers={"X-API-Key": "key-a"})
+        second = await client.get("/api/items", headers={"X-API-Key": "key-b"})
+        repeated = await client.get("/api/items", headers={"X-API-Key": "key-a"})
+
+    assert (first.status_code, second.status_code, repeated.status_code) == (200, 200, 429)
+    assert not [key async for key in redis_client.client.scan_iter(match="*key-a*")]
+
+
+async def test_unknown_api_keys_fall_back_to_client_ip(redis_client, api_keys):
+    async with create_client(RateLimitRule(path="/api", limit=2, window=60)) as client:
+        statuses = [
+            (await client.get("/api/items", headers={"X-API-Key": f"forged-{index}"})).status_code
+            for index in range(3)
+        ]
+
+    assert statuses == [200, 200, 429]
+
+
+async def test_redis_failure_fails_open(redis_client, monkeypatch):
+    async def broken(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(redis_client, "eval_script", broken)
+    async with create_client(RateLimitRule(path="/api", limit=1, window=60)) as client:
+        statuses = [(await client.get("/api/items")).status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 200]
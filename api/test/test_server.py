@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from app import server
+from core.config import get_settings
+
+
+def test_server_workers_defaults_to_single_process(settings):
+    assert settings.SERVER_WORKERS == 0
+    assert settings.server_workers == 1
+
+
+def test_available_cpus_respects_cgroup_quota(monkeypatch):
+    monkeypatch.setattr(server, "_cgroup_cpu_limit", lambda: 2)
+    assert server.available_cpus() == min(len(os.sched_getaffinity(0)), 2)
+
+    monkeypatch.setattr(server, "_cgroup_cpu_limit", lambda: None)
+    assert server.available_cpus() == len(os.sched_getaffinity(0))
+
+
+@pytest.mark.parametrize("configured, expected", [("0", 3), ("5", 5)])
+def test_run_writes_back_worker_count(monkeypatch, configured, expected):
+    calls = {}
+    monkeypatch.setenv("SERVER_WORKERS", configured)
+    monkeypatch.setenv("METRICS_MULTIPROC_DIR", "")
+    monkeypatch.setattr(server, "available_cpus", lambda: 3)
+    monkeypatch.setattr(server.uvicorn, "run", lambda app, **kwargs: calls.update(kwargs))
+    get_settings.cache_clear()
+
+    server.run()
+
+    assert calls["workers"] == expected
+    assert os.environ["SERVER_WORKERS"] == str(expected)
+    assert get_settings().server_workers == expected
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from app.application.services.job_service import job_handler
+from app.domain.model.job import JobStatus
+from app.infrastructure.queue import JobQueue
+from app.worker import JobWorker
+
+pytestmark = pytest.mark.anyio
+
+attempts = {}
+
+
+@job_handler("test.double")
+async def double(payload: dict) -> dict:
+    return {"value": payload["value"] * 2}
+
+
+@job_handler("test.flaky")
+async def flaky(payload: dict) -> str:
+    attempts[payload["key"]] = attempts.get(payload["key"], 0) + 1
+    if attempts[payload["key"]] < 2:
+        raise RuntimeError("temporary failure")
+    return "ok"
+
+
+@job_handler("test.broken")
+async def broken(payload: dict) -> None:
+    raise ValueError("always fails")
+
+
+@pytest.fixture
+async def queue(redis_client, settings, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_BLOCK_MS", 50)
+    monkeypatch.setattr(settings, "JOB_MAINTENANCE_INTERVAL", 0.05)
+    monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF", 0.05)
+    monkeypatch.setattr(settings, "JOB_SHUTDOWN_TIMEOUT", 1)
+    return JobQueue()
+
+
+async def wait_finished(queue: JobQueue, job_id: str, timeout: float = 5):
+    for _ in range(int(timeout / 0.02)):
+        job = await queue.get(job_id)
+        if job.status.finished:
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"任务未在{timeout}s内结束: {job_id}")
+
+
+async def test_worker_runs_retries_and_dead_letters(queue):
+    worker = JobWorker(concurrency=4, queue=queue)
+    running = asyncio.create_task(worker.run())
+    try:
+        succeeded = await queue.enqueue("test.double", {"value": 21})
+        retried = await queue.enqueue("test.flaky", {"key": "retried"})
+        dead = await queue.enqueue("test.broken", max_attempts=2)
+        unknown = await queue.enqueue("test.unknown")
+
+        succeeded = await wait_finished(queue, succeeded.id)
+        retried = await wait_finished(queue, retried.id)
+        dead = await wait_finished(queue, dead.id)
+        unknown = await wait_finished(queue, unknown.id)
+    finally:
+        worker.stop()
+        await running
+
+    assert (succeeded.status, succeeded.result, succeeded.attempts) == (JobStatus.SUCCEEDED, {"value": 42}, 1)
+    assert (retried.status, retried.result, retried.attempts) == (JobStatus.SUCCEEDED, "ok", 2)
+    assert (dead.status, dead.attempts, dead.error) == (JobStatus.DEAD, 2, "ValueError: always fails")
+    assert unknown.status == JobStatus.DEAD and "test.unknown" in unknown.error
+
+
+async def test_stop_waits_for_running_jobs(queue):
+    started = asyncio.Event()
+
+    @job_handler("test.slow")
+    async def slow(payload: dict) -> str:
+        started.set()
+        await asyncio.sleep(0.2)
+        return "done"
+
+    worker = JobWorker(concurrency=1, queue=queue)
+    running = asyncio.create_task(worker.run())
+    job = await queue.enqueue("test.slow")
+    await asyncio.wait_for(started.wait(), 5)
+
+    worker.stop()
+    await running
+
+    assert (await queue.get(job.id)).status == JobStatus.SUCCEEDED